@@ -1,4 +1,5 @@
 import os
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic_core import MultiHostUrl
 from pydantic import PostgresDsn, computed_field
@@ -16,6 +17,110 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int
     POSTGRES_DB: str
 
+    # Ключ слепых индексов ПДн (app/modules/common/encryption.py). По умолчанию
+    # выводится из SECRET_KEY; после смены ключа нужен пересчёт индексов
+    BLIND_INDEX_KEY: Optional[str] = None
+
+    # Кэш последних расшифрованных значений ПДн (0 - без кэша)
+    ENCRYPTION_CACHE_SIZE: int = 1024
+
+    # Пул соединений с БД на весь экземпляр приложения: делится между воркерами
+    # gunicorn (WEB_CONCURRENCY задаётся в app/gunicorn_conf.py)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 15
+    WEB_CONCURRENCY: int = 1
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 30 * 60
+    DB_POOL_PRE_PING: bool = True
+    # Таймаут запросов по умолчанию, мс (0 - без таймаута)
+    DB_STATEMENT_TIMEOUT: int = 0
+    # Подключение через PgBouncer (transaction pooling): без кэша prepared statements
+    DB_PGBOUNCER: bool = False
+
+    # Бюджет времени запросов обработчиков API, мс (app/database/timeouts.py):
+    # по умолчанию и по пути маршрута. Превышение - 503 с Retry-After, с
+    DB_REQUEST_STATEMENT_TIMEOUT: int = 120000
+    STATEMENT_TIMEOUTS: Dict[str, int] = {
+        "/api/v1/ckf/organizations/filter": 30000,
+        "/api/v1/ckf/organizations/secure-filter": 30000,
+        "/api/v1/ckf/organizations/bbox": 20000,
+        "/api/v1/ckf/kkms/bbox": 20000,
+        "/api/v1/ckf/kkms/filter": 30000,
+        "/api/v1/ckf/organizations/territory/esf-summary": 60000,
+        "/api/v1/ckf/kkms/territory/receipts-summary": 60000,
+        "/api/v1/ext/mobile-data/data/filter": 30000,
+        "/api/v1/ext/minerals/iuc-minerals/contracts/by-territory": 30000,
+    }
+    STATEMENT_TIMEOUT_RETRY_AFTER: int = 30
+    # Интервал проверки отключения клиента во время запроса, с
+    DB_DISCONNECT_POLL_INTERVAL: float = 1.0
+
+    # Реплика для чтения (app/database/replica.py); не задана - всё с основной БД
+    POSTGRES_REPLICA_HOST: Optional[str] = None
+    POSTGRES_REPLICA_PORT: Optional[int] = None
+    # Допустимое отставание реплики, с, и интервал его проверки, с
+    DB_REPLICA_MAX_LAG: float = 10.0
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+
+    # Максимум соединений, одновременно занятых параллельными запросами на чтение
+    # (app/database/parallel.py); должен быть меньше пула воркера
+    DB_PARALLEL_QUERIES_LIMIT: int = 4
+
+    # Строк в одном запросе массовой вставки/обновления (BaseRepository.bulk_*)
+    DB_BULK_BATCH_SIZE: int = 1000
+
+    # Секционирование временных рядов (app/database/partitions.py)
+    PARTITION_PREMAKE: int = 3
+    # Создавать секции при старте каждого воркера; обычно это делает cron
+    # (python -m app.database.partitions), чтобы воркеры не ждали друг друга на DDL
+    PARTITIONS_ON_STARTUP: bool = False
+    RECEIPTS_RETENTION_MONTHS: int = 36
+    MOBILE_DATA_RETENTION_MONTHS: int = 12
+
+    # Лента чеков в реальном времени (app/modules/ckf/live.py)
+    LIVE_RECEIPTS_BUFFER_SIZE: int = 1000
+    LIVE_RECEIPTS_POLL_INTERVAL: float = 2.0
+
+    # Колоночная выгрузка наборов данных (app/modules/datasets)
+    DATASETS_CACHE_DIR: str = "/tmp/coc_datasets"
+    DATASETS_CACHE_TTL: int = 60 * 60  # 0 - не кэшировать файлы
+    DATASETS_CHUNK_SIZE: int = 50000
+
+    # Лимит строк для методов без пагинации (app/modules/common/result_caps.py)
+    MAX_RESULT_ROWS: int = 50000
+    RESULT_ROWS_LIMITS: Dict[str, int] = {
+        "KaztelecomMobileDataRepo.filter_mobile_data": 10000,
+    }
+
+    # Загрузка данных через COPY (app/modules/ingest)
+    INGEST_CHUNK_SIZE: int = 10000
+
+    # Профилирование запросов (app/modules/common/profiling.py): порог повторов
+    # одного запроса для N+1 и длительность запроса, с которой он логируется
+    PROFILING_ENABLED: bool = True
+    PROFILING_N_PLUS_ONE_THRESHOLD: int = 10
+    PROFILING_SLOW_REQUEST_MS: int = 1000
+    # Планы медленных запросов (app/database/slow_queries.py): порог, мс (0 -
+    # выключено), доля запросов с EXPLAIN ANALYZE, не чаще интервала (с) для одной
+    # формы запроса, таймаут EXPLAIN, мс, и размер буфера воркера
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    SLOW_QUERY_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_EXPLAIN_INTERVAL: int = 300
+    SLOW_QUERY_EXPLAIN_TIMEOUT: int = 60000
+    SLOW_QUERY_BUFFER_SIZE: int = 200
+
+    # Интервал замера задержки event loop и заполнения пулов, с
+    # (app/modules/common/monitoring.py)
+    METRICS_SAMPLE_INTERVAL: float = 1.0
+
+    REDIS_URL: str = "redis://coc_redis"
+
+    # Кэш аутентификации (app/modules/admins/principal.py): TTL в процессе и в
+    # Redis, секунды (0 - не кэшировать), и размер кэша процесса
+    PRINCIPAL_CACHE_TTL: int = 10
+    PRINCIPAL_CACHE_REDIS_TTL: int = 300
+    PRINCIPAL_CACHE_SIZE: int = 10000
+
     # ClickHouse settings
     CLICKHOUSE_HOST: str = "coc_db_clickhouse"
     CLICKHOUSE_PORT: int = 8123
@@ -4,15 +4,21 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
 )
 
-
 from app.config import alembic_database_url
+from .pool import engine_options
+from .replica import RoutingSession
 
 
 engine = create_async_engine(
     url=alembic_database_url.render_as_string(hide_password=False),
     plugins=["geoalchemy2"],
-    pool_size=10,
-    max_overflow=15
+    **engine_options(),
 )
 
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Чтение может уходить на реплику, см. app/database/replica.py
+async_session_maker = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+)
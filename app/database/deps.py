@@ -1,14 +1,39 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable
+from fastapi import Request
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import declarative_base
 from app.database.database import async_session_maker
+from app.modules.common.metrics import db_sessions_in_progress
 from .database import engine
+from .replica import replica_monitor
+from .timeouts import statement_budget
 
 
 Base = declarative_base()
 
+AFTER_COMMIT_KEY = "after_commit"
 
-async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
+
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """
+    Выполнить callback после успешного коммита сессии get_session_with_commit.
+    При откате callback не вызывается
+    """
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    for callback in session.info.pop(AFTER_COMMIT_KEY, []):
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"Ошибка обработчика после коммита: {e}")
+
+
+async def get_session_with_commit(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
     """Регистрируем все таблицы в схеме ext чтобы sqlamchemy знал о них."""
     async with engine.begin() as conn:
         # Using lambda to make a partial here to pass schema and only.
@@ -16,24 +41,31 @@ async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
         await conn.run_sync(Base.metadata.create_all)
 
     """Асинхронная сессия с автоматическим коммитом."""
-    async with async_session_maker() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
-
-
-async def get_session_without_commit() -> AsyncGenerator[AsyncSession, None]:
-    """Асинхронная сессия без автоматического коммита."""
-    async with async_session_maker() as session:
-        try:
-            yield session
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+    with db_sessions_in_progress.labels("commit").track_inprogress():
+        async with async_session_maker() as session, statement_budget(session, request):
+            try:
+                yield session
+                await session.commit()
+                await run_after_commit(session)
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+
+
+async def get_session_without_commit(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Асинхронная сессия без автоматического коммита. Чтение - с реплики, если она есть."""
+    await replica_monitor.check()
+    with db_sessions_in_progress.labels("read").track_inprogress():
+        async with async_session_maker() as session, statement_budget(session, request):
+            session.info["read_only"] = True
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
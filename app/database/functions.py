@@ -7,6 +7,7 @@ Copyright (c) 2025 RaiMX
 """
 
 from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
 
 to_upper = PGFunction(
     schema="public",
@@ -18,3 +19,73 @@ to_upper = PGFunction(
   $$ language SQL;
   """,
 )
+
+
+# Поддержка last_10_details: при изменении last_10 позиции чека с данными
+# ККМ и организации копируются в last_10_details, чтобы ленты последних
+# чеков не обращались к таблице receipts.
+last_10_details_sync = PGFunction(
+    schema="public",
+    signature="last_10_details_sync()",
+    definition="""
+  RETURNS trigger AS
+  $$
+  BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+      TRUNCATE public.last_10_details;
+      RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+      DELETE FROM public.last_10_details
+      WHERE kkms_id = OLD.kkms_id AND fiskal_sign IS NOT DISTINCT FROM OLD.fiskal_sign;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      INSERT INTO public.last_10_details (
+        receipt_id, kkms_id, organization_id, fiskal_sign, operation_date,
+        reg_number, serial_number, address, name_ru,
+        item_name, item_price, item_count, item_nds, full_item_price, payment_type
+      )
+      SELECT
+        r.id, NEW.kkms_id, k.organization_id, NEW.fiskal_sign, NEW.operation_date,
+        k.reg_number, k.serial_number, k.address, o.name_ru,
+        r.item_name, r.item_price, r.item_count, r.item_nds, r.full_item_price, r.payment_type
+      FROM public.receipts r
+      JOIN public.kkms k ON k.id = r.kkms_id
+      JOIN public.organizations o ON o.id = k.organization_id
+      WHERE r.kkms_id = NEW.kkms_id AND r.fiskal_sign = NEW.fiskal_sign
+        -- receipts секционирована по operation_date: граница по дню чека
+        -- оставляет для поиска одну секцию
+        AND r.operation_date >= date_trunc('day', NEW.operation_date)
+        AND r.operation_date < date_trunc('day', NEW.operation_date) + interval '1 day'
+      ON CONFLICT (receipt_id) DO NOTHING;
+    END IF;
+
+    RETURN NULL;
+  END;
+  $$ LANGUAGE plpgsql;
+  """,
+)
+
+last_10_details_row_trigger = PGTrigger(
+    schema="public",
+    signature="last_10_details_row_sync",
+    on_entity="public.last_10",
+    is_constraint=False,
+    definition="""
+  AFTER INSERT OR UPDATE OR DELETE ON public.last_10
+  FOR EACH ROW EXECUTE FUNCTION public.last_10_details_sync()
+  """,
+)
+
+last_10_details_truncate_trigger = PGTrigger(
+    schema="public",
+    signature="last_10_details_truncate_sync",
+    on_entity="public.last_10",
+    is_constraint=False,
+    definition="""
+  AFTER TRUNCATE ON public.last_10
+  FOR EACH STATEMENT EXECUTE FUNCTION public.last_10_details_sync()
+  """,
+)
@@ -0,0 +1,69 @@
+import asyncio
+from contextlib import nullcontext
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy import Executable, Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.database import async_session_maker
+from app.database.pool import per_worker
+from app.database.timeouts import inherit_budget
+
+
+_semaphore: asyncio.Semaphore | None = None
+
+
+def parallel_queries_limit() -> int:
+    """
+    Соединения для параллельных запросов берутся из того же пула, а соединение
+    вызывающей сессии на время ожидания остаётся занятым. Поэтому лимит не
+    больше пула воркера (pool_size + max_overflow) без одного соединения
+    """
+    capacity = max(per_worker(settings.DB_POOL_SIZE), 1) + per_worker(settings.DB_MAX_OVERFLOW)
+    limit = min(settings.DB_PARALLEL_QUERIES_LIMIT, max(capacity - 1, 1))
+    if limit < settings.DB_PARALLEL_QUERIES_LIMIT:
+        logger.warning(
+            f"DB_PARALLEL_QUERIES_LIMIT={settings.DB_PARALLEL_QUERIES_LIMIT} больше пула "
+            f"воркера ({capacity} соединений), используется {limit}"
+        )
+    return limit
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Семафор создаётся лениво, чтобы он был привязан к работающему event loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(parallel_queries_limit())
+    return _semaphore
+
+
+async def _execute_isolated(query: Executable, parent: Optional[AsyncSession]) -> Result:
+    async with _get_semaphore():
+        async with async_session_maker() as session:
+            with inherit_budget(parent, session) if parent is not None else nullcontext():
+                result = await session.execute(query)
+                # Буферизуем результат, чтобы соединение вернулось в пул сразу
+                return result.freeze()()
+
+
+async def execute_concurrently(
+    *queries: Executable, session: Optional[AsyncSession] = None
+) -> List[Result]:
+    """
+    Выполняет независимые запросы на чтение параллельно, каждый в своей
+    сессии из пула. Результаты возвращаются в порядке запросов и уже
+    буферизованы (scalar(), one(), mappings() работают как обычно).
+
+    session - сессия обработчика: её statement_timeout и отмена при
+    отключении клиента (app/database/timeouts.py) действуют и на эти запросы.
+
+    Общее число одновременно занятых соединений ограничено
+    DB_PARALLEL_QUERIES_LIMIT (не больше пула воркера без одного соединения).
+    Не использовать для запросов, которые должны видеть незакоммиченные
+    изменения текущей сессии.
+    """
+    return list(
+        await asyncio.gather(*(_execute_isolated(query, session) for query in queries))
+    )
@@ -0,0 +1,190 @@
+"""
+Секционирование (range partitioning) таблиц-временных рядов.
+
+Таблицы переводятся в секционированные миграцией
+`0002_partition_time_series`. Этот модуль описывает схему секционирования
+и обслуживает секции:
+
+- создание секций наперёд (по расписанию; при старте приложения - только
+  если включён PARTITIONS_ON_STARTUP);
+- отсоединение (DETACH) секций старше срока хранения. Отсоединённая секция
+  остаётся обычной таблицей, удалять её или архивировать решает эксплуатация.
+
+Обслуживание по расписанию (cron, раз в сутки):
+
+    python -m app.database.partitions
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    schema: str
+    table: str
+    column: str
+    # "month" или "year"
+    interval: str
+    # Срок хранения в единицах interval; None - хранить всё
+    retention: Optional[int] = None
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.schema}.{self.table}"
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.table}_default"
+
+
+PARTITIONED_TABLES: List[PartitionSpec] = [
+    PartitionSpec("public", "receipts", "operation_date", "month", settings.RECEIPTS_RETENTION_MONTHS),
+    PartitionSpec("public", "receipts_daily", "date_check", "month", settings.RECEIPTS_RETENTION_MONTHS),
+    PartitionSpec("public", "receipts_month", "month", "year"),
+    PartitionSpec("ext", "kaztelecom_mobile_data", "date", "month", settings.MOBILE_DATA_RETENTION_MONTHS),
+]
+
+# Ключ advisory-блокировки, чтобы несколько воркеров не создавали секции одновременно
+_ADVISORY_LOCK_KEY = 730_030
+
+
+def period_start(spec: PartitionSpec, day: date) -> date:
+    if spec.interval == "year":
+        return date(day.year, 1, 1)
+    return date(day.year, day.month, 1)
+
+
+def shift_period(spec: PartitionSpec, start: date, periods: int) -> date:
+    if spec.interval == "year":
+        return date(start.year + periods, 1, 1)
+
+    month_index = start.year * 12 + start.month - 1 + periods
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(spec: PartitionSpec, start: date) -> str:
+    suffix = f"{start:%Y}" if spec.interval == "year" else f"{start:%Y%m}"
+    return f"{spec.table}_p{suffix}"
+
+
+def _parse_partition_start(spec: PartitionSpec, name: str) -> Optional[date]:
+    match = re.fullmatch(rf"{re.escape(spec.table)}_p(\d{{4}})(\d{{2}})?", name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2) or 1), 1)
+
+
+def create_partition_sql(spec: PartitionSpec, start: date) -> str:
+    end = shift_period(spec, start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {spec.schema}.{partition_name(spec, start)} "
+        f"PARTITION OF {spec.qualified_name} FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+
+def partition_range(spec: PartitionSpec, first: date, last: date) -> List[Tuple[date, str]]:
+    """Секции, покрывающие [first; last] включительно"""
+    start = period_start(spec, first)
+    last_start = period_start(spec, last)
+    statements = []
+    while start <= last_start:
+        statements.append((start, create_partition_sql(spec, start)))
+        start = shift_period(spec, start, 1)
+    return statements
+
+
+async def _is_partitioned(conn: AsyncConnection, spec: PartitionSpec) -> bool:
+    result = await conn.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = :schema AND c.relname = :table)"
+        ),
+        {"schema": spec.schema, "table": spec.table},
+    )
+    return bool(result.scalar())
+
+
+async def _list_partitions(conn: AsyncConnection, spec: PartitionSpec) -> List[str]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "JOIN pg_namespace n ON n.oid = parent.relnamespace "
+            "WHERE n.nspname = :schema AND parent.relname = :table"
+        ),
+        {"schema": spec.schema, "table": spec.table},
+    )
+    return list(result.scalars().all())
+
+
+async def ensure_partitions(
+    conn: AsyncConnection, today: Optional[date] = None, premake: Optional[int] = None
+) -> None:
+    """Создаёт секции от текущего периода на premake периодов вперёд"""
+    today = today or date.today()
+    premake = settings.PARTITION_PREMAKE if premake is None else premake
+
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+
+    for spec in PARTITIONED_TABLES:
+        if not await _is_partitioned(conn, spec):
+            continue
+
+        current = period_start(spec, today)
+        for start, statement in partition_range(spec, current, shift_period(spec, current, premake)):
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(text(statement))
+            except DBAPIError as e:
+                # Обычно означает, что в секции по умолчанию уже есть строки этого периода
+                logger.error(f"Не удалось создать секцию {partition_name(spec, start)}: {e}")
+
+
+async def detach_expired_partitions(conn: AsyncConnection, today: Optional[date] = None) -> List[str]:
+    """Отсоединяет секции, целиком вышедшие за срок хранения"""
+    today = today or date.today()
+    detached = []
+
+    for spec in PARTITIONED_TABLES:
+        if spec.retention is None or not await _is_partitioned(conn, spec):
+            continue
+
+        cutoff = shift_period(spec, period_start(spec, today), -spec.retention)
+        for name in await _list_partitions(conn, spec):
+            start = _parse_partition_start(spec, name)
+            if start is None or shift_period(spec, start, 1) > cutoff:
+                continue
+
+            await conn.execute(text(f"ALTER TABLE {spec.qualified_name} DETACH PARTITION {spec.schema}.{name}"))
+            detached.append(f"{spec.schema}.{name}")
+
+    return detached
+
+
+async def maintain_partitions() -> None:
+    from app.database.database import engine
+
+    async with engine.begin() as conn:
+        await ensure_partitions(conn)
+        detached = await detach_expired_partitions(conn)
+
+    for name in detached:
+        logger.info(f"Секция {name} отсоединена по сроку хранения")
+
+
+if __name__ == "__main__":
+    asyncio.run(maintain_partitions())
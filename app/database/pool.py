@@ -0,0 +1,130 @@
+"""
+Пул соединений с учётом воркеров gunicorn и его статистика.
+
+Лимиты DB_POOL_SIZE / DB_MAX_OVERFLOW заданы на весь экземпляр приложения и
+делятся между воркерами (WEB_CONCURRENCY), чтобы число соединений с
+PostgreSQL не росло с числом воркеров.
+
+Статистика ведётся в каждом воркере отдельно: занятые соединения, overflow и
+гистограмма ожидания соединения из пула.
+"""
+
+import bisect
+import math
+import os
+import time
+from typing import Any, Dict, List
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import settings
+from app.modules.common.metrics import db_pool_timeouts, db_pool_wait
+
+# Границы корзин гистограммы ожидания соединения, мс
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def per_worker(total: int) -> int:
+    """Доля воркера в общем на экземпляр лимите соединений"""
+    return math.ceil(total / max(settings.WEB_CONCURRENCY, 1))
+
+
+class PoolWaitStats:
+    def __init__(self):
+        self.buckets: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, wait_ms: float) -> None:
+        self.buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+        self.count += 1
+        self.total_ms += wait_ms
+        self.max_ms = max(self.max_ms, wait_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Накопительные корзины, как в гистограммах Prometheus
+        cumulative, running = {}, 0
+        for bound, count in zip(list(WAIT_BUCKETS_MS) + ["+Inf"], self.buckets):
+            running += count
+            cumulative[str(bound)] = running
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "timeouts": self.timeouts,
+            "buckets_ms": cumulative,
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий ожидание свободного соединения"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.timeouts += 1
+            db_pool_timeouts.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_stats.observe(waited * 1000)
+            db_pool_wait.observe(waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+def engine_options() -> Dict[str, Any]:
+    """Параметры create_async_engine для пула и соединений"""
+    connect_args: Dict[str, Any] = {}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer в режиме transaction: соединение с сервером меняется между
+        # транзакциями, кэш подготовленных запросов asyncpg не переживает смену,
+        # имена подготовленных запросов должны быть уникальны
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    elif settings.DB_STATEMENT_TIMEOUT:
+        # Через PgBouncer параметры старта не передаются: таймаут задаётся
+        # ALTER ROLE ... SET statement_timeout
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)
+        }
+
+    return dict(
+        poolclass=InstrumentedPool,
+        pool_size=max(per_worker(settings.DB_POOL_SIZE), 1),
+        max_overflow=per_worker(settings.DB_MAX_OVERFLOW),
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+def pool_stats(pool: InstrumentedPool) -> Dict[str, Any]:
+    """Состояние пула текущего воркера"""
+    return {
+        "pid": os.getpid(),
+        "workers": settings.WEB_CONCURRENCY,
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "wait": pool.wait_stats.snapshot(),
+    }
@@ -0,0 +1,8 @@
+from redis import asyncio as aioredis
+
+from app.config import settings
+
+
+# Общий клиент Redis процесса: кэш ответов API (fastapi-cache), кэш сотрудников
+# и другие кэши. Соединения берутся из пула клиента по мере надобности
+redis_client = aioredis.from_url(settings.REDIS_URL)
@@ -0,0 +1,165 @@
+"""
+Чтение с реплики PostgreSQL.
+
+Если задан POSTGRES_REPLICA_HOST, запросы SELECT уходят на реплику:
+- в сессиях get_session_without_commit;
+- в любых сессиях GET/HEAD запросов (ReplicaRoutingMiddleware), в т.ч. в
+  обработчиках под @cache.
+
+На основную БД остаются запись, запросы после записи в той же сессии,
+session.connection(), текстовые запросы и запросы primary_only() (чтение,
+заполняющее кэш аутентификации). Отставание реплики проверяется не чаще
+DB_REPLICA_CHECK_INTERVAL: при отставании больше DB_REPLICA_MAX_LAG или
+недоступности реплики чтение идёт с основной БД.
+"""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import Select, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import alembic_database_url, settings
+from .pool import engine_options
+
+# Чтение с реплики для текущего запроса (ставится ReplicaRoutingMiddleware)
+_prefer_replica: ContextVar[bool] = ContextVar("prefer_replica", default=False)
+
+# Опция запроса: читать с основной БД и в сессии, читающей с реплики
+PRIMARY_ONLY = "primary_only"
+
+LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+def _create_replica_engine() -> Optional[AsyncEngine]:
+    if not settings.POSTGRES_REPLICA_HOST:
+        return None
+
+    url = alembic_database_url.set(
+        host=settings.POSTGRES_REPLICA_HOST,
+        port=settings.POSTGRES_REPLICA_PORT or alembic_database_url.port,
+    )
+    return create_async_engine(
+        url=url.render_as_string(hide_password=False),
+        plugins=["geoalchemy2"],
+        **engine_options(),
+    )
+
+
+replica_engine = _create_replica_engine()
+
+
+class ReplicaMonitor:
+    """Доступность и отставание реплики, проверка не чаще интервала"""
+
+    def __init__(self):
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def check(self) -> bool:
+        if replica_engine is None:
+            return False
+        if time.monotonic() - self._checked_at < settings.DB_REPLICA_CHECK_INTERVAL:
+            return self.healthy
+
+        # Блокировка создаётся лениво, чтобы она была привязана к работающему event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if time.monotonic() - self._checked_at < settings.DB_REPLICA_CHECK_INTERVAL:
+                return self.healthy
+
+            healthy = False
+            try:
+                async with replica_engine.connect() as conn:
+                    self.lag = float(await conn.scalar(LAG_QUERY))
+                healthy = self.lag <= settings.DB_REPLICA_MAX_LAG
+                if not healthy:
+                    logger.warning(
+                        f"Отставание реплики {self.lag:.1f} с, чтение с основной БД"
+                    )
+            except Exception as e:
+                self.lag = None
+                logger.warning(f"Реплика недоступна, чтение с основной БД: {e}")
+
+            if healthy and not self.healthy:
+                logger.info("Чтение с реплики включено")
+            self.healthy = healthy
+            self._checked_at = time.monotonic()
+
+        return self.healthy
+
+
+replica_monitor = ReplicaMonitor()
+
+
+def primary_only(statement: Select) -> Select:
+    """
+    Запрос всегда читается с основной БД. Для данных, которые заполняют кэш
+    после его сброса: с отстающей реплики в кэш вернулась бы старая строка
+    """
+    return statement.execution_options(**{PRIMARY_ONLY: True})
+
+
+class RoutingSession(Session):
+    """Сессия, отправляющая чтение на реплику, когда это безопасно"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            replica_engine is not None
+            and replica_monitor.healthy
+            and isinstance(clause, Select)
+            and not clause.get_execution_options().get(PRIMARY_ONLY)
+            and not self._flushing
+            and not self.info.get("wrote")
+            and (self.info.get("read_only") or _prefer_replica.get())
+        ):
+            return replica_engine.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    # После записи сессия читает только с основной БД (свои изменения)
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _on_execute(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+class ReplicaRoutingMiddleware:
+    """Помечает GET/HEAD запросы как допускающие чтение с реплики"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        await replica_monitor.check()
+        token = _prefer_replica.set(True)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _prefer_replica.reset(token)
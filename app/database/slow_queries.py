@@ -0,0 +1,215 @@
+"""
+Планы медленных запросов.
+
+Запросы дольше SLOW_QUERY_THRESHOLD_MS попадают в кольцевой буфер воркера
+(SLOW_QUERY_BUFFER_SIZE записей): маршрут, форма запроса, хэш параметров и
+длительность. Для доли SLOW_QUERY_SAMPLE_RATE читающих запросов (SELECT и
+WITH ... SELECT по таблицам без изменяющих CTE, FOR UPDATE / SHARE и функций
+с побочными эффектами) на отдельном соединении той же БД (основной или
+реплики) выполняется EXPLAIN (ANALYZE, BUFFERS) - не чаще раза в SLOW_QUERY_EXPLAIN_INTERVAL для
+одной формы запроса и не больше одного EXPLAIN одновременно. EXPLAIN ANALYZE
+выполняет запрос повторно: транзакция откатывается, время ограничено
+SLOW_QUERY_EXPLAIN_TIMEOUT.
+
+Значения параметров не сохраняются (персональные данные) - только хэш.
+Список - GET /api/v1/system/slow-queries.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import time
+from collections import deque
+from contextvars import Context
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.modules.common.profiling import current_route, statement_shape
+from .database import engine
+from .replica import replica_engine
+
+EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS) "
+
+
+@dataclass
+class SlowQuery:
+    shape: str
+    statement: str
+    route: str
+    params_hash: Optional[str]
+    duration_ms: float
+    captured_at: datetime
+    plan: Optional[str] = None
+
+
+def params_hash(parameters) -> Optional[str]:
+    if not parameters:
+        return None
+    return hashlib.sha1(repr(parameters).encode()).hexdigest()[:12]
+
+
+class SlowQueryLog:
+    def __init__(self):
+        self.entries: Deque[SlowQuery] = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+        self._explained_at: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _should_explain(self, entry: SlowQuery) -> bool:
+        if self._tasks or random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+            return False
+        now = time.monotonic()
+        last = self._explained_at.get(entry.shape)
+        if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+            return False
+        if len(self._explained_at) >= 10 * settings.SLOW_QUERY_BUFFER_SIZE:
+            self._explained_at.clear()
+        self._explained_at[entry.shape] = now
+        return True
+
+    def observe(self, sync_engine, statement: str, parameters, elapsed: float) -> None:
+        entry = SlowQuery(
+            shape=statement_shape(statement),
+            statement=statement,
+            route=current_route(),
+            params_hash=params_hash(parameters),
+            duration_ms=round(elapsed * 1000, 1),
+            captured_at=datetime.now(),
+        )
+        self.entries.append(entry)
+        logger.warning(
+            f"Медленный запрос {entry.duration_ms:.0f} мс ({entry.route}): "
+            f"{entry.shape[:500]}"
+        )
+
+        if not _is_explainable(statement) or not self._should_explain(entry):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Синхронный движок вне event loop (миграции) - без плана
+            return
+        # Пустой контекст: EXPLAIN не учитывается в профиле и бюджете HTTP-запроса
+        task = loop.create_task(
+            self._explain(sync_engine, entry, parameters), context=Context()
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, sync_engine, entry: SlowQuery, parameters) -> None:
+        target = (
+            replica_engine
+            if replica_engine is not None and sync_engine is replica_engine.sync_engine
+            else engine
+        )
+        timeout = int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT)
+        try:
+            async with target.connect() as conn:
+                await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+                result = await conn.exec_driver_sql(
+                    EXPLAIN_PREFIX + entry.statement, parameters
+                )
+                entry.plan = "\n".join(row[0] for row in result)
+                await conn.rollback()
+        except Exception as e:
+            logger.warning(f"Не удалось получить план медленного запроса: {e}")
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        """Формы запросов из буфера по суммарному времени, с последним планом"""
+        groups: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries:
+            group = groups.setdefault(
+                entry.shape,
+                {
+                    "statement": entry.shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": set(),
+                    "params_hash": None,
+                    "last_seen": None,
+                    "plan": None,
+                },
+            )
+            group["count"] += 1
+            group["total_ms"] += entry.duration_ms
+            group["routes"].add(entry.route)
+            group["last_seen"] = entry.captured_at
+            if entry.duration_ms >= group["max_ms"]:
+                group["max_ms"] = entry.duration_ms
+                group["params_hash"] = entry.params_hash
+            if entry.plan:
+                group["plan"] = entry.plan
+
+        offenders = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+        for group in offenders:
+            group["avg_ms"] = round(group["total_ms"] / group["count"], 1)
+            group["total_ms"] = round(group["total_ms"], 1)
+            group["routes"] = sorted(group["routes"])
+        return offenders[:limit]
+
+
+slow_query_log = SlowQueryLog()
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_MODIFYING = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+_LOCKING = re.compile(r"\bFOR\s+(UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)\b", re.IGNORECASE)
+# Функции с побочными эффектами: повторный вызов что-то блокирует или меняет
+_SIDE_EFFECTS = re.compile(
+    r"\b(pg_(try_)?advisory_\w+|nextval|setval|set_config|pg_notify"
+    r"|pg_cancel_backend|pg_terminate_backend)\s*\(",
+    re.IGNORECASE,
+)
+_FROM = re.compile(r"\bFROM\b", re.IGNORECASE)
+
+
+def _is_explainable(statement: str) -> bool:
+    """
+    Повторное выполнение под EXPLAIN ANALYZE безопасно: SELECT или WITH ...
+    SELECT (в т.ч. CTE территориального охвата), читающие таблицы, без
+    изменяющих CTE, блокировок строк (FOR UPDATE / SHARE) и функций с побочными
+    эффектами. SELECT без FROM - вызов функции (например,
+    pg_advisory_xact_lock при создании секций), он не повторяется
+    """
+    head = statement.lstrip()[:6].upper()
+    if head != "SELECT" and head[:4] != "WITH":
+        return False
+
+    code = _STRING_LITERAL.sub("''", statement)
+    if head[:4] == "WITH" and _MODIFYING.search(code):
+        return False
+    return (
+        _FROM.search(code) is not None
+        and _LOCKING.search(code) is None
+        and _SIDE_EFFECTS.search(code) is None
+    )
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if settings.SLOW_QUERY_THRESHOLD_MS and not executemany:
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("slow_query_started")
+    if executemany or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        slow_query_log.observe(conn.engine, statement, parameters, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("slow_query_started"):
+        conn.info["slow_query_started"].pop()
@@ -0,0 +1,149 @@
+"""
+Бюджет времени запросов к БД для обработчиков API.
+
+- Сессии из get_session_with_commit / get_session_without_commit получают
+  SET LOCAL statement_timeout: STATEMENT_TIMEOUTS[путь маршрута] или
+  DB_REQUEST_STATEMENT_TIMEOUT. Таймаут ставится на каждое соединение сессии,
+  в т.ч. на реплике.
+- Дополнительные сессии запроса (параллельное чтение, app/database/parallel.py)
+  получают тот же таймаут и отменяются вместе с основной (inherit_budget).
+- Если клиент отключился, выполняющийся запрос отменяется
+  (pg_cancel_backend; через PgBouncer - отменой задачи запроса, asyncpg
+  передаёт отмену серверу).
+- Превышение бюджета - ответ 503 с Retry-After.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager, contextmanager, suppress
+from typing import AsyncIterator, Iterator
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from .database import engine
+from .replica import RoutingSession, replica_engine
+
+# SQLSTATE query_canceled: statement_timeout или pg_cancel_backend
+QUERY_CANCELED = "57014"
+
+
+def is_query_canceled(error: BaseException) -> bool:
+    orig = getattr(error, "orig", None)
+    return getattr(orig, "sqlstate", None) == QUERY_CANCELED or (
+        getattr(orig, "pgcode", None) == QUERY_CANCELED
+    )
+
+
+def route_statement_timeout(request: Request) -> int:
+    """Бюджет маршрута, мс (0 - без ограничения)"""
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    return settings.STATEMENT_TIMEOUTS.get(path, settings.DB_REQUEST_STATEMENT_TIMEOUT)
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _after_begin(session, transaction, connection):
+    timeout = session.info.get("statement_timeout")
+    if timeout:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+    backends = session.info.get("backends")
+    if backends is not None and not settings.DB_PGBOUNCER:
+        driver_connection = connection.connection.driver_connection
+        backends.append((connection.engine, driver_connection.get_server_pid()))
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _after_transaction_end(session, transaction):
+    # Соединения вернулись в пул: их процессы больше не относятся к сессии
+    if transaction.parent is None and session.info.get("backends"):
+        session.info["backends"].clear()
+
+
+def _session_backends(session: AsyncSession) -> list:
+    backends = list(session.info.get("backends") or ())
+    for child in list(session.info.get("child_sessions") or ()):
+        backends.extend(child.info.get("backends") or ())
+    return backends
+
+
+async def _cancel_backends(session: AsyncSession) -> None:
+    for sync_engine, pid in _session_backends(session):
+        target = (
+            replica_engine
+            if replica_engine is not None and sync_engine is replica_engine.sync_engine
+            else engine
+        )
+        try:
+            async with target.connect() as conn:
+                await conn.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": pid})
+            logger.info(f"Запрос процесса {pid} отменён: клиент отключился")
+        except Exception as e:
+            logger.warning(f"Не удалось отменить запрос процесса {pid}: {e}")
+
+
+async def _watch_disconnect(
+    request: Request, session: AsyncSession, task: asyncio.Task
+) -> None:
+    while True:
+        await asyncio.sleep(settings.DB_DISCONNECT_POLL_INTERVAL)
+        if await request.is_disconnected():
+            if settings.DB_PGBOUNCER:
+                task.cancel()
+            else:
+                await _cancel_backends(session)
+            return
+
+
+@asynccontextmanager
+async def statement_budget(
+    session: AsyncSession, request: Request
+) -> AsyncIterator[AsyncSession]:
+    """Таймаут запросов маршрута и отмена запросов при отключении клиента"""
+    session.info["statement_timeout"] = route_statement_timeout(request)
+    session.info["backends"] = []
+
+    watcher = asyncio.create_task(
+        _watch_disconnect(request, session, asyncio.current_task())
+    )
+    try:
+        yield session
+    finally:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+
+
+@contextmanager
+def inherit_budget(parent: AsyncSession, session: AsyncSession) -> Iterator[AsyncSession]:
+    """
+    Таймаут и отмена при отключении клиента от сессии parent для другой сессии
+    того же запроса
+    """
+    session.info["statement_timeout"] = parent.info.get("statement_timeout")
+    session.info["read_only"] = parent.info.get("read_only", False)
+    session.info["backends"] = []
+    children = parent.info.setdefault("child_sessions", [])
+    children.append(session)
+    try:
+        yield session
+    finally:
+        children.remove(session)
+
+
+async def query_canceled_handler(request: Request, exc: DBAPIError):
+    """503 при превышении бюджета времени запроса, остальные ошибки БД - как раньше"""
+    if not is_query_canceled(exc):
+        raise exc
+
+    logger.warning(f"Превышен бюджет времени запроса {request.url.path}: {exc.orig}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Запрос выполняется слишком долго, повторите позже"},
+        headers={"Retry-After": str(settings.STATEMENT_TIMEOUT_RETRY_AFTER)},
+    )
@@ -0,0 +1,59 @@
+"""
+Конфигурация gunicorn для продакшена (Dockerfile):
+
+    gunicorn -c app/gunicorn_conf.py app.main:app
+
+Отладочный запуск (debugpy, --reload) - Dockerfile.local.
+
+Переменные окружения:
+- WEB_CONCURRENCY - число воркеров, по умолчанию по числу ядер;
+- BIND - адрес, по умолчанию 0.0.0.0:5000;
+- GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_MAX_REQUESTS;
+- PROMETHEUS_MULTIPROC_DIR - каталог метрик воркеров: GET /metrics отдаёт
+  сумму по всем воркерам, а не метрики одного из них.
+
+Пул соединений с БД (DB_POOL_SIZE / DB_MAX_OVERFLOW) делится между
+воркерами, см. app/database/pool.py.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+workers = int(os.getenv("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+# Воркеры читают число воркеров из окружения для расчёта своего пула
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+worker_class = "app.workers.ProductionUvicornWorker"
+
+# Приложение загружается в каждом воркере после fork: у каждого свой event
+# loop, свой пул соединений и свой клиент Redis
+preload_app = False
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Плановый перезапуск воркеров (по одному) против накопления памяти
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Метрики прошлого запуска не должны попасть в новые
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
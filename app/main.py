@@ -4,10 +4,24 @@ from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
+from sqlalchemy.exc import DBAPIError
 
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
-from redis import asyncio as aioredis
+
+from app.config import settings
+from app.database.database import engine
+from app.database.redis import redis_client
+from app.database.replica import ReplicaRoutingMiddleware
+from app.database.timeouts import query_canceled_handler
+from app.database.partitions import ensure_partitions
+from app.modules.common.monitoring import (
+    InstrumentedRedisBackend,
+    MetricsMiddleware,
+    runtime_sampler,
+)
+from app.modules.common.profiling import ProfilingMiddleware
+from app.modules.common.result_caps import ResultCapMiddleware
+from app.modules.ckf.live import live_receipts_feed
 
 from app.modules.ckf.router import router as router_ckf
 from app.modules.nsi.router import router as router_nsi
@@ -20,16 +34,33 @@ from app.modules.receipts_click.router import router as router_receipts_click
 from app.modules.egkn.router import router as router_egkn
 from app.modules.ckl.router import router as router_ckl
 from app.modules.product_analytics.router import router as router_product_analytics
+from app.modules.datasets.router import router as router_datasets
+from app.modules.ingest.router import router as router_ingest
+from app.modules.system.router import metrics_router
+from app.modules.system.router import router as router_system
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[dict, None]:
     """Управление жизненным циклом приложения."""
     logger.info("Инициализация приложения...")
-    redis = aioredis.from_url("redis://coc_redis")
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    FastAPICache.init(InstrumentedRedisBackend(redis_client), prefix="fastapi-cache")
+    if settings.PARTITIONS_ON_STARTUP:
+        await ensure_partitions_on_startup()
+    runtime_sampler.start()
     yield
     logger.info("Завершение работы приложения...")
+    await runtime_sampler.stop()
+    await live_receipts_feed.stop()
+
+
+async def ensure_partitions_on_startup() -> None:
+    """Создание секций временных рядов наперёд. Ошибка не мешает старту приложения."""
+    try:
+        async with engine.begin() as conn:
+            await ensure_partitions(conn)
+    except Exception as e:
+        logger.error(f"Не удалось создать секции таблиц: {e}")
 
 
 def register_routers(app: FastAPI) -> None:
@@ -59,6 +90,11 @@ def register_routers(app: FastAPI) -> None:
     app.include_router(router_receipts_click, prefix=global_prefix_v1)
     app.include_router(router_egkn, prefix=global_prefix_v1)
     app.include_router(router_product_analytics, prefix=global_prefix_v1)
+    app.include_router(router_datasets, prefix=global_prefix_v1)
+    app.include_router(router_ingest, prefix=global_prefix_v1)
+    app.include_router(router_system, prefix=global_prefix_v1)
+
+    app.include_router(metrics_router)
 
 
 def create_app() -> FastAPI:
@@ -88,8 +124,30 @@ def create_app() -> FastAPI:
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "X-Result-Truncated",
+            "X-Result-Limit",
+            "X-Next-Offset",
+            "Server-Timing",
+        ],
     )
 
+    # Заголовки об усечённых выборках (см. app/modules/common/result_caps.py)
+    app.add_middleware(ResultCapMiddleware)
+
+    # Чтение с реплики для GET/HEAD (см. app/database/replica.py)
+    app.add_middleware(ReplicaRoutingMiddleware)
+
+    # Время SQL/ClickHouse запроса: Server-Timing, лог, метрики (см.
+    # app/modules/common/profiling.py)
+    app.add_middleware(ProfilingMiddleware)
+
+    # Длительность и число запросов в обработке по маршрутам (GET /metrics)
+    app.add_middleware(MetricsMiddleware)
+
+    # Превышение бюджета времени запроса к БД - 503 (см. app/database/timeouts.py)
+    app.add_exception_handler(DBAPIError, query_canceled_handler)
+
     # Монтирование статических файлов
     app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -0,0 +1,114 @@
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from alembic_utils.replaceable_entity import register_entities
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_engine_from_config
+
+from app.config import alembic_database_url
+from app.database.deps import Base
+from app.database.functions import (
+    last_10_details_row_trigger,
+    last_10_details_sync,
+    last_10_details_truncate_trigger,
+    to_upper,
+)
+
+# Модели импортируются, чтобы их таблицы попали в Base.metadata
+import app.modules.admins.models  # noqa: F401
+import app.modules.ar.models  # noqa: F401
+import app.modules.auth.models  # noqa: F401
+import app.modules.ckf.models  # noqa: F401
+import app.modules.ckl.cargo.models  # noqa: F401
+import app.modules.ckl.common.models  # noqa: F401
+import app.modules.ckl.customs.models  # noqa: F401
+import app.modules.ckl.infra.models  # noqa: F401
+import app.modules.ckl.transport.models  # noqa: F401
+import app.modules.egkn.models  # noqa: F401
+import app.modules.ext.activs.models  # noqa: F401
+import app.modules.ext.kazgeodesy.models  # noqa: F401
+import app.modules.ext.minerals.models  # noqa: F401
+import app.modules.ext.mobile_data.models  # noqa: F401
+import app.modules.ext.okeds.models  # noqa: F401
+import app.modules.nsi.models  # noqa: F401
+import app.modules.orders.models  # noqa: F401
+import app.modules.product_analytics.models  # noqa: F401
+import app.modules.regions.models  # noqa: F401
+
+config = context.config
+config.set_main_option(
+    "sqlalchemy.url", alembic_database_url.render_as_string(hide_password=False)
+)
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+register_entities(
+    [
+        to_upper,
+        last_10_details_sync,
+        last_10_details_row_trigger,
+        last_10_details_truncate_trigger,
+    ]
+)
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Служебные таблицы PostGIS не управляются миграциями
+    if type_ == "table" and name in ("spatial_ref_sys",):
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_schemas=True,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_schemas=True,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    connectable = async_engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+        plugins=["geoalchemy2"],
+    )
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
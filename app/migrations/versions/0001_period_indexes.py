@@ -0,0 +1,46 @@
+"""Индексы по датам для фильтров периодов
+
+Revision ID: 0001_period_indexes
+Revises:
+Create Date: 2025-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_period_indexes"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя индекса, таблица, колонки)
+INDEXES = [
+    ("ix_fno_year_organization_id", "public.fno", "year, organization_id"),
+    ("ix_esf_seller_month_month_year_organization_id", "public.esf_seller_month", "month_year, organization_id"),
+    ("ix_esf_buyer_month_month_year_organization_id", "public.esf_buyer_month", "month_year, organization_id"),
+    ("ix_receipts_annual_year_kkms_id", "public.receipts_annual", "year, kkms_id"),
+    ("ix_receipts_daily_date_check_kkms_id", "public.receipts_daily", "date_check, kkms_id"),
+    ("ix_receipts_month_month_kkms_id", "public.receipts_month", "month, kkms_id"),
+    ("ix_kkms_szpt_month_kkms_id", "public.kkms_szpt", "month, kkms_id"),
+    ("ix_populations_date", "public.populations", "date"),
+    ("ix_nalog_postuplenie_month_ugd_id", "public.nalog_postuplenie", "month, ugd_id"),
+    ("ix_kaztelecom_mobile_data_date_hour_id", "ext.kaztelecom_mobile_data", "date, hour_id"),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            schema = table.split(".")[0]
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{name}")
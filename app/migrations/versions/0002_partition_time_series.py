@@ -0,0 +1,280 @@
+"""Секционирование чеков и мобильных данных по времени
+
+Revision ID: 0002_partition_time_series
+Revises: 0001_period_indexes
+Create Date: 2025-10-21 10:00:00.000000
+
+Данные переносятся в секционированные таблицы внутри транзакции миграции,
+на больших объёмах запускать в окно обслуживания. Ключ секционирования
+становится NOT NULL: строки с пустым ключом прерывают миграцию, их нужно
+исправить или удалить заранее.
+"""
+from typing import NamedTuple, Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_partition_time_series"
+down_revision: Union[str, None] = "0001_period_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+class _Spec(NamedTuple):
+    schema: str
+    table: str
+    column: str
+    # "month" или "year"
+    interval: str
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.schema}.{self.table}"
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.table}_default"
+
+
+# Схема секционирования на момент этой ревизии (текущая - app/database/partitions.py)
+TABLES = [
+    _Spec("public", "receipts", "operation_date", "month"),
+    _Spec("public", "receipts_daily", "date_check", "month"),
+    _Spec("public", "receipts_month", "month", "year"),
+    _Spec("ext", "kaztelecom_mobile_data", "date", "month"),
+]
+# Секций наперёд от текущего периода; дальше их создаёт python -m app.database.partitions
+PREMAKE = 3
+
+
+def _convert_to_partitioned_sql(spec: _Spec, premake: int) -> str:
+    """
+    Перевод обычной таблицы в секционированную (для миграции): таблица
+    переименовывается, создаётся секционированная копия структуры (LIKE
+    INCLUDING ALL без индексов) с секциями на весь диапазон данных плюс
+    premake периодов вперёд и секцией по умолчанию, данные переносятся,
+    индексы и внешние ключи пересоздаются на родительской таблице,
+    последовательность id переходит к новой таблице.
+
+    Первичный ключ и уникальные индексы секционированной таблицы обязаны
+    включать ключ секционирования: они пересоздаются как (столбцы..., ключ).
+    Ключ становится NOT NULL; если в нём есть пустые значения, а также для
+    уникальных индексов по выражениям и частичных миграция прерывается.
+    """
+    legacy = f"{spec.table}_legacy"
+    step = "1 year" if spec.interval == "year" else "1 month"
+    suffix_format = "YYYY" if spec.interval == "year" else "YYYYMM"
+
+    return f"""
+DO $$
+DECLARE
+    legacy_oid regclass;
+    index_defs text[];
+    unique_defs text[];
+    fk_defs text[];
+    ddl text;
+    column_list text;
+    seq_name text;
+    id_identity boolean;
+    null_rows bigint;
+    first_period date;
+    last_period date;
+    period date;
+BEGIN
+    ALTER TABLE {spec.qualified_name} RENAME TO {legacy};
+    legacy_oid := '{spec.schema}.{legacy}'::regclass;
+
+    SELECT count(*) INTO null_rows FROM {spec.schema}.{legacy} WHERE {spec.column} IS NULL;
+    IF null_rows > 0 THEN
+        RAISE EXCEPTION '{spec.qualified_name}: % строк с пустым {spec.column}, ключ секционирования должен быть заполнен',
+            null_rows;
+    END IF;
+    ALTER TABLE {spec.schema}.{legacy} ALTER COLUMN {spec.column} SET NOT NULL;
+
+    IF EXISTS (
+        SELECT 1 FROM pg_index
+        WHERE indrelid = legacy_oid AND indisunique AND (indexprs IS NOT NULL OR indpred IS NOT NULL)
+    ) THEN
+        RAISE EXCEPTION '{spec.qualified_name}: уникальные индексы по выражениям и частичные не переносятся';
+    END IF;
+
+    SELECT array_agg(pg_get_indexdef(indexrelid)) INTO index_defs
+    FROM pg_index
+    WHERE indrelid = legacy_oid AND NOT indisunique;
+
+    -- Первичный ключ, уникальные ограничения и индексы - с ключом секционирования
+    SELECT array_agg(
+        CASE c.contype
+            WHEN 'p' THEN format('ALTER TABLE {spec.qualified_name} ADD CONSTRAINT %I PRIMARY KEY (%s)', c.conname, k.column_names)
+            WHEN 'u' THEN format('ALTER TABLE {spec.qualified_name} ADD CONSTRAINT %I UNIQUE (%s)', c.conname, k.column_names)
+            ELSE format('CREATE UNIQUE INDEX %I ON {spec.qualified_name} (%s)', ic.relname, k.column_names)
+        END
+    )
+    INTO unique_defs
+    FROM pg_index i
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    LEFT JOIN pg_constraint c ON c.conindid = i.indexrelid AND c.conrelid = i.indrelid
+    CROSS JOIN LATERAL (
+        SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY ik.ord)
+            || CASE WHEN bool_or(a.attname = '{spec.column}') THEN '' ELSE ', {spec.column}' END AS column_names
+        FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS ik(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ik.attnum
+        WHERE ik.ord <= i.indnkeyatts
+    ) k
+    WHERE i.indrelid = legacy_oid AND i.indisunique;
+
+    SELECT array_agg(format('ALTER TABLE {spec.qualified_name} ADD CONSTRAINT %I %s', conname, pg_get_constraintdef(oid)))
+    INTO fk_defs
+    FROM pg_constraint
+    WHERE conrelid = legacy_oid AND contype = 'f';
+
+    SELECT pg_get_serial_sequence('{spec.schema}.{legacy}', 'id') INTO seq_name;
+
+    SELECT attidentity <> '' INTO id_identity
+    FROM pg_attribute
+    WHERE attrelid = legacy_oid AND attname = 'id';
+
+    -- Генерируемые столбцы вычисляются заново и не переносятся
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = legacy_oid AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+    CREATE TABLE {spec.qualified_name}
+        (LIKE {spec.schema}.{legacy} INCLUDING ALL EXCLUDING INDEXES)
+        PARTITION BY RANGE ({spec.column});
+
+    SELECT date_trunc('{spec.interval}', min({spec.column}))::date INTO first_period
+    FROM {spec.schema}.{legacy};
+    last_period := (date_trunc('{spec.interval}', now()) + interval '{step}' * {premake})::date;
+    period := coalesce(first_period, date_trunc('{spec.interval}', now())::date);
+
+    WHILE period <= last_period LOOP
+        EXECUTE format(
+            'CREATE TABLE {spec.schema}.%I PARTITION OF {spec.qualified_name} FOR VALUES FROM (%L) TO (%L)',
+            '{spec.table}_p' || to_char(period, '{suffix_format}'),
+            period,
+            (period + interval '{step}')::date
+        );
+        period := (period + interval '{step}')::date;
+    END LOOP;
+
+    CREATE TABLE {spec.schema}.{spec.default_partition} PARTITION OF {spec.qualified_name} DEFAULT;
+
+    EXECUTE format(
+        'INSERT INTO {spec.qualified_name} (%s) OVERRIDING SYSTEM VALUE SELECT %s FROM {spec.schema}.{legacy}',
+        column_list,
+        column_list
+    );
+
+    IF id_identity THEN
+        PERFORM setval(
+            pg_get_serial_sequence('{spec.qualified_name}', 'id'),
+            (SELECT coalesce(max(id), 0) + 1 FROM {spec.qualified_name}),
+            false
+        );
+    ELSIF seq_name IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY {spec.qualified_name}.id', seq_name);
+    END IF;
+
+    DROP TABLE {spec.schema}.{legacy};
+
+    IF unique_defs IS NOT NULL THEN
+        FOREACH ddl IN ARRAY unique_defs LOOP
+            EXECUTE ddl;
+        END LOOP;
+    END IF;
+
+    IF index_defs IS NOT NULL THEN
+        FOREACH ddl IN ARRAY index_defs LOOP
+            EXECUTE replace(ddl, ' ON {spec.schema}.{legacy} ', ' ON {spec.qualified_name} ');
+        END LOOP;
+    END IF;
+
+    IF fk_defs IS NOT NULL THEN
+        FOREACH ddl IN ARRAY fk_defs LOOP
+            EXECUTE ddl;
+        END LOOP;
+    END IF;
+END $$;
+"""
+
+
+def _convert_to_plain_sql(spec: _Spec) -> str:
+    """
+    Обратное преобразование в обычную таблицу (для downgrade миграции).
+    Уникальные индексы переносятся как есть (с ключом секционирования),
+    первичный ключ - снова по id
+    """
+    partitioned = f"{spec.table}_partitioned"
+
+    return f"""
+DO $$
+DECLARE
+    partitioned_oid regclass;
+    index_defs text[];
+    index_def text;
+    column_list text;
+    seq_name text;
+    id_identity boolean;
+BEGIN
+    ALTER TABLE {spec.qualified_name} RENAME TO {partitioned};
+    partitioned_oid := '{spec.schema}.{partitioned}'::regclass;
+
+    SELECT array_agg(pg_get_indexdef(indexrelid)) INTO index_defs
+    FROM pg_index
+    WHERE indrelid = partitioned_oid AND NOT indisprimary;
+
+    SELECT pg_get_serial_sequence('{spec.schema}.{partitioned}', 'id') INTO seq_name;
+
+    SELECT attidentity <> '' INTO id_identity
+    FROM pg_attribute
+    WHERE attrelid = partitioned_oid AND attname = 'id';
+
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO column_list
+    FROM pg_attribute
+    WHERE attrelid = partitioned_oid AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+    CREATE TABLE {spec.qualified_name}
+        (LIKE {spec.schema}.{partitioned} INCLUDING ALL EXCLUDING INDEXES);
+    ALTER TABLE {spec.qualified_name} ADD PRIMARY KEY (id);
+
+    EXECUTE format(
+        'INSERT INTO {spec.qualified_name} (%s) OVERRIDING SYSTEM VALUE SELECT %s FROM {spec.schema}.{partitioned}',
+        column_list,
+        column_list
+    );
+
+    IF id_identity THEN
+        PERFORM setval(
+            pg_get_serial_sequence('{spec.qualified_name}', 'id'),
+            (SELECT coalesce(max(id), 0) + 1 FROM {spec.qualified_name}),
+            false
+        );
+    ELSIF seq_name IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY {spec.qualified_name}.id', seq_name);
+    END IF;
+
+    DROP TABLE {spec.schema}.{partitioned} CASCADE;
+
+    IF index_defs IS NOT NULL THEN
+        FOREACH index_def IN ARRAY index_defs LOOP
+            EXECUTE replace(
+                replace(index_def, ' ON ONLY {spec.schema}.{partitioned} ', ' ON {spec.qualified_name} '),
+                ' ON {spec.schema}.{partitioned} ',
+                ' ON {spec.qualified_name} '
+            );
+        END LOOP;
+    END IF;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    for spec in TABLES:
+        op.execute(_convert_to_partitioned_sql(spec, premake=PREMAKE))
+
+
+def downgrade() -> None:
+    for spec in reversed(TABLES):
+        op.execute(_convert_to_plain_sql(spec))
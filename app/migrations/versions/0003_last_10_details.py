@@ -0,0 +1,151 @@
+"""Витрина последних чеков last_10_details
+
+Revision ID: 0003_last_10_details
+Revises: 0002_partition_time_series
+Create Date: 2025-10-22 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_last_10_details"
+down_revision: Union[str, None] = "0002_partition_time_series"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Определения на момент этой ревизии; текущие - в app/database/functions.py
+last_10_details_sync = PGFunction(
+    schema="public",
+    signature="last_10_details_sync()",
+    definition="""
+  RETURNS trigger AS
+  $$
+  BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+      TRUNCATE public.last_10_details;
+      RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+      DELETE FROM public.last_10_details
+      WHERE kkms_id = OLD.kkms_id AND fiskal_sign IS NOT DISTINCT FROM OLD.fiskal_sign;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      INSERT INTO public.last_10_details (
+        receipt_id, kkms_id, organization_id, fiskal_sign, operation_date,
+        reg_number, serial_number, address, name_ru,
+        item_name, item_price, item_count, item_nds, full_item_price, payment_type
+      )
+      SELECT
+        r.id, NEW.kkms_id, k.organization_id, NEW.fiskal_sign, NEW.operation_date,
+        k.reg_number, k.serial_number, k.address, o.name_ru,
+        r.item_name, r.item_price, r.item_count, r.item_nds, r.full_item_price, r.payment_type
+      FROM public.receipts r
+      JOIN public.kkms k ON k.id = r.kkms_id
+      JOIN public.organizations o ON o.id = k.organization_id
+      WHERE r.kkms_id = NEW.kkms_id AND r.fiskal_sign = NEW.fiskal_sign
+      ON CONFLICT (receipt_id) DO NOTHING;
+    END IF;
+
+    RETURN NULL;
+  END;
+  $$ LANGUAGE plpgsql;
+  """,
+)
+
+last_10_details_row_trigger = PGTrigger(
+    schema="public",
+    signature="last_10_details_row_sync",
+    on_entity="public.last_10",
+    is_constraint=False,
+    definition="""
+  AFTER INSERT OR UPDATE OR DELETE ON public.last_10
+  FOR EACH ROW EXECUTE FUNCTION public.last_10_details_sync()
+  """,
+)
+
+last_10_details_truncate_trigger = PGTrigger(
+    schema="public",
+    signature="last_10_details_truncate_sync",
+    on_entity="public.last_10",
+    is_constraint=False,
+    definition="""
+  AFTER TRUNCATE ON public.last_10
+  FOR EACH STATEMENT EXECUTE FUNCTION public.last_10_details_sync()
+  """,
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "last_10_details",
+        sa.Column("receipt_id", sa.BigInteger(), primary_key=True, comment="ID позиции чека"),
+        sa.Column("kkms_id", sa.BigInteger(), nullable=False, comment="ККМ ID"),
+        sa.Column("organization_id", sa.Integer(), nullable=True, comment="Организация"),
+        sa.Column("fiskal_sign", sa.BigInteger(), nullable=True, comment="Фискальный признак"),
+        sa.Column("operation_date", sa.DateTime(), nullable=False, comment="Дата операции"),
+        sa.Column("reg_number", sa.String(), nullable=True, comment="Регистрационный номер ККМ"),
+        sa.Column("serial_number", sa.String(), nullable=True, comment="Заводской номер ККМ"),
+        sa.Column("address", sa.String(), nullable=True, comment="Адрес"),
+        sa.Column("name_ru", sa.String(), nullable=True, comment="Наименование организации"),
+        sa.Column("item_name", sa.String(), nullable=True, comment="Наименование товара"),
+        sa.Column("item_price", sa.Float(), nullable=True, comment="Цена товара"),
+        sa.Column("item_count", sa.Float(), nullable=True, comment="Количество товара"),
+        sa.Column("item_nds", sa.Float(), nullable=True, comment="НДС"),
+        sa.Column("full_item_price", sa.Float(), nullable=True, comment="Итог"),
+        sa.Column("payment_type", sa.Integer(), nullable=True, comment="Вид оплаты"),
+        comment="Позиции чеков из last_10 с данными ККМ и организации. Поддерживается триггером на last_10",
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_last_10_details_kkms_id_operation_date",
+        "last_10_details",
+        ["kkms_id", "operation_date"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_last_10_details_organization_id_operation_date",
+        "last_10_details",
+        ["organization_id", "operation_date"],
+        if_not_exists=True,
+    )
+
+    op.create_entity(last_10_details_sync)
+    op.create_entity(last_10_details_row_trigger)
+    op.create_entity(last_10_details_truncate_trigger)
+
+    op.execute(
+        """
+        INSERT INTO public.last_10_details (
+            receipt_id, kkms_id, organization_id, fiskal_sign, operation_date,
+            reg_number, serial_number, address, name_ru,
+            item_name, item_price, item_count, item_nds, full_item_price, payment_type
+        )
+        SELECT
+            r.id, l.kkms_id, k.organization_id, l.fiskal_sign, l.operation_date,
+            k.reg_number, k.serial_number, k.address, o.name_ru,
+            r.item_name, r.item_price, r.item_count, r.item_nds, r.full_item_price, r.payment_type
+        FROM public.last_10 l
+        JOIN public.receipts r ON r.kkms_id = l.kkms_id AND r.fiskal_sign = l.fiskal_sign
+            -- День чека: поиск только в секции receipts этого дня
+            AND r.operation_date >= date_trunc('day', l.operation_date)
+            AND r.operation_date < date_trunc('day', l.operation_date) + interval '1 day'
+        JOIN public.kkms k ON k.id = l.kkms_id
+        JOIN public.organizations o ON o.id = k.organization_id
+        ON CONFLICT (receipt_id) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_entity(last_10_details_truncate_trigger)
+    op.drop_entity(last_10_details_row_trigger)
+    op.drop_entity(last_10_details_sync)
+    op.drop_table("last_10_details")
@@ -0,0 +1,111 @@
+"""Слепые индексы ИИН и ФИО в admin.dic_fl
+
+Revision ID: 0004_dic_fl_blind_index
+Revises: 0003_last_10_details
+Create Date: 2025-10-29 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.modules.common.encryption import blind_index, decrypt_personal_data
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_dic_fl_blind_index"
+down_revision: Union[str, None] = "0003_last_10_details"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+NAME_COLUMNS = ("surname", "name", "patronymic")
+
+
+def _backfill() -> None:
+    """Заполнить индексы существующих записей: расшифровка идёт в Python"""
+    bind = op.get_bind()
+    update = sa.text(
+        "UPDATE admin.dic_fl SET iin_bidx = :iin_bidx, surname_bidx = :surname_bidx, "
+        "name_bidx = :name_bidx, patronymic_bidx = :patronymic_bidx WHERE id = :id"
+    ).bindparams(
+        *(
+            sa.bindparam(f"{column}_bidx", type_=postgresql.ARRAY(sa.Text))
+            for column in NAME_COLUMNS
+        )
+    )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, iin, surname, name, patronymic FROM admin.dic_fl "
+                "WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+
+        bind.execute(
+            update,
+            [
+                {
+                    "id": row.id,
+                    "iin_bidx": blind_index.iin(decrypt_personal_data(row.iin)),
+                    **{
+                        f"{column}_bidx": blind_index.name_tokens(
+                            decrypt_personal_data(getattr(row, column))
+                        )
+                        for column in NAME_COLUMNS
+                    },
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column(
+        "dic_fl",
+        sa.Column("iin_bidx", sa.String(32), nullable=True, comment="HMAC ИИН"),
+        schema="admin",
+    )
+    for column, comment in zip(NAME_COLUMNS, ("фамилии", "имени", "отчества")):
+        op.add_column(
+            "dic_fl",
+            sa.Column(
+                f"{column}_bidx",
+                postgresql.ARRAY(sa.Text),
+                nullable=True,
+                comment=f"HMAC триграмм {comment}",
+            ),
+            schema="admin",
+        )
+
+    _backfill()
+
+    op.create_index(
+        "ix_dic_fl_iin_bidx", "dic_fl", ["iin_bidx"], schema="admin", if_not_exists=True
+    )
+    for column in NAME_COLUMNS:
+        op.create_index(
+            f"ix_dic_fl_{column}_bidx",
+            "dic_fl",
+            [f"{column}_bidx"],
+            schema="admin",
+            postgresql_using="gin",
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    for column in NAME_COLUMNS:
+        op.drop_index(f"ix_dic_fl_{column}_bidx", table_name="dic_fl", schema="admin")
+        op.drop_column("dic_fl", f"{column}_bidx", schema="admin")
+    op.drop_index("ix_dic_fl_iin_bidx", table_name="dic_fl", schema="admin")
+    op.drop_column("dic_fl", "iin_bidx", schema="admin")
@@ -0,0 +1,129 @@
+"""Агрегаты чеков для дашбордов (rollup)
+
+Revision ID: 0005_receipts_rollups
+Revises: 0004_dic_fl_blind_index
+Create Date: 2025-10-30 10:00:00.000000
+
+Миграция только создаёт таблицы. Первичное заполнение и дальнейший пересчёт
+после загрузки чеков - командой (до её запуска дашборды отдают нули):
+
+    python -m app.modules.ckf.rollups
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_receipts_rollups"
+down_revision: Union[str, None] = "0004_dic_fl_blind_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _shape(name: str, comment: str) -> sa.Column:
+    # GiST-индексы создаются явно ниже
+    return sa.Column(
+        name,
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=False),
+        nullable=True,
+        comment=comment,
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "receipts_month_rollup",
+        sa.Column("kkms_id", sa.BigInteger(), nullable=False, comment="ККМ"),
+        sa.Column("organization_id", sa.Integer(), nullable=True, comment="Организация"),
+        sa.Column("oblast_id", sa.Integer(), nullable=True, comment="Область"),
+        sa.Column("raion_id", sa.Integer(), nullable=True, comment="Район"),
+        sa.Column("month", sa.Date(), nullable=False, comment="Первый день месяца"),
+        sa.Column("year", sa.Integer(), nullable=False, comment="Год"),
+        sa.Column("check_sum", sa.Numeric(), nullable=True, comment="Общая сумма"),
+        sa.Column("check_count", sa.BigInteger(), nullable=True, comment="Количество чеков"),
+        sa.Column(
+            "source_rows",
+            sa.BigInteger(),
+            nullable=True,
+            comment="Строк receipts_month с заполненным количеством чеков",
+        ),
+        sa.Column("kkm_active", sa.Boolean(), nullable=False, comment="ККМ не снята с учёта"),
+        sa.Column(
+            "organization_active", sa.Boolean(), nullable=False, comment="Организация не снята с учёта"
+        ),
+        _shape("kkm_shape", "Геометрия ККМ"),
+        _shape("organization_shape", "Геометрия организации"),
+        sa.PrimaryKeyConstraint("kkms_id", "month"),
+        comment="Агрегаты чеков по ККМ за месяц",
+        if_not_exists=True,
+    )
+    # Таблица могла быть создана приложением (create_all) до появления source_rows
+    op.execute("ALTER TABLE receipts_month_rollup ADD COLUMN IF NOT EXISTS source_rows bigint")
+    for name, columns in (
+        ("ix_receipts_month_rollup_year_month", ["year", "month"]),
+        ("ix_receipts_month_rollup_oblast_month", ["oblast_id", "month"]),
+        ("ix_receipts_month_rollup_raion_month", ["raion_id", "month"]),
+        ("ix_receipts_month_rollup_organization_month", ["organization_id", "month"]),
+    ):
+        op.create_index(name, "receipts_month_rollup", columns, if_not_exists=True)
+
+    op.create_table(
+        "kkms_szpt_month_rollup",
+        sa.Column("kkms_id", sa.BigInteger(), nullable=False, comment="ККМ"),
+        sa.Column("szpt_id", sa.Integer(), nullable=False, comment="СЗПТ"),
+        sa.Column("oblast_id", sa.Integer(), nullable=True, comment="Область"),
+        sa.Column("raion_id", sa.Integer(), nullable=True, comment="Район"),
+        sa.Column("month", sa.Date(), nullable=False, comment="Первый день месяца"),
+        sa.Column("year", sa.Integer(), nullable=False, comment="Год"),
+        sa.Column("szpt_sum", sa.Numeric(), nullable=True, comment="Сумма продаж"),
+        sa.Column("szpt_count", sa.Numeric(), nullable=True, comment="Количество (без NaN)"),
+        _shape("kkm_shape", "Геометрия ККМ"),
+        sa.PrimaryKeyConstraint("kkms_id", "szpt_id", "month"),
+        comment="Агрегаты продаж СЗПТ по ККМ за месяц",
+        if_not_exists=True,
+    )
+    for name, columns in (
+        ("ix_kkms_szpt_month_rollup_year_szpt", ["year", "szpt_id"]),
+        ("ix_kkms_szpt_month_rollup_oblast_month", ["oblast_id", "month"]),
+        ("ix_kkms_szpt_month_rollup_raion_month", ["raion_id", "month"]),
+    ):
+        op.create_index(name, "kkms_szpt_month_rollup", columns, if_not_exists=True)
+
+    op.create_table(
+        "receipts_kkm_rollup",
+        sa.Column("kkms_id", sa.BigInteger(), primary_key=True, comment="ККМ"),
+        sa.Column("organization_id", sa.Integer(), nullable=True, comment="Организация"),
+        sa.Column("iin_bin", sa.String(), nullable=True, comment="ИИН/БИН"),
+        sa.Column("reg_number", sa.String(), nullable=True, comment="Регистрационный номер ККМ"),
+        sa.Column("oblast_id", sa.Integer(), nullable=True, comment="Область"),
+        sa.Column("raion_id", sa.Integer(), nullable=True, comment="Район"),
+        sa.Column("daily_sum", sa.Numeric(), nullable=True, comment="Сумма за день"),
+        sa.Column("daily_count", sa.BigInteger(), nullable=True, comment="Чеков за день"),
+        sa.Column("annual_sum", sa.Numeric(), nullable=True, comment="Сумма за год"),
+        sa.Column("annual_count", sa.BigInteger(), nullable=True, comment="Чеков за год"),
+        sa.Column("kkm_active", sa.Boolean(), nullable=False, comment="ККМ не снята с учёта"),
+        _shape("kkm_shape", "Геометрия ККМ"),
+        comment="Дневные и годовые итоги чеков по ККМ",
+        if_not_exists=True,
+    )
+    op.create_index("ix_receipts_kkm_rollup_oblast", "receipts_kkm_rollup", ["oblast_id"], if_not_exists=True)
+    op.create_index("ix_receipts_kkm_rollup_raion", "receipts_kkm_rollup", ["raion_id"], if_not_exists=True)
+
+    for table, column in (
+        ("receipts_month_rollup", "kkm_shape"),
+        ("receipts_month_rollup", "organization_shape"),
+        ("kkms_szpt_month_rollup", "kkm_shape"),
+        ("receipts_kkm_rollup", "kkm_shape"),
+    ):
+        op.create_index(
+            f"idx_{table}_{column}", table, [column], postgresql_using="gist", if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("receipts_kkm_rollup")
+    op.drop_table("kkms_szpt_month_rollup")
+    op.drop_table("receipts_month_rollup")
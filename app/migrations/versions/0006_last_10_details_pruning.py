@@ -0,0 +1,112 @@
+"""Триггер last_10_details: поиск позиций в одной секции receipts
+
+Revision ID: 0006_last_10_details_pruning
+Revises: 0005_receipts_rollups
+Create Date: 2025-10-31 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from alembic_utils.pg_function import PGFunction
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_last_10_details_pruning"
+down_revision: Union[str, None] = "0005_receipts_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Определение этой ревизии - с ограничением по дню operation_date
+last_10_details_sync = PGFunction(
+    schema="public",
+    signature="last_10_details_sync()",
+    definition="""
+  RETURNS trigger AS
+  $$
+  BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+      TRUNCATE public.last_10_details;
+      RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+      DELETE FROM public.last_10_details
+      WHERE kkms_id = OLD.kkms_id AND fiskal_sign IS NOT DISTINCT FROM OLD.fiskal_sign;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      INSERT INTO public.last_10_details (
+        receipt_id, kkms_id, organization_id, fiskal_sign, operation_date,
+        reg_number, serial_number, address, name_ru,
+        item_name, item_price, item_count, item_nds, full_item_price, payment_type
+      )
+      SELECT
+        r.id, NEW.kkms_id, k.organization_id, NEW.fiskal_sign, NEW.operation_date,
+        k.reg_number, k.serial_number, k.address, o.name_ru,
+        r.item_name, r.item_price, r.item_count, r.item_nds, r.full_item_price, r.payment_type
+      FROM public.receipts r
+      JOIN public.kkms k ON k.id = r.kkms_id
+      JOIN public.organizations o ON o.id = k.organization_id
+      WHERE r.kkms_id = NEW.kkms_id AND r.fiskal_sign = NEW.fiskal_sign
+        -- receipts секционирована по operation_date: граница по дню чека
+        -- оставляет для поиска одну секцию
+        AND r.operation_date >= date_trunc('day', NEW.operation_date)
+        AND r.operation_date < date_trunc('day', NEW.operation_date) + interval '1 day'
+      ON CONFLICT (receipt_id) DO NOTHING;
+    END IF;
+
+    RETURN NULL;
+  END;
+  $$ LANGUAGE plpgsql;
+  """,
+)
+
+# Определение из 0003_last_10_details - без ограничения по operation_date
+last_10_details_sync_0003 = PGFunction(
+    schema="public",
+    signature="last_10_details_sync()",
+    definition="""
+  RETURNS trigger AS
+  $$
+  BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+      TRUNCATE public.last_10_details;
+      RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+      DELETE FROM public.last_10_details
+      WHERE kkms_id = OLD.kkms_id AND fiskal_sign IS NOT DISTINCT FROM OLD.fiskal_sign;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      INSERT INTO public.last_10_details (
+        receipt_id, kkms_id, organization_id, fiskal_sign, operation_date,
+        reg_number, serial_number, address, name_ru,
+        item_name, item_price, item_count, item_nds, full_item_price, payment_type
+      )
+      SELECT
+        r.id, NEW.kkms_id, k.organization_id, NEW.fiskal_sign, NEW.operation_date,
+        k.reg_number, k.serial_number, k.address, o.name_ru,
+        r.item_name, r.item_price, r.item_count, r.item_nds, r.full_item_price, r.payment_type
+      FROM public.receipts r
+      JOIN public.kkms k ON k.id = r.kkms_id
+      JOIN public.organizations o ON o.id = k.organization_id
+      WHERE r.kkms_id = NEW.kkms_id AND r.fiskal_sign = NEW.fiskal_sign
+      ON CONFLICT (receipt_id) DO NOTHING;
+    END IF;
+
+    RETURN NULL;
+  END;
+  $$ LANGUAGE plpgsql;
+  """,
+)
+
+
+def upgrade() -> None:
+    op.replace_entity(last_10_details_sync)
+
+
+def downgrade() -> None:
+    op.replace_entity(last_10_details_sync_0003)
@@ -7,6 +7,11 @@ from fastapi import Security
 
 from app.modules.admins.repository import EmployeesRepo
 from app.modules.admins.models import Employees
+from app.modules.admins.principal import (
+    EmployeePrincipal,
+    principal_cache,
+    verified_tokens,
+)
 from app.config import settings
 from app.database.deps import get_session_without_commit
 
@@ -77,12 +82,11 @@ async def check_employee_refresh_token(
         )
 
 
-async def get_current_employee(
-    credentials: HTTPAuthorizationCredentials = Security(security),
-    session: AsyncSession = Depends(get_session_without_commit),
-) -> Employees:
-    """Получить текущего сотрудника по Bearer токену из headers"""
-    token = credentials.credentials
+def _verify_access_token(token: str) -> int:
+    """Проверить подпись и срок Bearer токена, вернуть ID сотрудника"""
+    employee_id = verified_tokens.get(token)
+    if employee_id is not None:
+        return employee_id
 
     try:
         payload = jwt.decode(
@@ -110,11 +114,28 @@ async def get_current_employee(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Некорректный токен"
         )
 
-    employee = await EmployeesRepo(session).get_one_by_id(int(employee_id))
-    if not employee:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Сотрудник не найден"
-        )
+    verified_tokens.set(token, int(employee_id), int(expire))
+    return int(employee_id)
+
+
+async def get_current_employee(
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    session: AsyncSession = Depends(get_session_without_commit),
+) -> EmployeePrincipal:
+    """
+    Получить текущего сотрудника по Bearer токену из headers. Сотрудник
+    берётся из кэша аутентификации (app/modules/admins/principal.py)
+    """
+    employee_id = _verify_access_token(credentials.credentials)
+
+    employee = await principal_cache.get(employee_id)
+    if employee is None:
+        employee = await EmployeesRepo(session).get_principal_by_id(employee_id)
+        if not employee:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Сотрудник не найден"
+            )
+        await principal_cache.set(employee_id, employee)
 
     if employee.deleted:
         raise HTTPException(
@@ -130,8 +151,8 @@ async def get_current_employee(
 
 
 async def get_current_admin_employee(
-    current_employee: Employees = Depends(get_current_employee),
-) -> Employees:
+    current_employee: EmployeePrincipal = Depends(get_current_employee),
+) -> EmployeePrincipal:
     """Проверяем права сотрудника как администратора"""
     if current_employee.role in [3]:
         return current_employee
@@ -2,6 +2,9 @@ from typing import Optional
 from datetime import datetime
 from fastapi_filter import FilterDepends, with_prefix
 from fastapi_filter.contrib.sqlalchemy import Filter
+from sqlalchemy import Select
+
+from app.modules.common.encrypted_types import blind_match
 from .models import DicIndicators, Employees, DicUl, DicRoles, DicFl
 
 
@@ -29,6 +32,10 @@ class DicRolesFilter(Filter):
         search_model_fields = ["role_name"]
 
 
+# Зашифрованные поля ищутся по слепым индексам, а не сравнением с колонкой
+DIC_FL_ENCRYPTED_FIELDS = ("iin", "surname", "name", "patronymic")
+
+
 class DicFlFilter(Filter):
     id: Optional[int] = None
     iin: Optional[str] = None
@@ -42,6 +49,18 @@ class DicFlFilter(Filter):
         model = DicFl
         search_model_fields = ["surname", "name", "iin"]
 
+    def filter(self, query: Select) -> Select:
+        encrypted = {
+            field: getattr(self, field)
+            for field in DIC_FL_ENCRYPTED_FIELDS
+            if getattr(self, field) is not None
+        }
+        plain = self.model_copy(update={field: None for field in encrypted})
+        query = super(DicFlFilter, plain).filter(query)
+        for field, value in encrypted.items():
+            query = query.filter(blind_match(getattr(DicFl, field), value))
+        return query
+
 
 class EmployeesFilter(Filter):
     id: Optional[int] = None
@@ -1,12 +1,17 @@
 from __future__ import annotations
-from typing import Optional
+from typing import List, Optional
 from app.modules.ext.kazgeodesy.models import KazgeodesyRkOblasti, KazgeodesyRkRaiony
-from sqlalchemy import ForeignKey, BigInteger, Integer, Text, func, Date
+from sqlalchemy import ForeignKey, BigInteger, Index, Integer, String, Text, func, Date
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import date, datetime
 
 from app.modules.common.models import BasestModel
-from app.modules.common.encrypted_types import EncryptedIIN, EncryptedPersonName
+from app.modules.common.encrypted_types import (
+    EncryptedIIN,
+    EncryptedPersonName,
+    track_blind_indexes,
+)
 
 
 class DicUl(BasestModel):
@@ -60,9 +65,16 @@ class DicRoles(BasestModel):
     description: Mapped[Optional[str]] = mapped_column(Text, comment="Описание")
 
 
+@track_blind_indexes
 class DicFl(BasestModel):
     __tablename__ = "dic_fl"
-    __table_args__ = dict(schema="admin", comment="Справочник физических лиц")
+    __table_args__ = (
+        Index("ix_dic_fl_iin_bidx", "iin_bidx"),
+        Index("ix_dic_fl_surname_bidx", "surname_bidx", postgresql_using="gin"),
+        Index("ix_dic_fl_name_bidx", "name_bidx", postgresql_using="gin"),
+        Index("ix_dic_fl_patronymic_bidx", "patronymic_bidx", postgresql_using="gin"),
+        dict(schema="admin", comment="Справочник физических лиц"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
 
@@ -79,6 +91,20 @@ class DicFl(BasestModel):
         EncryptedPersonName(), comment="Отчество (зашифровано)"
     )
 
+    # Слепые индексы для поиска (заполняются при сохранении, см. encrypted_types)
+    iin_bidx: Mapped[Optional[str]] = mapped_column(
+        String(32), comment="HMAC ИИН"
+    )
+    surname_bidx: Mapped[Optional[List[str]]] = mapped_column(
+        ARRAY(Text), comment="HMAC триграмм фамилии"
+    )
+    name_bidx: Mapped[Optional[List[str]]] = mapped_column(
+        ARRAY(Text), comment="HMAC триграмм имени"
+    )
+    patronymic_bidx: Mapped[Optional[List[str]]] = mapped_column(
+        ARRAY(Text), comment="HMAC триграмм отчества"
+    )
+
     deleted: Mapped[Optional[bool]] = mapped_column(comment="Удален", default=False)
     blocked: Mapped[Optional[bool]] = mapped_column(
         comment="Заблокирован", default=False
@@ -0,0 +1,169 @@
+"""
+Кэш данных аутентификации: проверенные JWT, сотрудники и их территории.
+
+Двухуровневый кэш: словарь процесса с коротким TTL и Redis с более длинным.
+На горячем пути get_current_employee не обращается к PostgreSQL.
+
+Сброс:
+- сотрудник - при изменении и удалении (EmployeesRepo), в т.ч. блокировке и
+  смене роли;
+- территория - при изменении и удалении организации (DicUlRepo).
+
+Запись сбрасывается при изменении и ещё раз после коммита транзакции
+(invalidate_on_commit): иначе конкурентный запрос может прочитать ещё не
+изменённую строку и вернуть её в Redis на PRINCIPAL_CACHE_REDIS_TTL.
+
+Redis сбрасывается сразу, копии в других процессах живут не дольше
+PRINCIPAL_CACHE_TTL. Недоступность Redis не мешает аутентификации: данные
+читаются из PostgreSQL.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Generic, Optional, Tuple, Type, TypeVar
+
+from loguru import logger
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.deps import on_commit
+from app.database.redis import redis_client
+from app.modules.common.metrics import redis_command_duration
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class EmployeePrincipal(BaseModel):
+    """Сотрудник, от имени которого выполняется запрос"""
+
+    id: int
+    login: Optional[str] = None
+    role: Optional[int] = None
+    fl_id: Optional[int] = None
+    ul_id: Optional[int] = None
+    deleted: Optional[bool] = None
+    blocked: Optional[bool] = None
+    employee_position: Optional[str] = None
+    employee_department: Optional[str] = None
+    employee_status: Optional[str] = None
+
+
+class TerritoryScope(BaseModel):
+    """Территория организации сотрудника"""
+
+    territory_level: str
+    territory_id: int
+    territory_name: str
+    territory_geom_wkt: Optional[str] = None
+
+
+class TieredCache(Generic[T]):
+    def __init__(self, namespace: str, model: Type[T]):
+        self.namespace = namespace
+        self.model = model
+        self._local: "OrderedDict[int, Tuple[float, T]]" = OrderedDict()
+
+    def _redis_key(self, key: int) -> str:
+        return f"principal:{self.namespace}:{key}"
+
+    def _set_local(self, key: int, value: T) -> None:
+        if settings.PRINCIPAL_CACHE_TTL <= 0:
+            return
+        self._local[key] = (time.monotonic() + settings.PRINCIPAL_CACHE_TTL, value)
+        self._local.move_to_end(key)
+        while len(self._local) > settings.PRINCIPAL_CACHE_SIZE:
+            self._local.popitem(last=False)
+
+    async def get(self, key: int) -> Optional[T]:
+        cached = self._local.get(key)
+        if cached is not None:
+            expires_at, value = cached
+            if expires_at > time.monotonic():
+                return value
+            self._local.pop(key, None)
+
+        if settings.PRINCIPAL_CACHE_REDIS_TTL <= 0:
+            return None
+
+        try:
+            with redis_command_duration.labels("principal_get").time():
+                raw = await redis_client.get(self._redis_key(key))
+        except RedisError as e:
+            logger.warning(f"Кэш {self.namespace} в Redis недоступен: {e}")
+            return None
+        if raw is None:
+            return None
+
+        value = self.model.model_validate_json(raw)
+        self._set_local(key, value)
+        return value
+
+    async def set(self, key: int, value: T) -> None:
+        self._set_local(key, value)
+
+        if settings.PRINCIPAL_CACHE_REDIS_TTL <= 0:
+            return
+        try:
+            with redis_command_duration.labels("principal_set").time():
+                await redis_client.set(
+                    self._redis_key(key),
+                    value.model_dump_json(),
+                    ex=settings.PRINCIPAL_CACHE_REDIS_TTL,
+                )
+        except RedisError as e:
+            logger.warning(f"Кэш {self.namespace} в Redis недоступен: {e}")
+
+    async def invalidate(self, key: int) -> None:
+        self._local.pop(key, None)
+        try:
+            await redis_client.delete(self._redis_key(key))
+        except RedisError as e:
+            logger.warning(f"Не удалось сбросить кэш {self.namespace} в Redis: {e}")
+
+    async def invalidate_on_commit(self, session: AsyncSession, key: int) -> None:
+        """
+        Сброс сразу и повторно после коммита session: запрос, прочитавший
+        старую строку до коммита, мог успеть вернуть её в кэш
+        """
+        await self.invalidate(key)
+        on_commit(session, lambda: self.invalidate(key))
+
+
+# Сотрудники по id
+principal_cache: TieredCache[EmployeePrincipal] = TieredCache(
+    "employee", EmployeePrincipal
+)
+# Территории по id организации (DicUl)
+territory_cache: TieredCache[TerritoryScope] = TieredCache("territory", TerritoryScope)
+
+
+class VerifiedTokens:
+    """
+    Проверенные JWT процесса: токен -> (sub, exp). Повторная проверка подписи
+    не нужна до истечения токена
+    """
+
+    def __init__(self):
+        self._tokens: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[int]:
+        cached = self._tokens.get(token)
+        if cached is None:
+            return None
+        employee_id, expire = cached
+        if expire <= time.time():
+            self._tokens.pop(token, None)
+            return None
+        return employee_id
+
+    def set(self, token: str, employee_id: int, expire: int) -> None:
+        if settings.PRINCIPAL_CACHE_SIZE <= 0:
+            return
+        self._tokens[token] = (employee_id, expire)
+        while len(self._tokens) > settings.PRINCIPAL_CACHE_SIZE:
+            self._tokens.popitem(last=False)
+
+
+verified_tokens = VerifiedTokens()
@@ -1,9 +1,17 @@
 from typing import List, Optional
 from sqlalchemy import select, func, update, delete
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import noload
 from loguru import logger
 
+from app.modules.common.encrypted_types import (
+    blind_match,
+    name_contains,
+    with_blind_indexes,
+)
+from app.database.replica import primary_only
 from app.modules.common.repository import BaseRepository
+from .principal import EmployeePrincipal, principal_cache, territory_cache
 from .models import DicIndicators, EmployeeIndicators, Employees, DicUl, DicRoles, DicFl
 from .dtos import (
     EmployeesFilterDto,
@@ -91,6 +99,8 @@ class DicUlRepo(BaseRepository):
                 await self._session.execute(stmt)
                 await self._session.flush()
 
+                await territory_cache.invalidate_on_commit(self._session, id)
+
                 updated_record = await self.get_one_by_id(id)
                 logger.info(f"Обновлена организация с ID {id}")
                 return updated_record
@@ -111,6 +121,8 @@ class DicUlRepo(BaseRepository):
             result = await self._session.execute(stmt)
             await self._session.flush()
 
+            await territory_cache.invalidate_on_commit(self._session, id)
+
             logger.info(f"Удалена организация с ID {id}")
             return result.rowcount > 0
         except SQLAlchemyError as e:
@@ -140,15 +152,15 @@ class DicFlRepo(BaseRepository):
     async def get_by_iin(self, iin: str) -> Optional[DicFl]:
         """Получить физическое лицо по ИИН"""
         try:
-            query = select(self.model).filter_by(iin=iin)
+            query = select(self.model).filter(blind_match(self.model.iin, iin))
             result = await self._session.execute(query)
-            record = result.unique().scalar_one_or_none()
+            record = result.unique().scalars().first()
             logger.info(
-                f"Физическое лицо с ИИН {iin} {'найдено' if record else 'не найдено'}"
+                f"Физическое лицо по ИИН {'найдено' if record else 'не найдено'}"
             )
             return record
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при поиске физического лица по ИИН {iin}: {e}")
+            logger.error(f"Ошибка при поиске физического лица по ИИН: {e}")
             raise
 
     async def search_by_name(
@@ -159,13 +171,18 @@ class DicFlRepo(BaseRepository):
             query = select(self.model)
 
             if surname:
-                query = query.filter(self.model.surname.ilike(f"%{surname}%"))
+                query = query.filter(blind_match(self.model.surname, surname))
 
             if name:
-                query = query.filter(self.model.name.ilike(f"%{name}%"))
+                query = query.filter(blind_match(self.model.name, name))
 
             result = await self._session.execute(query)
-            records = result.unique().scalars().all()
+            records = [
+                record
+                for record in result.unique().scalars().all()
+                if name_contains(record.surname, surname)
+                and name_contains(record.name, name)
+            ]
             logger.info(f"Найдено {len(records)} физических лиц по поиску")
             return records
         except SQLAlchemyError as e:
@@ -195,7 +212,9 @@ class DicFlRepo(BaseRepository):
             update_data = data.model_dump(exclude_unset=True)
             if update_data:
                 stmt = (
-                    update(self.model).where(self.model.id == id).values(**update_data)
+                    update(self.model)
+                    .where(self.model.id == id)
+                    .values(**with_blind_indexes(self.model, update_data))
                 )
                 await self._session.execute(stmt)
                 await self._session.flush()
@@ -289,13 +308,13 @@ class EmployeesRepo(BaseRepository):
                 )
 
             if filters.fl_surname is not None:
-                query = query.filter(DicFl.surname.ilike(f"%{filters.fl_surname}%"))
+                query = query.filter(blind_match(DicFl.surname, filters.fl_surname))
 
             if filters.fl_name is not None:
-                query = query.filter(DicFl.name.ilike(f"%{filters.fl_name}%"))
+                query = query.filter(blind_match(DicFl.name, filters.fl_name))
 
             if filters.fl_iin is not None:
-                query = query.filter(DicFl.iin.ilike(f"%{filters.fl_iin}%"))
+                query = query.filter(blind_match(DicFl.iin, filters.fl_iin))
 
             if filters.ul_name is not None:
                 query = query.filter(DicUl.name.ilike(f"%{filters.ul_name}%"))
@@ -306,7 +325,15 @@ class EmployeesRepo(BaseRepository):
             query = query.order_by(self.model.id.desc())
 
             result = await self._session.execute(query)
-            records = result.unique().scalars().all()
+            records = [
+                record
+                for record in result.unique().scalars().all()
+                if record.fl is None
+                or (
+                    name_contains(record.fl.surname, filters.fl_surname)
+                    and name_contains(record.fl.name, filters.fl_name)
+                )
+            ]
 
             logger.info(f"Найдено {len(records)} сотрудников.")
             return records
@@ -376,7 +403,7 @@ class EmployeesRepo(BaseRepository):
             if indicator_ids:
                 indicators_repo = EmployeeIndicatorsRepo(self._session)
                 await indicators_repo.add_indicators_to_employee(
-                    new_record.id, indicator_ids
+                    new_record.id, indicator_ids, assigned_by
                 )
                 await self._session.refresh(new_record)
 
@@ -409,7 +436,11 @@ class EmployeesRepo(BaseRepository):
                 indicators_repo = EmployeeIndicatorsRepo(self._session)
                 await indicators_repo.delete_by_employee_id(id)
                 if indicator_ids:
-                    await indicators_repo.add_indicators_to_employee(id, indicator_ids)
+                    await indicators_repo.add_indicators_to_employee(
+                        id, indicator_ids, assigned_by
+                    )
+
+            await principal_cache.invalidate_on_commit(self._session, id)
 
             updated_record = await self.get_one_by_id(id)
             logger.info(f"Обновлен сотрудник с ID {id}")
@@ -429,12 +460,28 @@ class EmployeesRepo(BaseRepository):
             result = await self._session.execute(stmt)
             await self._session.flush()
 
+            await principal_cache.invalidate_on_commit(self._session, id)
+
             logger.info(f"Удален сотрудник с ID {id}")
             return result.rowcount > 0
         except SQLAlchemyError as e:
             logger.error(f"Ошибка при удалении сотрудника с ID {id}: {e}")
             raise
 
+    async def get_principal_by_id(self, id: int) -> Optional[EmployeePrincipal]:
+        """Сотрудник для аутентификации, без загрузки связанных сущностей"""
+        try:
+            # Строка попадает в кэш аутентификации: реплика могла не получить блокировку
+            query = primary_only(select(self.model).options(noload("*")).filter_by(id=id))
+            result = await self._session.execute(query)
+            record = result.scalar_one_or_none()
+            if not record:
+                return None
+            return EmployeePrincipal.model_validate(record, from_attributes=True)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при поиске сотрудника с ID {id}: {e}")
+            raise
+
     async def get_by_login(self, login: str) -> Optional[Employees]:
         """Получить сотрудника по логину"""
         try:
@@ -487,25 +534,26 @@ class EmployeeIndicatorsRepo(BaseRepository):
             raise
 
     async def add_indicators_to_employee(
-        self, employee_id: int, indicator_ids: List[int]
-    ) -> List[EmployeeIndicators]:
-        """Добавить показатели к сотруднику"""
+        self,
+        employee_id: int,
+        indicator_ids: List[int],
+        assigned_by: Optional[int] = None,
+    ) -> int:
+        """Добавить показатели к сотруднику одним INSERT, уже назначенные пропускаются"""
         try:
-            new_indicators = []
-            for indicator_id in indicator_ids:
-                indicator = self.model(
-                    employee_id=employee_id,
-                    indicator_id=indicator_id,
-                )
-                new_indicators.append(indicator)
-
-            self._session.add_all(new_indicators)
-            await self._session.flush()
-
-            logger.info(
-                f"Добавлено {len(new_indicators)} показателей к сотруднику {employee_id}"
+            added = await self.bulk_upsert(
+                [
+                    {
+                        "employee_id": employee_id,
+                        "indicator_id": indicator_id,
+                        "assigned_by": assigned_by,
+                    }
+                    for indicator_id in dict.fromkeys(indicator_ids)
+                ]
             )
-            return new_indicators
+
+            logger.info(f"Добавлено {added} показателей к сотруднику {employee_id}")
+            return added
         except SQLAlchemyError as e:
             logger.error(
                 f"Ошибка при добавлении показателей к сотруднику {employee_id}: {e}"
@@ -8,7 +8,9 @@ from fastapi_cache.decorator import cache
 from loguru import logger
 
 from app.database.deps import get_session_with_commit
+from app.database.timeouts import is_query_canceled
 from app.modules.common.router import BaseCRUDRouter, request_key_builder, cache_ttl
+from app.modules.common.encrypted_types import blind_match
 from .dtos import (
     DicIndicatorsDto,
     EmployeesDto,
@@ -78,9 +80,9 @@ class DicFlRouter(APIRouter):
         """
         Фильтрация физических лиц с поддержкой пагинации
 
-        - **iin**: ИИН (частичное совпадение)
-        - **surname**: фамилия (частичное совпадение)
-        - **name**: имя (частичное совпадение)
+        - **iin**: ИИН (точное совпадение)
+        - **surname**: фамилия (подстрока от 3 символов или начало фамилии)
+        - **name**: имя (подстрока от 3 символов или начало имени)
         - **page**: номер страницы
         - **page_size**: количество записей на странице
         """
@@ -88,11 +90,11 @@ class DicFlRouter(APIRouter):
             query = select(DicFl)
 
             if iin:
-                query = query.filter(DicFl.iin.ilike(f"%{iin}%"))
+                query = query.filter(blind_match(DicFl.iin, iin))
             if surname:
-                query = query.filter(DicFl.surname.ilike(f"%{surname}%"))
+                query = query.filter(blind_match(DicFl.surname, surname))
             if name:
-                query = query.filter(DicFl.name.ilike(f"%{name}%"))
+                query = query.filter(blind_match(DicFl.name, name))
 
             query = query.order_by(DicFl.id.desc())
 
@@ -107,6 +109,8 @@ class DicFlRouter(APIRouter):
 
             return [DicFlDto.model_validate(item) for item in records]
         except Exception as e:
+            if is_query_canceled(e):
+                raise
             logger.error(f"Ошибка при фильтрации dic_fl: {e}")
             raise HTTPException(status_code=500, detail="Ошибка при поиске записей")
 
@@ -247,6 +251,8 @@ class DicUlRouter(APIRouter):
 
             return [DicUlDto.model_validate(item) for item in records]
         except Exception as e:
+            if is_query_canceled(e):
+                raise
             logger.error(f"Ошибка при фильтрации dic_ul: {e}")
             raise HTTPException(status_code=500, detail="Ошибка при поиске записей")
 
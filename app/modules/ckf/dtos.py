@@ -303,6 +303,8 @@ class GetReceiptByFiscalBinDto(BasestDto):
 
 class KkmStatisticsRequestDto(BasestDto):
     territory: Optional[str] = None
+    # id области / района для region OBLAST / RAION, вместо геометрии territory
+    territory_id: Optional[int] = None
     year: int
     region: RegionEnum
 
@@ -349,6 +351,7 @@ class KkmAggregatedByBuildingResponseDto(BasestDto):
 class BuildingsFilterDto(BasestDto):
     floor: Optional[FloorEnum] = None
     territory: str
+    year: Optional[int] = None
 
 
 class OrganizationsAndKkmsCountResponseDto(BasestDto):
@@ -459,6 +462,8 @@ class SzptRegionRequestDto(BasestDto):
     szpt_id: Optional[int] = None
     year: int
     territory: Optional[str] = None
+    # id области / района для region OBLAST / RAION, вместо геометрии territory
+    territory_id: Optional[int] = None
     region: RegionEnum
 
 
@@ -0,0 +1,184 @@
+"""
+Лента чеков в реальном времени.
+
+Один фоновый опросчик на воркер читает новые строки last_10, обогащает их
+данными ККМ и организации и складывает в кольцевой буфер. Клиенты
+подписываются через SSE (`/ckf/receipts/live`) и получают сначала содержимое
+буфера, затем новые чеки по мере поступления. Опросчик запускается при первой
+подписке и останавливается, когда уходит последний подписчик, поэтому воркеры
+без подписчиков базу не опрашивают.
+
+Чеки читаются страницами по курсору (operation_date, kkms_id, fiskal_sign):
+чеки с одинаковой датой не теряются и не отдаются повторно, сколько бы их ни
+было.
+"""
+
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+import orjson
+from loguru import logger
+
+from app.config import settings
+from app.database.database import async_session_maker
+from .dtos import ReceiptDetailDto
+from .repository import ReceiptsRepo
+
+
+class LiveReceiptsFeed:
+    def __init__(
+        self,
+        buffer_size: int,
+        poll_interval: float,
+        batch_size: int = 500,
+        subscriber_queue_size: int = 1000,
+    ):
+        self._buffer: Deque[dict] = deque(maxlen=buffer_size)
+        self._poll_interval = poll_interval
+        self._batch_size = batch_size
+        self._subscriber_queue_size = subscriber_queue_size
+
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        # Курсор последнего прочитанного чека: (operation_date, kkms_id, fiskal_sign)
+        self._cursor: Optional[Tuple[datetime, int, int]] = None
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _stop_polling(self) -> None:
+        """
+        Остановка опросчика без ожидания. Буфер и курсор сбрасываются: после
+        перерыва лента начинается заново с последних чеков
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._buffer.clear()
+        self._cursor = None
+
+    async def stop(self) -> None:
+        task = self._task
+        self._stop_polling()
+        if task is not None:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                read = await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка опроса ленты чеков: {e}")
+                read = 0
+
+            # Полная страница - за ней могут быть ещё чеки, читаем сразу
+            if read < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
+
+    async def _poll(self) -> int:
+        """Читает следующую страницу чеков, возвращает число прочитанных чеков"""
+        async with async_session_maker() as session:
+            rows = await ReceiptsRepo(session).get_last10_receipts_since(
+                after=self._cursor, limit=self._batch_size
+            )
+
+        receipts = self._group_receipts(rows)
+        for receipt in receipts:
+            self._cursor = (receipt["operation_date"], receipt["kkm_id"], receipt["fiskal_sign"])
+            self._publish(receipt)
+
+        return len(receipts)
+
+    @staticmethod
+    def _group_receipts(rows: List[dict]) -> List[dict]:
+        """Строки позиций -> чеки, в порядке возрастания курсора"""
+        receipts: Dict[Tuple[int, int], dict] = {}
+        for row in rows:
+            key = (row["kkms_id"], row["fiskal_sign"])
+            receipt = receipts.get(key)
+            if receipt is None:
+                receipt = receipts[key] = {
+                    "kkm_id": row["kkms_id"],
+                    "organization_id": row["organization_id"],
+                    "fiskal_sign": row["fiskal_sign"],
+                    "operation_date": row["operation_date"],
+                    "items": [],
+                }
+            receipt["items"].append(ReceiptDetailDto.model_validate(row).model_dump(mode="json"))
+
+        return list(receipts.values())
+
+    def _publish(self, receipt: dict) -> None:
+        self._buffer.append(receipt)
+
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(receipt)
+            except asyncio.QueueFull:
+                # Медленный клиент: отключаем, он переподключится и получит буфер
+                self._subscribers.discard(queue)
+
+    @staticmethod
+    def _matches(receipt: dict, kkm_id: Optional[int], organization_id: Optional[int]) -> bool:
+        if kkm_id is not None and receipt["kkm_id"] != kkm_id:
+            return False
+        if organization_id is not None and receipt["organization_id"] != organization_id:
+            return False
+        return True
+
+    async def subscribe(
+        self,
+        kkm_id: Optional[int] = None,
+        organization_id: Optional[int] = None,
+        heartbeat: float = 15.0,
+    ) -> AsyncIterator[Optional[dict]]:
+        """
+        Чеки из буфера, затем новые. None - сигнал heartbeat, когда новых
+        чеков не было heartbeat секунд.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._subscriber_queue_size)
+        self._subscribers.add(queue)
+        self._ensure_started()
+
+        try:
+            for receipt in list(self._buffer):
+                if self._matches(receipt, kkm_id, organization_id):
+                    yield receipt
+
+            while queue in self._subscribers or not queue.empty():
+                try:
+                    receipt = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if self._matches(receipt, kkm_id, organization_id):
+                    yield receipt
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers:
+                self._stop_polling()
+
+
+def to_sse_event(receipt: Optional[dict]) -> bytes:
+    if receipt is None:
+        return b": ping\n\n"
+
+    event_id = f"{receipt['kkm_id']}:{receipt['fiskal_sign']}"
+    data = orjson.dumps(receipt)
+    return b"id: " + event_id.encode() + b"\nevent: receipt\ndata: " + data + b"\n\n"
+
+
+live_receipts_feed = LiveReceiptsFeed(
+    buffer_size=settings.LIVE_RECEIPTS_BUFFER_SIZE,
+    poll_interval=settings.LIVE_RECEIPTS_POLL_INTERVAL,
+)
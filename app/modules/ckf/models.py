@@ -1,6 +1,16 @@
 from typing import List, TYPE_CHECKING
 
-from sqlalchemy import BigInteger, ForeignKey, Date, Integer, PrimaryKeyConstraint
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    ForeignKey,
+    Date,
+    Index,
+    Integer,
+    Numeric,
+    PrimaryKeyConstraint,
+)
+from geoalchemy2 import Geometry, WKBElement
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import date, datetime
 
@@ -123,7 +133,10 @@ class FnoTypes(BasestModel):
 
 class Fno(BasestModel):
     __tablename__ = "fno"
-    __table_args__ = dict(comment="ФНО")
+    __table_args__ = (
+        Index("ix_fno_year_organization_id", "year", "organization_id"),
+        dict(comment="ФНО"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -271,7 +284,10 @@ class EsfSellerDaily(BasestModel):
 
 class EsfSellerMonth(BasestModel):
     __tablename__ = "esf_seller_month"
-    __table_args__ = dict(comment="ЭСФ реализация за месяц")
+    __table_args__ = (
+        Index("ix_esf_seller_month_month_year_organization_id", "month_year", "organization_id"),
+        dict(comment="ЭСФ реализация за месяц"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -346,7 +362,10 @@ class EsfBuyerDaily(BasestModel):
 
 class EsfBuyerMonth(BasestModel):
     __tablename__ = "esf_buyer_month"
-    __table_args__ = dict(comment="ЭСФ приобретение за месяц")
+    __table_args__ = (
+        Index("ix_esf_buyer_month_month_year_organization_id", "month_year", "organization_id"),
+        dict(comment="ЭСФ приобретение за месяц"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -399,6 +418,7 @@ class Kkms(BaseModelWithShapePoint):
 
 
 class Receipts(BaseModel):
+    # Секционирована по operation_date, см. app/database/partitions.py
     __table_args__ = dict(comment="Чеки")
 
     """ККМ"""
@@ -408,7 +428,7 @@ class Receipts(BaseModel):
     kkm: Mapped["Kkms"] = relationship("Kkms", lazy="selectin")  # ОСТОРОЖНО!!!
 
     operation_date: Mapped[datetime] = mapped_column(
-        comment="Дата и время совершения кассовой операции", nullable=True
+        comment="Дата и время совершения кассовой операции", nullable=False
     )
     auto_fiskal_mark_check: Mapped[int] = mapped_column(
         BigInteger, comment="Автономный фискальный номер", nullable=True
@@ -441,7 +461,10 @@ class Receipts(BaseModel):
 
 
 class ReceiptsAnnual(BaseModel):
-    __table_args__ = dict(comment="Чеки за год")
+    __table_args__ = (
+        Index("ix_receipts_annual_year_kkms_id", "year", "kkms_id"),
+        dict(comment="Чеки за год"),
+    )
 
     """ККМ"""
     kkms_id: Mapped[int] = mapped_column(
@@ -455,7 +478,11 @@ class ReceiptsAnnual(BaseModel):
 
 
 class ReceiptsDaily(BaseModel):
-    __table_args__ = dict(comment="Чеки за день")
+    # Секционирована по date_check, см. app/database/partitions.py
+    __table_args__ = (
+        Index("ix_receipts_daily_date_check_kkms_id", "date_check", "kkms_id"),
+        dict(comment="Чеки за день"),
+    )
 
     """ККМ"""
     kkms_id: Mapped[int] = mapped_column(
@@ -465,12 +492,16 @@ class ReceiptsDaily(BaseModel):
 
     check_sum: Mapped[float] = mapped_column(comment="Общая сумма", nullable=True)
     check_count: Mapped[int] = mapped_column(comment="Количество чеков", nullable=True)
-    date_check: Mapped[date] = mapped_column(Date, comment="Дата", nullable=True)
+    date_check: Mapped[date] = mapped_column(Date, comment="Дата", nullable=False)
 
 
 class ReceiptsMonthly(BasestModel):
     __tablename__ = "receipts_month"
-    __table_args__ = dict(comment="Чеки за месяц")
+    # Секционирована по month, см. app/database/partitions.py
+    __table_args__ = (
+        Index("ix_receipts_month_month_kkms_id", "month", "kkms_id"),
+        dict(comment="Чеки за месяц"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     kkms_id: Mapped[int] = mapped_column(
@@ -479,7 +510,7 @@ class ReceiptsMonthly(BasestModel):
 
     check_sum: Mapped[int] = mapped_column(comment="Сумма чека", nullable=True)
     check_count: Mapped[int] = mapped_column(comment="Количество чеков", nullable=True)
-    month: Mapped[date] = mapped_column(comment="Дата", nullable=True)
+    month: Mapped[date] = mapped_column(comment="Дата", nullable=False)
 
 
 class DicSzpt(BasestModel):
@@ -494,7 +525,10 @@ class DicSzpt(BasestModel):
 
 class KkmsSzpt(BaseModel):
     __tablename__ = "kkms_szpt"
-    __table_args__ = dict(schema="public")
+    __table_args__ = (
+        Index("ix_kkms_szpt_month_kkms_id", "month", "kkms_id"),
+        dict(schema="public"),
+    )
 
     kkms_id: Mapped[int] = mapped_column(ForeignKey("kkms.id"), nullable=True)
     szpt_id: Mapped[int] = mapped_column(
@@ -570,3 +604,142 @@ class Last10Receipts(BasestModel):
     operation_date: Mapped[datetime] = mapped_column(
         comment="Дата операции", nullable=False
     )
+
+
+
+class Last10ReceiptDetails(BasestModel):
+    __tablename__ = "last_10_details"
+    __table_args__ = (
+        Index("ix_last_10_details_kkms_id_operation_date", "kkms_id", "operation_date"),
+        Index(
+            "ix_last_10_details_organization_id_operation_date",
+            "organization_id",
+            "operation_date",
+        ),
+        dict(
+            comment="Позиции чеков из last_10 с данными ККМ и организации. "
+            "Поддерживается триггером на last_10"
+        ),
+    )
+
+    receipt_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, comment="ID позиции чека")
+    kkms_id: Mapped[int] = mapped_column(BigInteger, comment="ККМ ID", nullable=False)
+    organization_id: Mapped[int] = mapped_column(comment="Организация", nullable=True)
+    fiskal_sign: Mapped[int] = mapped_column(BigInteger, comment="Фискальный признак", nullable=True)
+    operation_date: Mapped[datetime] = mapped_column(comment="Дата операции", nullable=False)
+
+    reg_number: Mapped[str] = mapped_column(comment="Регистрационный номер ККМ", nullable=True)
+    serial_number: Mapped[str] = mapped_column(comment="Заводской номер ККМ", nullable=True)
+    address: Mapped[str] = mapped_column(comment="Адрес", nullable=True)
+    name_ru: Mapped[str] = mapped_column(comment="Наименование организации", nullable=True)
+
+    item_name: Mapped[str] = mapped_column(comment="Наименование товара", nullable=True)
+    item_price: Mapped[float] = mapped_column(comment="Цена товара", nullable=True)
+    item_count: Mapped[float] = mapped_column(comment="Количество товара", nullable=True)
+    item_nds: Mapped[float] = mapped_column(comment="НДС", nullable=True)
+    full_item_price: Mapped[float] = mapped_column(comment="Итог", nullable=True)
+    payment_type: Mapped[int] = mapped_column(comment="Вид оплаты", nullable=True)
+
+# Агрегаты (rollup) по чекам. Заполняются командой
+# `python -m app.modules.ckf.rollups` после ночной загрузки чеков.
+# Регион (область/район) и геометрии денормализованы, чтобы дашборды
+# фильтровали по обычным колонкам без соединений с ККМ и организациями.
+
+
+class ReceiptsMonthRollup(BasestModel):
+    __tablename__ = "receipts_month_rollup"
+    __table_args__ = (
+        PrimaryKeyConstraint("kkms_id", "month"),
+        Index("ix_receipts_month_rollup_year_month", "year", "month"),
+        Index("ix_receipts_month_rollup_oblast_month", "oblast_id", "month"),
+        Index("ix_receipts_month_rollup_raion_month", "raion_id", "month"),
+        Index("ix_receipts_month_rollup_organization_month", "organization_id", "month"),
+        dict(comment="Агрегаты чеков по ККМ за месяц"),
+    )
+
+    kkms_id: Mapped[int] = mapped_column(BigInteger, comment="ККМ", nullable=False)
+    organization_id: Mapped[int] = mapped_column(comment="Организация", nullable=True)
+    oblast_id: Mapped[int] = mapped_column(comment="Область", nullable=True)
+    raion_id: Mapped[int] = mapped_column(comment="Район", nullable=True)
+
+    month: Mapped[date] = mapped_column(Date, comment="Первый день месяца", nullable=False)
+    year: Mapped[int] = mapped_column(Integer, comment="Год", nullable=False)
+
+    check_sum: Mapped[float] = mapped_column(Numeric, comment="Общая сумма", nullable=True)
+    check_count: Mapped[int] = mapped_column(BigInteger, comment="Количество чеков", nullable=True)
+    source_rows: Mapped[int] = mapped_column(
+        BigInteger, comment="Строк receipts_month с заполненным количеством чеков", nullable=True
+    )
+
+    kkm_active: Mapped[bool] = mapped_column(Boolean, comment="ККМ не снята с учёта", nullable=False)
+    organization_active: Mapped[bool] = mapped_column(
+        Boolean, comment="Организация не снята с учёта", nullable=False
+    )
+
+    kkm_shape: Mapped[WKBElement] = mapped_column(
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=True),
+        comment="Геометрия ККМ",
+        nullable=True,
+    )
+    organization_shape: Mapped[WKBElement] = mapped_column(
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=True),
+        comment="Геометрия организации",
+        nullable=True,
+    )
+
+
+class KkmsSzptMonthRollup(BasestModel):
+    __tablename__ = "kkms_szpt_month_rollup"
+    __table_args__ = (
+        PrimaryKeyConstraint("kkms_id", "szpt_id", "month"),
+        Index("ix_kkms_szpt_month_rollup_year_szpt", "year", "szpt_id"),
+        Index("ix_kkms_szpt_month_rollup_oblast_month", "oblast_id", "month"),
+        Index("ix_kkms_szpt_month_rollup_raion_month", "raion_id", "month"),
+        dict(comment="Агрегаты продаж СЗПТ по ККМ за месяц"),
+    )
+
+    kkms_id: Mapped[int] = mapped_column(BigInteger, comment="ККМ", nullable=False)
+    szpt_id: Mapped[int] = mapped_column(Integer, comment="СЗПТ", nullable=False)
+    oblast_id: Mapped[int] = mapped_column(comment="Область", nullable=True)
+    raion_id: Mapped[int] = mapped_column(comment="Район", nullable=True)
+
+    month: Mapped[date] = mapped_column(Date, comment="Первый день месяца", nullable=False)
+    year: Mapped[int] = mapped_column(Integer, comment="Год", nullable=False)
+
+    szpt_sum: Mapped[float] = mapped_column(Numeric, comment="Сумма продаж", nullable=True)
+    szpt_count: Mapped[float] = mapped_column(Numeric, comment="Количество (без NaN)", nullable=True)
+
+    kkm_shape: Mapped[WKBElement] = mapped_column(
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=True),
+        comment="Геометрия ККМ",
+        nullable=True,
+    )
+
+
+class ReceiptsKkmRollup(BasestModel):
+    __tablename__ = "receipts_kkm_rollup"
+    __table_args__ = (
+        Index("ix_receipts_kkm_rollup_oblast", "oblast_id"),
+        Index("ix_receipts_kkm_rollup_raion", "raion_id"),
+        dict(comment="Дневные и годовые итоги чеков по ККМ"),
+    )
+
+    kkms_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, comment="ККМ")
+    organization_id: Mapped[int] = mapped_column(comment="Организация", nullable=True)
+    iin_bin: Mapped[str] = mapped_column(comment="ИИН/БИН", nullable=True)
+    reg_number: Mapped[str] = mapped_column(comment="Регистрационный номер ККМ", nullable=True)
+    oblast_id: Mapped[int] = mapped_column(comment="Область", nullable=True)
+    raion_id: Mapped[int] = mapped_column(comment="Район", nullable=True)
+
+    daily_sum: Mapped[float] = mapped_column(Numeric, comment="Сумма за день", nullable=True)
+    daily_count: Mapped[int] = mapped_column(BigInteger, comment="Чеков за день", nullable=True)
+    annual_sum: Mapped[float] = mapped_column(Numeric, comment="Сумма за год", nullable=True)
+    annual_count: Mapped[int] = mapped_column(BigInteger, comment="Чеков за год", nullable=True)
+
+    kkm_active: Mapped[bool] = mapped_column(Boolean, comment="ККМ не снята с учёта", nullable=False)
+
+    kkm_shape: Mapped[WKBElement] = mapped_column(
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=True),
+        comment="Геометрия ККМ",
+        nullable=True,
+    )
@@ -16,14 +16,16 @@ from sqlalchemy import (
     or_,
     cast,
     Integer,
+    BigInteger,
     and_,
     union_all,
     literal,
     case,
     Date,
-    Text,
     Numeric,
     desc,
+    true,
+    tuple_,
 )
 from sqlalchemy.exc import SQLAlchemyError
 from geoalchemy2.functions import ST_Within
@@ -44,6 +46,8 @@ from app.modules.common.repository import (
     BaseWithOrganizationRepository,
 )
 from app.modules.common.utils import wkb_to_geojson, territory_to_geo_element
+from app.modules.common.periods import in_date_range
+from app.modules.common.result_caps import Pagination, fetch_capped
 from app.modules.common.models import BaseModel
 from app.modules.common.enums import RegionEnum, FloorEnum
 from .dtos import (
@@ -63,6 +67,7 @@ from .models import (
     EsfSellerMonth,
     Fno,
     FnoTypes,
+    Last10ReceiptDetails,
     Last10Receipts,
     Organizations,
     Kkms,
@@ -72,16 +77,63 @@ from .models import (
     ReceiptsDaily,
     RiskInfos,
     DicSzpt,
-    ReceiptsMonthly,
-    KkmsSzpt,
+    KkmsSzptMonthRollup,
+    ReceiptsKkmRollup,
+    ReceiptsMonthRollup,
     GtinStat,
     Violations,
 )
-from typing import Optional
-from datetime import date
+from typing import Optional, Tuple
+from datetime import date, datetime
 from geoalchemy2.functions import ST_MakeEnvelope
 
 
+class TerritoryScopeMixin:
+    """
+    Территориальный охват для статистических репозиториев: набор ККМ (и их
+    организаций), попадающих в территорию, оформленный как CTE. Пространственный
+    фильтр вычисляется один раз, а агрегаты соединяются с CTE по kkm_id
+    или organization_id.
+    """
+
+    def generate_territory_scope_cte(
+        self, territory, cte_name: str = "territory_scope", only_active: bool = False
+    ):
+        if isinstance(territory, str):
+            territory = territory_to_geo_element(territory=territory, srid=4326)
+
+        scope = (
+            select(
+                Kkms.id.label("kkm_id"),
+                Kkms.organization_id.label("organization_id"),
+                Kkms.date_stop.is_(None).label("is_active"),
+            )
+            .join(Organizations, Kkms.organization_id == Organizations.id)
+            .where(func.ST_Intersects(Organizations.shape, territory))
+        )
+
+        if only_active:
+            scope = scope.where(Kkms.date_stop.is_(None))
+
+        return scope.cte(cte_name)
+
+
+def _rollup_region_filter(rollup, filters):
+    """
+    Условие по области/району для агрегатов (rollup) по их колонкам oblast_id /
+    raion_id - по индексу, без пространственного запроса. None, если в фильтре
+    нет territory_id: тогда территория задана произвольным WKT и фильтруется
+    по геометрии
+    """
+    if filters.territory_id is None:
+        return None
+    if filters.region == RegionEnum.oblast:
+        return rollup.oblast_id == filters.territory_id
+    if filters.region == RegionEnum.raion:
+        return rollup.raion_id == filters.territory_id
+    return None
+
+
 class OrganizationsRepo(BaseRepository):
     model = Organizations
 
@@ -187,31 +239,50 @@ class OrganizationsRepo(BaseRepository):
                 detail="Ошибка при поиске филиалов",
             )
 
-    async def filter(self, filters: OrganizationsFilterDto):
-        try:
-            query = select(self.model)
+    def _filter_query(self, filters: OrganizationsFilterDto):
+        query = select(self.model)
 
-            if filters.territory is not None:
-                query = query.filter(
-                    Organizations.shape.ST_Intersects("SRID=4326;" + filters.territory)
-                )
+        if filters.territory is not None:
+            query = query.filter(
+                Organizations.shape.ST_Intersects("SRID=4326;" + filters.territory)
+            )
 
-            if filters.iin_bin is not None:
-                query = query.filter(Organizations.iin_bin == filters.iin_bin)
+        return self._apply_common_filters(query, filters)
 
-            if filters.oked_ids is not None:
-                query = query.filter(Organizations.oked_id.in_(filters.oked_ids))
+    @staticmethod
+    def _apply_common_filters(query, filters: OrganizationsFilterDto):
+        if filters.iin_bin is not None:
+            query = query.filter(Organizations.iin_bin == filters.iin_bin)
 
-            if filters.risk_degree_ids is not None:
-                query = query.join(RiskInfos).filter(
-                    RiskInfos.risk_degree_id.in_(filters.risk_degree_ids)
-                )
+        if filters.oked_ids is not None:
+            query = query.filter(Organizations.oked_id.in_(filters.oked_ids))
 
-            if filters.otp:
-                query = query.join(Otps).filter(Otps.status == True)
+        if filters.risk_degree_ids is not None:
+            query = query.join(RiskInfos).filter(
+                RiskInfos.risk_degree_id.in_(filters.risk_degree_ids)
+            )
 
-            result = await self._session.execute(query)
-            records = result.unique().scalars().all()
+        if filters.otp:
+            query = query.join(Otps).filter(Otps.status == True)
+
+        return query
+
+    def stream_filter(self, filters: OrganizationsFilterDto, chunk_size: int = 1000):
+        """Организации по фильтрам порциями, для потоковой выгрузки"""
+        return self.stream(
+            self._filter_query(filters).order_by(Organizations.id), chunk_size
+        )
+
+    async def filter(
+        self, filters: OrganizationsFilterDto, pagination: Optional[Pagination] = None
+    ):
+        try:
+            records = await fetch_capped(
+                self._session,
+                self._filter_query(filters).order_by(Organizations.id),
+                "OrganizationsRepo.filter",
+                pagination,
+            )
 
             logger.info(f"Найдено {len(records)} записей.")
 
@@ -373,62 +444,71 @@ class OrganizationsRepo(BaseRepository):
             logger.error(f"Ошибка при : {e}")
             raise
 
-    async def filter_with_territory(
+    def _filter_with_territory_query(
         self,
         filters: OrganizationsFilterDto,
         user_territory_geom: Optional["WKTElement"] = None,
     ):
-        """
-        Фильтрация организаций с учетом территориальных ограничений пользователя
+        query = select(self.model)
 
-        Args:
-            filters: Стандартные фильтры для организаций
-            user_territory_geom: Геометрия территории доступа пользователя (None = республиканский доступ)
-        """
-        try:
-            query = select(self.model)
+        if user_territory_geom is not None:
+            logger.info("Применяется территориальное ограничение пользователя")
+            query = query.filter(
+                func.ST_Intersects(Organizations.shape, user_territory_geom)
+            )
+        else:
+            logger.info(
+                "Пользователь имеет республиканский доступ - территориальное ограничение не применяется"
+            )
 
+        if filters.territory is not None:
             if user_territory_geom is not None:
-                logger.info("Применяется территориальное ограничение пользователя")
+                user_territory_filter = filters.territory
                 query = query.filter(
-                    func.ST_Intersects(Organizations.shape, user_territory_geom)
+                    Organizations.shape.ST_Intersects(
+                        "SRID=4326;" + user_territory_filter
+                    )
                 )
-            else:
                 logger.info(
-                    "Пользователь имеет республиканский доступ - территориальное ограничение не применяется"
+                    "Применен дополнительный территориальный фильтр от пользователя"
                 )
-
-            if filters.territory is not None:
-                if user_territory_geom is not None:
-                    user_territory_filter = filters.territory
-                    query = query.filter(
-                        Organizations.shape.ST_Intersects(
-                            "SRID=4326;" + user_territory_filter
-                        )
-                    )
-                    logger.info(
-                        "Применен дополнительный территориальный фильтр от пользователя"
-                    )
-                else:
-                    query = query.filter(
-                        Organizations.shape.ST_Intersects(
-                            "SRID=4326;" + filters.territory
-                        )
+            else:
+                query = query.filter(
+                    Organizations.shape.ST_Intersects(
+                        "SRID=4326;" + filters.territory
                     )
+                )
 
-            if filters.iin_bin is not None:
-                query = query.filter(Organizations.iin_bin == filters.iin_bin)
+        return self._apply_common_filters(query, filters)
 
-            if filters.oked_ids is not None:
-                query = query.filter(Organizations.oked_id.in_(filters.oked_ids))
+    def stream_filter_with_territory(
+        self,
+        filters: OrganizationsFilterDto,
+        user_territory_geom: Optional["WKTElement"] = None,
+        chunk_size: int = 1000,
+    ):
+        """Организации с территориальным ограничением порциями, для потоковой выгрузки"""
+        return self.stream(
+            self._filter_with_territory_query(filters, user_territory_geom).order_by(
+                Organizations.id
+            ),
+            chunk_size,
+        )
 
-            if filters.risk_degree_ids is not None:
-                query = query.join(RiskInfos).filter(
-                    RiskInfos.risk_degree_id.in_(filters.risk_degree_ids)
-                )
+    async def filter_with_territory(
+        self,
+        filters: OrganizationsFilterDto,
+        user_territory_geom: Optional["WKTElement"] = None,
+    ):
+        """
+        Фильтрация организаций с учетом территориальных ограничений пользователя
 
-            if filters.otp:
-                query = query.join(Otps).filter(Otps.status == True)
+        Args:
+            filters: Стандартные фильтры для организаций
+            user_territory_geom: Геометрия территории доступа пользователя (None = республиканский доступ)
+        """
+        try:
+            query = self._filter_with_territory_query(filters, user_territory_geom)
 
             result = await self._session.execute(query)
             records = result.unique().scalars().all()
@@ -577,43 +657,36 @@ class KkmsRepo(BaseRepository):
         current_year = date.today().year
         try:
             month_trunc = cast(
-                func.extract("month", ReceiptsMonthly.month), Integer
+                func.extract("month", ReceiptsMonthRollup.month), Integer
             ).label("month")
 
             columns = [month_trunc]
 
             columns.append(
-                func.round(
-                    func.sum(func.cast(ReceiptsMonthly.check_sum, Numeric)), 2
-                ).label("turnover")
+                func.round(func.sum(ReceiptsMonthRollup.check_sum), 2).label("turnover")
             )
 
             if filters.floor == FloorEnum.kkm:
                 columns.append(
-                    func.sum(ReceiptsMonthly.check_count).label("check_count")
+                    func.sum(ReceiptsMonthRollup.check_count).label("check_count")
                 )
 
-            query = select(*columns).select_from(ReceiptsMonthly)
+            query = select(*columns).where(ReceiptsMonthRollup.year == current_year)
 
             if filters.floor == FloorEnum.np:
-                query = query.join(Kkms, ReceiptsMonthly.kkms_id == Kkms.id)
-                query = query.join(
-                    Organizations, Kkms.organization_id == Organizations.id
-                )
                 query = query.where(
-                    func.ST_Within(Organizations.shape, territory_geom),
-                    Organizations.date_stop.is_(None),
-                    func.extract("year", ReceiptsMonthly.month) == current_year,
+                    func.ST_Within(ReceiptsMonthRollup.organization_shape, territory_geom),
+                    ReceiptsMonthRollup.organization_active.is_(True),
                 )
             else:
-                query = query.join(Kkms, ReceiptsMonthly.kkms_id == Kkms.id)
                 query = query.where(
-                    func.ST_Within(Kkms.shape, territory_geom),
-                    Kkms.date_stop.is_(None),
-                    func.extract("year", ReceiptsMonthly.month) == current_year,
+                    func.ST_Within(ReceiptsMonthRollup.kkm_shape, territory_geom),
+                    ReceiptsMonthRollup.kkm_active.is_(True),
                 )
 
-            query = query.group_by(month_trunc).order_by(month_trunc)
+            query = query.group_by(ReceiptsMonthRollup.month).order_by(
+                ReceiptsMonthRollup.month
+            )
 
             result = await self._session.execute(query)
             rows = result.all()
@@ -639,22 +712,20 @@ class KkmsRepo(BaseRepository):
         try:
             query = (
                 select(
-                    Organizations.iin_bin,
-                    Kkms.reg_number,
-                    func.sum(ReceiptsDaily.check_sum).label("daily_sum"),
-                    func.sum(ReceiptsDaily.check_count).label("daily_count"),
-                    func.sum(ReceiptsAnnual.check_sum).label("annual_sum"),
-                    func.sum(ReceiptsAnnual.check_count).label("annual_count"),
+                    ReceiptsKkmRollup.iin_bin,
+                    ReceiptsKkmRollup.reg_number,
+                    func.sum(ReceiptsKkmRollup.daily_sum).label("daily_sum"),
+                    func.sum(ReceiptsKkmRollup.daily_count).label("daily_count"),
+                    func.sum(ReceiptsKkmRollup.annual_sum).label("annual_sum"),
+                    func.sum(ReceiptsKkmRollup.annual_count).label("annual_count"),
                 )
-                .select_from(Organizations)
-                .join(Kkms, Organizations.id == Kkms.organization_id)
-                .join(ReceiptsDaily, Kkms.id == ReceiptsDaily.kkms_id)
-                .join(ReceiptsAnnual, Kkms.id == ReceiptsAnnual.kkms_id)
                 .where(
-                    Kkms.date_stop.is_(None),
-                    ST_Within(Kkms.shape, territory_geom),
+                    ReceiptsKkmRollup.kkm_active.is_(True),
+                    ReceiptsKkmRollup.daily_sum.is_not(None),
+                    ReceiptsKkmRollup.annual_sum.is_not(None),
+                    ST_Within(ReceiptsKkmRollup.kkm_shape, territory_geom),
                 )
-                .group_by(Organizations.iin_bin, Kkms.reg_number)
+                .group_by(ReceiptsKkmRollup.iin_bin, ReceiptsKkmRollup.reg_number)
             )
 
             result = await self._session.execute(query)
@@ -812,6 +883,13 @@ class FnoRepo(BaseWithOrganizationRepository):
             )
             raise
 
+    def _reporting_year(self, filters: BuildingsFilterDto):
+        """Год отчётности: из фильтра, иначе последний загруженный год ФНО"""
+        if filters.year is not None:
+            return filters.year
+
+        return select(func.max(Fno.year)).scalar_subquery()
+
     async def get_fno_bar_char_by_building(self, filters: BuildingsFilterDto):
         territory_geom = territory_to_geo_element(filters.territory)
         try:
@@ -837,7 +915,7 @@ class FnoRepo(BaseWithOrganizationRepository):
                 .join(Organizations, Fno.organization_id == Organizations.id)
                 .where(
                     and_(
-                        Fno.year == 2025,
+                        Fno.year == self._reporting_year(filters),
                         Fno.type_id.in_((0, 1, 2, 3, 4, 5, 6)),
                         func.ST_Intersects(Organizations.shape, territory_geom),
                         Organizations.date_stop.is_(None),
@@ -913,7 +991,7 @@ class FnoRepo(BaseWithOrganizationRepository):
                 .where(
                     Organizations.date_stop.is_(None),
                     func.ST_Intersects(Organizations.shape, territory_geom),
-                    Fno.year == 2025,
+                    Fno.year == self._reporting_year(filters),
                 )
                 .group_by(Organizations.iin_bin)
             )
@@ -1031,8 +1109,7 @@ class EsfStatisticsRepo(BaseWithOrganizationRepository):
                 func.coalesce(func.sum(model.total_amount), 0).label("turnover"),
             )
             .where(
-                model.month_year >= filters.period_start,
-                model.month_year <= filters.period_end,
+                in_date_range(model.month_year, filters.period_start, filters.period_end),
             )
             .group_by(model.month_year)
             .order_by(model.month_year)
@@ -1213,7 +1290,7 @@ class ReceiptsAnnualRepo(BaseWithKkmRepository):
             raise
 
 
-class ReceiptsRepo(BaseWithKkmRepository):
+class ReceiptsRepo(TerritoryScopeMixin, BaseWithKkmRepository):
     model = Receipts
 
     async def get_by_fiscal_and_kkm_reg_number(
@@ -1304,34 +1381,33 @@ class ReceiptsRepo(BaseWithKkmRepository):
     ):
         try:
             month_trunc = cast(
-                func.extract("month", ReceiptsMonthly.month), Integer
+                func.extract("month", ReceiptsMonthRollup.month), Integer
             ).label("month")
 
             columns = [month_trunc]
 
             columns.append(
-                func.round(
-                    func.sum(func.cast(ReceiptsMonthly.check_sum, Numeric)), 2
-                ).label("turnover")
+                func.round(func.sum(ReceiptsMonthRollup.check_sum), 2).label("turnover")
             )
 
             columns.append(
-                func.count(ReceiptsMonthly.check_count).label("receipts_count")
+                cast(func.sum(ReceiptsMonthRollup.source_rows), BigInteger).label("receipts_count")
             )
 
             query = (
                 select(*columns)
-                .where(
-                    func.extract("year", ReceiptsMonthly.month) == filters.year,
-                )
-                .group_by(month_trunc)
-                .order_by(month_trunc)
+                .where(ReceiptsMonthRollup.year == filters.year)
+                .group_by(ReceiptsMonthRollup.month)
+                .order_by(ReceiptsMonthRollup.month)
             )
 
-            if filters.region != RegionEnum.rk:
+            region_filter = _rollup_region_filter(ReceiptsMonthRollup, filters)
+            if region_filter is not None:
+                query = query.filter(region_filter)
+            elif filters.region != RegionEnum.rk:
                 geom = territory_to_geo_element(filters.territory)
-                query = query.join(Kkms, ReceiptsMonthly.kkms_id == Kkms.id).filter(
-                    func.ST_Intersects(Kkms.shape, geom)
+                query = query.filter(
+                    func.ST_Intersects(ReceiptsMonthRollup.kkm_shape, geom)
                 )
 
             result = await self._session.execute(query)
@@ -1348,14 +1424,7 @@ class ReceiptsRepo(BaseWithKkmRepository):
         try:
             current_year = current_date.year
 
-            # Подзапрос для активных ККМ
-            active_kkm_subq = (
-                select(func.count(Kkms.id).label("active_count"))
-                .select_from(Kkms)
-                .filter(Kkms.date_stop.is_(None))
-            )
-
-            # Подзапрос для дневной статистики
+            active_kkm_subq = select(func.count().label("active_kkm_count"))
             daily_stats_subq = select(
                 func.coalesce(func.sum(ReceiptsDaily.check_sum), 0).label(
                     "daily_turnover"
@@ -1364,8 +1433,6 @@ class ReceiptsRepo(BaseWithKkmRepository):
                     "daily_receipts_count"
                 ),
             ).select_from(ReceiptsDaily)
-
-            # Подзапрос для годовой статистики
             yearly_stats_subq = (
                 select(
                     func.coalesce(func.sum(ReceiptsAnnual.check_sum), 0).label(
@@ -1378,47 +1445,56 @@ class ReceiptsRepo(BaseWithKkmRepository):
                 .select_from(ReceiptsAnnual)
                 .filter(ReceiptsAnnual.year == current_year)
             )
-
             gtin_stats_subq = select(
                 func.coalesce(func.sum(GtinStat.gtin_count), 0).label("gtin_count")
             ).select_from(GtinStat)
 
-            # Применяем территориальную фильтрацию если территория указана
-            if territory_wkt:
-                active_kkm_subq = active_kkm_subq.join(
-                    Organizations, Kkms.organization_id == Organizations.id
-                ).filter(func.ST_Intersects(Organizations.shape, territory_wkt))
-                daily_stats_subq = (
-                    daily_stats_subq.join(Kkms, ReceiptsDaily.kkms_id == Kkms.id)
-                    .join(Organizations, Kkms.organization_id == Organizations.id)
-                    .filter(func.ST_Intersects(Organizations.shape, territory_wkt))
+            if territory_wkt is not None:
+                # Набор ККМ территории вычисляется один раз и переиспользуется
+                scope = self.generate_territory_scope_cte(territory_wkt)
+                active_kkm_subq = active_kkm_subq.select_from(scope).filter(
+                    scope.c.is_active
                 )
-                yearly_stats_subq = (
-                    yearly_stats_subq.join(Kkms, ReceiptsAnnual.kkms_id == Kkms.id)
-                    .join(Organizations, Kkms.organization_id == Organizations.id)
-                    .filter(func.ST_Intersects(Organizations.shape, territory_wkt))
+                daily_stats_subq = daily_stats_subq.join(
+                    scope, ReceiptsDaily.kkms_id == scope.c.kkm_id
+                )
+                yearly_stats_subq = yearly_stats_subq.join(
+                    scope, ReceiptsAnnual.kkms_id == scope.c.kkm_id
+                )
+            else:
+                active_kkm_subq = active_kkm_subq.select_from(Kkms).filter(
+                    Kkms.date_stop.is_(None)
                 )
 
-            # Выполняем запросы
-            active_count_result = await self._session.execute(active_kkm_subq)
-            active_count = active_count_result.scalar() or 0
-
-            daily_result = await self._session.execute(daily_stats_subq)
-            daily_row = daily_result.one()
+            active_kkm_subq = active_kkm_subq.subquery("active_kkm")
+            daily_stats_subq = daily_stats_subq.subquery("daily_stats")
+            yearly_stats_subq = yearly_stats_subq.subquery("yearly_stats")
+            gtin_stats_subq = gtin_stats_subq.subquery("gtin_stats")
 
-            yearly_result = await self._session.execute(yearly_stats_subq)
-            yearly_row = yearly_result.one()
+            # Все агрегаты однострочные, поэтому соединяем их по true
+            query = select(
+                active_kkm_subq.c.active_kkm_count,
+                daily_stats_subq.c.daily_turnover,
+                daily_stats_subq.c.daily_receipts_count,
+                yearly_stats_subq.c.yearly_turnover,
+                yearly_stats_subq.c.yearly_receipts_count,
+                gtin_stats_subq.c.gtin_count,
+            ).select_from(
+                active_kkm_subq.join(daily_stats_subq, true())
+                .join(yearly_stats_subq, true())
+                .join(gtin_stats_subq, true())
+            )
 
-            gtin_result = await self._session.execute(gtin_stats_subq)
-            gtin_count = gtin_result.scalar() or 0
+            result = await self._session.execute(query)
+            row = result.one()
 
             return {
-                "active_kkm_count": active_count,
-                "daily_turnover": float(daily_row.daily_turnover),
-                "daily_receipts_count": int(daily_row.daily_receipts_count),
-                "yearly_turnover": float(yearly_row.yearly_turnover),
-                "yearly_receipts_count": int(yearly_row.yearly_receipts_count),
-                "gtin_count": int(gtin_count),
+                "active_kkm_count": int(row.active_kkm_count or 0),
+                "daily_turnover": float(row.daily_turnover),
+                "daily_receipts_count": int(row.daily_receipts_count),
+                "yearly_turnover": float(row.yearly_turnover),
+                "yearly_receipts_count": int(row.yearly_receipts_count),
+                "gtin_count": int(row.gtin_count),
             }
 
         except SQLAlchemyError as e:
@@ -1497,44 +1573,45 @@ class ReceiptsRepo(BaseWithKkmRepository):
             logger.error(f"Ошибка при получении чеков с деталями: {e}")
             raise
 
+    def _last10_details_query(self, receipts_subquery):
+        """Позиции чеков из витрины last_10_details для отобранных чеков"""
+        return (
+            select(
+                Last10ReceiptDetails.fiskal_sign,
+                Last10ReceiptDetails.reg_number,
+                Last10ReceiptDetails.full_item_price,
+                Last10ReceiptDetails.serial_number,
+                Last10ReceiptDetails.operation_date,
+                Last10ReceiptDetails.name_ru,
+                Last10ReceiptDetails.address,
+                Last10ReceiptDetails.item_name,
+                Last10ReceiptDetails.item_price,
+                Last10ReceiptDetails.item_count,
+                Last10ReceiptDetails.item_nds,
+                Last10ReceiptDetails.payment_type,
+            )
+            .join(
+                receipts_subquery,
+                and_(
+                    Last10ReceiptDetails.kkms_id == receipts_subquery.c.kkms_id,
+                    Last10ReceiptDetails.fiskal_sign == receipts_subquery.c.fiskal_sign,
+                ),
+            )
+            .order_by(desc(Last10ReceiptDetails.operation_date))
+        )
+
     async def _get_latest_from_last10_table(self, kkm_id: int, limit: int = 10):
         try:
             last10_subquery = (
-                select(Last10Receipts)
+                select(Last10Receipts.kkms_id, Last10Receipts.fiskal_sign)
                 .where(Last10Receipts.kkms_id == kkm_id)
                 .order_by(desc(Last10Receipts.operation_date))
                 .limit(limit)
             ).subquery("l")
 
-            query = (
-                select(
-                    Receipts.fiskal_sign,
-                    Kkms.reg_number,
-                    Receipts.full_item_price,
-                    Kkms.serial_number,
-                    Receipts.operation_date,
-                    Organizations.name_ru,
-                    Kkms.address,
-                    Receipts.item_name,
-                    Receipts.item_price,
-                    Receipts.item_count,
-                    Receipts.item_nds,
-                    Receipts.payment_type,
-                )
-                .select_from(last10_subquery)
-                .join(
-                    Receipts,
-                    and_(
-                        Receipts.kkms_id == last10_subquery.c.kkms_id,
-                        Receipts.fiskal_sign == last10_subquery.c.fiskal_sign,
-                    ),
-                )
-                .join(Kkms, Kkms.id == last10_subquery.c.kkms_id)
-                .join(Organizations, Organizations.id == Kkms.organization_id)
-                .order_by(desc(last10_subquery.c.operation_date))
+            result = await self._session.execute(
+                self._last10_details_query(last10_subquery)
             )
-
-            result = await self._session.execute(query)
             records = result.all()
 
             logger.info(
@@ -1550,46 +1627,22 @@ class ReceiptsRepo(BaseWithKkmRepository):
         self, organization_id: int, limit: int = 100
     ):
         try:
-            kkm_ids_subquery = (
-                select(Kkms.id).where(Kkms.organization_id == organization_id)
-            ).scalar_subquery()
-
+            # Витрина хранит organization_id, поэтому ККМ и organizations не нужны
             last10_subquery = (
-                select(Last10Receipts)
-                .where(Last10Receipts.kkms_id.in_(kkm_ids_subquery))
-                .order_by(desc(Last10Receipts.operation_date))
+                select(
+                    Last10ReceiptDetails.kkms_id,
+                    Last10ReceiptDetails.fiskal_sign,
+                    Last10ReceiptDetails.operation_date,
+                )
+                .where(Last10ReceiptDetails.organization_id == organization_id)
+                .distinct()
+                .order_by(desc(Last10ReceiptDetails.operation_date))
                 .limit(limit)
             ).subquery("l")
 
-            query = (
-                select(
-                    Receipts.fiskal_sign,
-                    Kkms.reg_number,
-                    Receipts.full_item_price,
-                    Kkms.serial_number,
-                    Receipts.operation_date,
-                    Organizations.name_ru,
-                    Kkms.address,
-                    Receipts.item_name,
-                    Receipts.item_price,
-                    Receipts.item_count,
-                    Receipts.item_nds,
-                    Receipts.payment_type,
-                )
-                .select_from(last10_subquery)
-                .join(
-                    Receipts,
-                    and_(
-                        Receipts.kkms_id == last10_subquery.c.kkms_id,
-                        Receipts.fiskal_sign == last10_subquery.c.fiskal_sign,
-                    ),
-                )
-                .join(Kkms, Kkms.id == last10_subquery.c.kkms_id)
-                .join(Organizations, Organizations.id == Kkms.organization_id)
-                .order_by(desc(last10_subquery.c.operation_date))
+            result = await self._session.execute(
+                self._last10_details_query(last10_subquery)
             )
-
-            result = await self._session.execute(query)
             records = result.all()
 
             logger.info(
@@ -1603,6 +1656,72 @@ class ReceiptsRepo(BaseWithKkmRepository):
             )
             raise
 
+    async def get_last10_receipts_since(
+        self, after: Optional[Tuple[datetime, int, int]] = None, limit: int = 500
+    ):
+        """
+        Не больше limit чеков из last_10 после курсора after = (operation_date,
+        kkms_id, fiskal_sign) с деталями, в порядке возрастания курсора. Без
+        after - последние limit чеков. Лимит считается в чеках, а не в позициях.
+        Используется лентой чеков в реальном времени.
+        """
+        try:
+            cursor = tuple_(
+                Last10Receipts.operation_date,
+                Last10Receipts.kkms_id,
+                Last10Receipts.fiskal_sign,
+            )
+            last10_subquery = select(Last10Receipts)
+            if after is not None:
+                last10_subquery = last10_subquery.where(
+                    # Отдельное условие по дате - для индекса по operation_date
+                    Last10Receipts.operation_date >= after[0],
+                    cursor > tuple_(*after),
+                ).order_by(*cursor.clauses)
+            else:
+                last10_subquery = last10_subquery.order_by(
+                    *(desc(column) for column in cursor.clauses)
+                )
+            last10_subquery = last10_subquery.limit(limit).subquery("l")
+
+            query = (
+                select(
+                    Last10ReceiptDetails.kkms_id,
+                    Last10ReceiptDetails.organization_id,
+                    Last10ReceiptDetails.fiskal_sign,
+                    Last10ReceiptDetails.reg_number,
+                    Last10ReceiptDetails.full_item_price,
+                    Last10ReceiptDetails.serial_number,
+                    Last10ReceiptDetails.operation_date,
+                    Last10ReceiptDetails.name_ru,
+                    Last10ReceiptDetails.address,
+                    Last10ReceiptDetails.item_name,
+                    Last10ReceiptDetails.item_price,
+                    Last10ReceiptDetails.item_count,
+                    Last10ReceiptDetails.item_nds,
+                    Last10ReceiptDetails.payment_type,
+                )
+                .join(
+                    last10_subquery,
+                    and_(
+                        Last10ReceiptDetails.kkms_id == last10_subquery.c.kkms_id,
+                        Last10ReceiptDetails.fiskal_sign == last10_subquery.c.fiskal_sign,
+                    ),
+                )
+                .order_by(
+                    last10_subquery.c.operation_date,
+                    last10_subquery.c.kkms_id,
+                    last10_subquery.c.fiskal_sign,
+                )
+            )
+
+            result = await self._session.execute(query)
+            return [dict(record._mapping) for record in result.all()]
+
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при получении новых чеков из last_10: {e}")
+            raise
+
     async def _get_latest_standard_query(
         self, filters: ReceiptsLatestFilterDto, limit: int
     ):
@@ -1759,31 +1878,30 @@ class SzptRepo(BaseRepository):
     async def count_by_year_and_regions(self, filters: SzptRegionRequestDto):
         try:
             query = select(
-                func.round(func.sum(KkmsSzpt.szpt_sum.cast(Numeric)), 2).label(
-                    "turnover"
+                func.round(func.sum(KkmsSzptMonthRollup.szpt_sum), 2).label("turnover"),
+                func.count(func.distinct(KkmsSzptMonthRollup.kkms_id)).label(
+                    "kkms_count"
                 ),
-                func.count(func.distinct(KkmsSzpt.kkms_id)).label("kkms_count"),
-            ).where(func.extract("year", KkmsSzpt.month) == filters.year)
+            ).where(KkmsSzptMonthRollup.year == filters.year)
 
-            if filters.region != RegionEnum.rk:
+            region_filter = _rollup_region_filter(KkmsSzptMonthRollup, filters)
+            if region_filter is not None:
+                query = query.where(region_filter)
+            elif filters.region != RegionEnum.rk:
                 territory_geom = territory_to_geo_element(filters.territory)
-                query = query.join(Kkms, KkmsSzpt.kkms_id == Kkms.id).where(
-                    ST_Within(Kkms.shape, territory_geom)
+                query = query.where(
+                    ST_Within(KkmsSzptMonthRollup.kkm_shape, territory_geom)
                 )
 
             if filters.szpt_id:
-                clean_count_val = cast(
-                    func.nullif(cast(KkmsSzpt.szpt_count, Text), "NaN"), Numeric
-                )
-
                 szpt_count_col = cast(
-                    func.round(func.sum(clean_count_val), 2), Numeric
+                    func.round(func.sum(KkmsSzptMonthRollup.szpt_count), 2), Numeric
                 ).label("szpt_count")
 
                 query = (
                     query.add_columns(szpt_count_col, DicSzpt.unit)
-                    .join(DicSzpt, KkmsSzpt.szpt_id == DicSzpt.id)
-                    .where(KkmsSzpt.szpt_id == filters.szpt_id)
+                    .join(DicSzpt, KkmsSzptMonthRollup.szpt_id == DicSzpt.id)
+                    .where(KkmsSzptMonthRollup.szpt_id == filters.szpt_id)
                     .group_by(DicSzpt.unit)
                 )
 
@@ -1797,37 +1915,38 @@ class SzptRepo(BaseRepository):
 
     async def monthly_by_year_and_region(self, filters: SzptRegionRequestDto):
         try:
-            month_extract = func.extract("month", KkmsSzpt.month)
+            month_extract = cast(
+                func.extract("month", KkmsSzptMonthRollup.month), Integer
+            )
 
             query = (
                 select(
-                    cast(month_extract, Integer).label("month"),
-                    func.round(func.sum(KkmsSzpt.szpt_sum.cast(Numeric)), 2).label(
+                    month_extract.label("month"),
+                    func.round(func.sum(KkmsSzptMonthRollup.szpt_sum), 2).label(
                         "turnover"
                     ),
                 )
-                .where(func.extract("year", KkmsSzpt.month) == filters.year)
-                .group_by(month_extract)
-                .order_by(month_extract)
+                .where(KkmsSzptMonthRollup.year == filters.year)
+                .group_by(KkmsSzptMonthRollup.month)
+                .order_by(KkmsSzptMonthRollup.month)
             )
 
             if filters.szpt_id:
-                clean_count_val = cast(
-                    func.nullif(cast(KkmsSzpt.szpt_count, Text), "NaN"), Numeric
-                )
-
                 szpt_count_col = cast(
-                    func.round(func.sum(clean_count_val), 2), Numeric
+                    func.round(func.sum(KkmsSzptMonthRollup.szpt_count), 2), Numeric
                 ).label("szpt_count")
 
                 query = query.add_columns(szpt_count_col).where(
-                    KkmsSzpt.szpt_id == filters.szpt_id
+                    KkmsSzptMonthRollup.szpt_id == filters.szpt_id
                 )
 
-            if filters.region != RegionEnum.rk:
+            region_filter = _rollup_region_filter(KkmsSzptMonthRollup, filters)
+            if region_filter is not None:
+                query = query.where(region_filter)
+            elif filters.region != RegionEnum.rk:
                 territory_geom = territory_to_geo_element(filters.territory)
-                query = query.join(Kkms, KkmsSzpt.kkms_id == Kkms.id).where(
-                    ST_Within(Kkms.shape, territory_geom)
+                query = query.where(
+                    ST_Within(KkmsSzptMonthRollup.kkm_shape, territory_geom)
                 )
 
             result = await self._session.execute(query)
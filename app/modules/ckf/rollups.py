@@ -0,0 +1,354 @@
+"""
+Пересчёт агрегатов (rollup) по чекам и витрины последних чеков last_10_details.
+
+Запуск после ночной загрузки чеков:
+
+    python -m app.modules.ckf.rollups                    # полный пересчёт
+    python -m app.modules.ckf.rollups --since 2025-06-01 # только месяцы с указанной даты
+
+Пересчёт выполняется в одной транзакции (DELETE + INSERT ... SELECT), поэтому
+читатели до коммита видят прежние агрегаты.
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy import Date, DateTime, Integer, Numeric, Text, and_, cast, delete, func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import Executable
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import async_session_maker
+from app.modules.ext.kazgeodesy.models import KazgeodesyRkOblasti, KazgeodesyRkRaiony
+from .models import (
+    Kkms,
+    KkmsSzpt,
+    KkmsSzptMonthRollup,
+    Last10ReceiptDetails,
+    Last10Receipts,
+    Organizations,
+    Receipts,
+    ReceiptsAnnual,
+    ReceiptsDaily,
+    ReceiptsKkmRollup,
+    ReceiptsMonthRollup,
+    ReceiptsMonthly,
+)
+
+
+def _kkm_regions_cte():
+    """Область и район каждой ККМ (по точке ККМ), вычисляются один раз за пересчёт"""
+    oblast_sq = (
+        select(KazgeodesyRkOblasti.id)
+        .where(func.ST_Covers(KazgeodesyRkOblasti.geom, Kkms.shape))
+        .limit(1)
+        .scalar_subquery()
+    )
+    raion_sq = (
+        select(KazgeodesyRkRaiony.id)
+        .where(func.ST_Covers(KazgeodesyRkRaiony.geom, Kkms.shape))
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    return select(
+        Kkms.id.label("kkm_id"),
+        oblast_sq.label("oblast_id"),
+        raion_sq.label("raion_id"),
+    ).cte("kkm_regions")
+
+
+def receipts_month_rollup_statements(since: Optional[date] = None) -> List[Executable]:
+    regions = _kkm_regions_cte()
+    month_start = cast(func.date_trunc("month", ReceiptsMonthly.month), Date)
+
+    query = (
+        select(
+            ReceiptsMonthly.kkms_id,
+            Kkms.organization_id,
+            regions.c.oblast_id,
+            regions.c.raion_id,
+            month_start,
+            cast(func.extract("year", month_start), Integer),
+            func.sum(cast(ReceiptsMonthly.check_sum, Numeric)),
+            func.sum(ReceiptsMonthly.check_count),
+            func.count(ReceiptsMonthly.check_count),
+            Kkms.date_stop.is_(None),
+            Organizations.date_stop.is_(None),
+            Kkms.shape,
+            Organizations.shape,
+        )
+        .join(Kkms, ReceiptsMonthly.kkms_id == Kkms.id)
+        .join(Organizations, Kkms.organization_id == Organizations.id)
+        .join(regions, regions.c.kkm_id == Kkms.id)
+        .where(ReceiptsMonthly.month.is_not(None))
+        .group_by(
+            ReceiptsMonthly.kkms_id,
+            Kkms.id,
+            Organizations.id,
+            regions.c.oblast_id,
+            regions.c.raion_id,
+            month_start,
+        )
+    )
+
+    delete_query = delete(ReceiptsMonthRollup)
+    if since is not None:
+        query = query.where(ReceiptsMonthly.month >= since)
+        delete_query = delete_query.where(ReceiptsMonthRollup.month >= since)
+
+    return [
+        delete_query,
+        insert(ReceiptsMonthRollup).from_select(
+            [
+                "kkms_id",
+                "organization_id",
+                "oblast_id",
+                "raion_id",
+                "month",
+                "year",
+                "check_sum",
+                "check_count",
+                "source_rows",
+                "kkm_active",
+                "organization_active",
+                "kkm_shape",
+                "organization_shape",
+            ],
+            query,
+        ),
+    ]
+
+
+def kkms_szpt_month_rollup_statements(since: Optional[date] = None) -> List[Executable]:
+    regions = _kkm_regions_cte()
+    month_start = cast(func.date_trunc("month", KkmsSzpt.month), Date)
+    clean_count_val = cast(func.nullif(cast(KkmsSzpt.szpt_count, Text), "NaN"), Numeric)
+
+    query = (
+        select(
+            KkmsSzpt.kkms_id,
+            KkmsSzpt.szpt_id,
+            regions.c.oblast_id,
+            regions.c.raion_id,
+            month_start,
+            cast(func.extract("year", month_start), Integer),
+            func.sum(cast(KkmsSzpt.szpt_sum, Numeric)),
+            func.sum(clean_count_val),
+            Kkms.shape,
+        )
+        .join(Kkms, KkmsSzpt.kkms_id == Kkms.id)
+        .join(regions, regions.c.kkm_id == Kkms.id)
+        .where(KkmsSzpt.month.is_not(None), KkmsSzpt.szpt_id.is_not(None))
+        .group_by(
+            KkmsSzpt.kkms_id,
+            KkmsSzpt.szpt_id,
+            Kkms.id,
+            regions.c.oblast_id,
+            regions.c.raion_id,
+            month_start,
+        )
+    )
+
+    delete_query = delete(KkmsSzptMonthRollup)
+    if since is not None:
+        query = query.where(KkmsSzpt.month >= since)
+        delete_query = delete_query.where(KkmsSzptMonthRollup.month >= since)
+
+    return [
+        delete_query,
+        insert(KkmsSzptMonthRollup).from_select(
+            [
+                "kkms_id",
+                "szpt_id",
+                "oblast_id",
+                "raion_id",
+                "month",
+                "year",
+                "szpt_sum",
+                "szpt_count",
+                "kkm_shape",
+            ],
+            query,
+        ),
+    ]
+
+
+def receipts_kkm_rollup_statements() -> List[Executable]:
+    regions = _kkm_regions_cte()
+
+    daily = (
+        select(
+            ReceiptsDaily.kkms_id,
+            func.sum(cast(ReceiptsDaily.check_sum, Numeric)).label("check_sum"),
+            func.sum(ReceiptsDaily.check_count).label("check_count"),
+        )
+        .group_by(ReceiptsDaily.kkms_id)
+        .subquery("daily")
+    )
+    annual = (
+        select(
+            ReceiptsAnnual.kkms_id,
+            func.sum(cast(ReceiptsAnnual.check_sum, Numeric)).label("check_sum"),
+            func.sum(ReceiptsAnnual.check_count).label("check_count"),
+        )
+        .group_by(ReceiptsAnnual.kkms_id)
+        .subquery("annual")
+    )
+
+    query = (
+        select(
+            Kkms.id,
+            Kkms.organization_id,
+            Organizations.iin_bin,
+            Kkms.reg_number,
+            regions.c.oblast_id,
+            regions.c.raion_id,
+            daily.c.check_sum,
+            daily.c.check_count,
+            annual.c.check_sum,
+            annual.c.check_count,
+            Kkms.date_stop.is_(None),
+            Kkms.shape,
+        )
+        .join(Organizations, Kkms.organization_id == Organizations.id)
+        .join(regions, regions.c.kkm_id == Kkms.id)
+        .outerjoin(daily, daily.c.kkms_id == Kkms.id)
+        .outerjoin(annual, annual.c.kkms_id == Kkms.id)
+        .where((daily.c.kkms_id.is_not(None)) | (annual.c.kkms_id.is_not(None)))
+    )
+
+    return [
+        delete(ReceiptsKkmRollup),
+        insert(ReceiptsKkmRollup).from_select(
+            [
+                "kkms_id",
+                "organization_id",
+                "iin_bin",
+                "reg_number",
+                "oblast_id",
+                "raion_id",
+                "daily_sum",
+                "daily_count",
+                "annual_sum",
+                "annual_count",
+                "kkm_active",
+                "kkm_shape",
+            ],
+            query,
+        ),
+    ]
+
+
+def rollup_statements(since: Optional[date] = None) -> List[Executable]:
+    """
+    Пересчёт агрегатов receipts_month_rollup, kkms_szpt_month_rollup и
+    receipts_kkm_rollup. Выполняются по порядку в одной транзакции
+    """
+    if since is not None:
+        # Агрегаты хранятся помесячно, пересчитываем месяц целиком
+        since = since.replace(day=1)
+
+    return [
+        *receipts_month_rollup_statements(since),
+        *kkms_szpt_month_rollup_statements(since),
+        *receipts_kkm_rollup_statements(),
+    ]
+
+
+async def refresh_last10_details(session: AsyncSession) -> None:
+    """
+    Полная пересборка last_10_details. В обычной работе таблицу поддерживает
+    триггер на last_10; пересборка нужна, если чеки загружены позже last_10.
+    """
+    day_start = func.date_trunc("day", Last10Receipts.operation_date, type_=DateTime)
+    query = (
+        select(
+            Receipts.id,
+            Last10Receipts.kkms_id,
+            Kkms.organization_id,
+            Last10Receipts.fiskal_sign,
+            Last10Receipts.operation_date,
+            Kkms.reg_number,
+            Kkms.serial_number,
+            Kkms.address,
+            Organizations.name_ru,
+            Receipts.item_name,
+            Receipts.item_price,
+            Receipts.item_count,
+            Receipts.item_nds,
+            Receipts.full_item_price,
+            Receipts.payment_type,
+        )
+        .select_from(Last10Receipts)
+        .join(
+            Receipts,
+            and_(
+                Receipts.kkms_id == Last10Receipts.kkms_id,
+                Receipts.fiskal_sign == Last10Receipts.fiskal_sign,
+                # День чека, как в триггере: поиск только в секции receipts этого дня
+                Receipts.operation_date >= day_start,
+                Receipts.operation_date < day_start + timedelta(days=1),
+            ),
+        )
+        .join(Kkms, Kkms.id == Last10Receipts.kkms_id)
+        .join(Organizations, Organizations.id == Kkms.organization_id)
+    )
+
+    await session.execute(delete(Last10ReceiptDetails))
+    await session.execute(
+        insert(Last10ReceiptDetails).from_select(
+            [
+                "receipt_id",
+                "kkms_id",
+                "organization_id",
+                "fiskal_sign",
+                "operation_date",
+                "reg_number",
+                "serial_number",
+                "address",
+                "name_ru",
+                "item_name",
+                "item_price",
+                "item_count",
+                "item_nds",
+                "full_item_price",
+                "payment_type",
+            ],
+            query,
+        )
+    )
+
+
+async def refresh_rollups(session: AsyncSession, since: Optional[date] = None) -> None:
+    """Пересчитывает все агрегаты по чекам в рамках транзакции переданной сессии"""
+    try:
+        for statement in rollup_statements(since):
+            await session.execute(statement)
+        await refresh_last10_details(session)
+        logger.info(f"Агрегаты по чекам пересчитаны (с {since or 'начала'})")
+    except SQLAlchemyError as e:
+        logger.error(f"Ошибка при пересчёте агрегатов по чекам: {e}")
+        raise
+
+
+async def main(since: Optional[date] = None) -> None:
+    async with async_session_maker() as session:
+        async with session.begin():
+            await refresh_rollups(session, since)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчёт агрегатов по чекам")
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        default=None,
+        help="Пересчитать только месяцы начиная с даты (YYYY-MM-DD)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.since))
@@ -6,9 +6,11 @@ Author: RaiMX
 Copyright (c) 2025 RaiMX
 """
 
-from app.modules.admins.models import Employees
+from app.database.timeouts import is_query_canceled
+from app.modules.admins.principal import EmployeePrincipal
 from app.modules.nsi.dtos import SimpleRefDto
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from typing import Annotated, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
@@ -41,7 +43,9 @@ from app.modules.common.router import (
     request_key_builder,
     cache_ttl,
 )
+from app.modules.common.export import ExportFormat, export_response, get_export_format
 from app.modules.common.mappers import to_regions_filter_dto
+from app.modules.common.result_caps import Pagination, get_pagination
 from app.modules.common.utils import territory_to_geo_element
 from .dtos import (
     EsfSellerBuyerDto,
@@ -118,11 +122,33 @@ from .models import (
     DicSzpt,
 )  # noqa
 from .mappers import to_organization_count_by_regions_response
+from .live import live_receipts_feed, to_sse_event
 from datetime import date
 
 router = APIRouter(prefix="/ckf")
 
 
+async def _check_territory_access(
+    session: AsyncSession,
+    filters: OrganizationsFilterDto,
+    territory_info: UserTerritoryInfo,
+    user_territory_geom: Optional[WKTElement],
+) -> None:
+    """403, если запрошенная территория выходит за территорию доступа пользователя"""
+    if not filters.territory or user_territory_geom is None:
+        return
+
+    has_access = await OrganizationsRepo(session).validate_user_territory_access(
+        filters.territory, user_territory_geom
+    )
+    if not has_access:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Нет доступа к указанной территории. "
+            f"Доступ ограничен: {territory_info.territory_name}",
+        )
+
+
 class OrganizationsRouter(APIRouter):
     sub_router = APIRouter(prefix="/organizations", tags=["ckf: organizations"])
     base_router = BaseCRUDRouter(
@@ -145,11 +171,29 @@ class OrganizationsRouter(APIRouter):
     @cache(expire=cache_ttl, key_builder=request_key_builder)  # Кэширование на 24 часа
     async def filter(
         filters: Annotated[OrganizationsFilterDto, Query()],
+        pagination: Pagination = Depends(get_pagination),
         session: AsyncSession = Depends(get_session_with_commit),
     ):
-        response = await OrganizationsRepo(session).filter(filters)
+        response = await OrganizationsRepo(session).filter(filters, pagination)
         return [OrganizationDto.model_validate(item) for item in response]
 
+    @sub_router.get("/filter/export", response_class=StreamingResponse)
+    async def export_filter(
+        filters: Annotated[OrganizationsFilterDto, Query()],
+        export_format: ExportFormat = Depends(get_export_format),
+    ):
+        """
+        Выгрузка организаций по фильтрам потоком в NDJSON или CSV
+
+        - **format**: ndjson или csv, либо заголовок Accept: application/x-ndjson / text/csv
+        """
+        return export_response(
+            lambda session: OrganizationsRepo(session).stream_filter(filters),
+            OrganizationDto,
+            export_format,
+            "organizations",
+        )
+
     @sub_router.get("/bbox")
     @cache(expire=cache_ttl, key_builder=request_key_builder)
     async def get_by_bbox(
@@ -434,7 +478,7 @@ class OrganizationsRouter(APIRouter):
     )
     async def secure_filter_organizations(
         filters: Annotated[OrganizationsFilterDto, Query()],
-        current_employee: Employees = Depends(get_current_employee),
+        current_employee: EmployeePrincipal = Depends(get_current_employee),
         territory_info: UserTerritoryInfo = Depends(get_user_territory_info),
         user_territory_geom: WKTElement = Depends(get_user_territory_geom),
         session: AsyncSession = Depends(get_session_without_commit),
@@ -460,18 +504,9 @@ class OrganizationsRouter(APIRouter):
                 f"({territory_info.territory_level}: {territory_info.territory_name})"
             )
 
-            if filters.territory and user_territory_geom is not None:
-                repo = OrganizationsRepo(session)
-                has_access = await repo.validate_user_territory_access(
-                    filters.territory, user_territory_geom
-                )
-
-                if not has_access:
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail=f"Нет доступа к указанной территории. "
-                        f"Доступ ограничен: {territory_info.territory_name}",
-                    )
+            await _check_territory_access(
+                session, filters, territory_info, user_territory_geom
+            )
 
             repo = OrganizationsRepo(session)
             organizations = await repo.filter_with_territory(
@@ -488,6 +523,8 @@ class OrganizationsRouter(APIRouter):
         except HTTPException:
             raise
         except Exception as e:
+            if is_query_canceled(e):
+                raise
             logger.error(
                 f"Ошибка при получении организаций для пользователя {current_employee.login}: {e}"
             )
@@ -496,11 +533,47 @@ class OrganizationsRouter(APIRouter):
                 detail="Внутренняя ошибка сервера при получении данных",
             )
 
+    @sub_router.get(
+        "/secure-filter/export",
+        summary="Выгрузка организаций с территориальным ограничением",
+        response_class=StreamingResponse,
+    )
+    async def export_secure_filter(
+        filters: Annotated[OrganizationsFilterDto, Query()],
+        export_format: ExportFormat = Depends(get_export_format),
+        current_employee: EmployeePrincipal = Depends(get_current_employee),
+        territory_info: UserTerritoryInfo = Depends(get_user_territory_info),
+        user_territory_geom: WKTElement = Depends(get_user_territory_geom),
+        session: AsyncSession = Depends(get_session_without_commit),
+    ):
+        """
+        То же, что /secure-filter, но потоком в NDJSON или CSV.
+
+        - **format**: ndjson или csv, либо заголовок Accept: application/x-ndjson / text/csv
+        """
+        await _check_territory_access(
+            session, filters, territory_info, user_territory_geom
+        )
+
+        logger.info(
+            f"Выгрузка организаций для пользователя {current_employee.login} "
+            f"({territory_info.territory_level}: {territory_info.territory_name})"
+        )
+
+        return export_response(
+            lambda export_session: OrganizationsRepo(
+                export_session
+            ).stream_filter_with_territory(filters, user_territory_geom),
+            OrganizationDto,
+            export_format,
+            "organizations",
+        )
+
     @sub_router.get(
         "/my-territory-info", summary="Информация о территориальных правах доступа"
     )
     async def get_my_territory_info(
-        current_employee: Employees = Depends(get_current_employee),
+        current_employee: EmployeePrincipal = Depends(get_current_employee),
         territory_info: UserTerritoryInfo = Depends(get_user_territory_info),
     ) -> dict:
         """
@@ -1112,6 +1185,37 @@ class ReceiptsRouter(APIRouter):
         return [ReceiptDetailDto.model_validate(item) for item in response]
 
 
+    @sub_router.get("/live")
+    async def get_live_receipts(
+        request: Request,
+        kkm_id: Optional[int] = Query(None, description="ID ККМ для фильтрации"),
+        organization_id: Optional[int] = Query(
+            None, description="ID организации для фильтрации"
+        ),
+    ):
+        """
+        Лента новых чеков (Server-Sent Events). Сначала отдаются чеки из буфера
+        воркера, затем новые по мере поступления в last_10.
+
+        Каждое событие `receipt` содержит kkm_id, organization_id, fiskal_sign,
+        operation_date и позиции чека (items) в формате ReceiptDetailDto.
+        """
+
+        async def event_stream():
+            async for receipt in live_receipts_feed.subscribe(
+                kkm_id=kkm_id, organization_id=organization_id
+            ):
+                if await request.is_disconnected():
+                    break
+                yield to_sse_event(receipt)
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
 class SzptRouter(APIRouter):
     sub_router = APIRouter(prefix="/szpt-products", tags=["ckf: szpt"])
     base_router = BaseCRUDRouter(
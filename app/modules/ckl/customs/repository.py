@@ -1,6 +1,9 @@
+from typing import Optional
+
 from sqlalchemy import select
 
 from app.modules.common.repository import BaseRepository
+from app.modules.common.result_caps import Pagination, fetch_capped
 
 from .models import (
     BookingStatuses,
@@ -146,16 +149,17 @@ class CustomsBookingsRepo(BaseRepository):
         result = await self._session.execute(query)
         return result.scalars().all()
 
-    async def get_active_bookings(self):
+    async def get_active_bookings(self, pagination: Optional[Pagination] = None):
         """Get all active bookings that require inspection"""
         query = (
             select(self.model)
             .where(self.model.is_inspection_required.is_(True))
             .where(self.model.inspection_id.is_(None))
-            .order_by(self.model.preferred_entry_timestamp)
+            .order_by(self.model.preferred_entry_timestamp, self.model.id)
+        )
+        return await fetch_capped(
+            self._session, query, "CustomsBookingsRepo.get_active_bookings", pagination
         )
-        result = await self._session.execute(query)
-        return result.scalars().all()
 
     async def get_bookings_by_status(self, status_id: int):
         """Get bookings by status"""
@@ -185,16 +189,22 @@ class CustomsCrossingsRepo(BaseRepository):
         result = await self._session.execute(query)
         return result.scalars().all()
 
-    async def get_crossings_requiring_inspection(self):
+    async def get_crossings_requiring_inspection(
+        self, pagination: Optional[Pagination] = None
+    ):
         """Get crossings that require inspection but haven't been inspected"""
         query = (
             select(self.model)
             .where(self.model.is_inspection_required.is_(True))
             .where(self.model.is_inspected.is_(False))
-            .order_by(self.model.timestamp)
+            .order_by(self.model.timestamp, self.model.id)
+        )
+        return await fetch_capped(
+            self._session,
+            query,
+            "CustomsCrossingsRepo.get_crossings_requiring_inspection",
+            pagination,
         )
-        result = await self._session.execute(query)
-        return result.scalars().all()
 
 
 class CustomsDocumentsRepo(BaseRepository):
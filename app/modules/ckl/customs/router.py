@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_cache.decorator import cache
 
 from app.database.deps import get_session_with_commit
+from app.modules.common.result_caps import Pagination, get_pagination
 from app.modules.common.router import BaseCRUDRouter, request_key_builder, cache_ttl
 
 from .models import (
@@ -329,8 +330,11 @@ class CustomsBookingsRouter(APIRouter):
 
     @sub_router.get("/active", response_model=List[CustomsBookingsDto], summary="Get active bookings requiring inspection")
     @cache(expire=cache_ttl, key_builder=request_key_builder)
-    async def get_active_bookings( session: AsyncSession = Depends(get_session_with_commit)):
-        records = await CustomsBookingsRepo(session).get_active_bookings()
+    async def get_active_bookings(
+        pagination: Pagination = Depends(get_pagination),
+        session: AsyncSession = Depends(get_session_with_commit),
+    ):
+        records = await CustomsBookingsRepo(session).get_active_bookings(pagination)
         return [CustomsBookingsDto.model_validate(record) for record in records]
 
     @sub_router.get("/by-status/{status_id}", response_model=List[CustomsBookingsDto], summary="Get bookings by status")
@@ -385,8 +389,13 @@ class CustomsCrossingsRouter(APIRouter):
         "/requiring-inspection", response_model=List[CustomsCrossingsDto], summary="Get crossings requiring inspection"
     )
     @cache(expire=cache_ttl, key_builder=request_key_builder)
-    async def get_crossings_requiring_inspection( session: AsyncSession = Depends(get_session_with_commit)):
-        records = await CustomsCrossingsRepo(session).get_crossings_requiring_inspection()
+    async def get_crossings_requiring_inspection(
+        pagination: Pagination = Depends(get_pagination),
+        session: AsyncSession = Depends(get_session_with_commit),
+    ):
+        records = await CustomsCrossingsRepo(session).get_crossings_requiring_inspection(
+            pagination
+        )
         return [CustomsCrossingsDto.model_validate(record) for record in records]
 
 
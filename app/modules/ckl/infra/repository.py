@@ -37,35 +37,36 @@ class RoadsRepo(BaseRepository):
         return response
     
     async def get_road_data(self, road_id: int):
-        query_vehicles = (
-            select(
-                func.count().label('vehicles_count'),
-            )
+        # Три счётчика считаются одним запросом через скалярные подзапросы
+        vehicles_count_sq = (
+            select(func.count())
             .select_from(Vehicles)
             .where(Vehicles.road_id == road_id, Vehicles.is_active == True)
+            .scalar_subquery()
         )
 
-        query_cameras = (
-            select(
-                func.count().label('cameras_count')
-            )
+        cameras_count_sq = (
+            select(func.count())
             .select_from(Cameras)
             .where(Cameras.roads_id == road_id)
+            .scalar_subquery()
         )
 
-        query_customs_offices = (
-            select(
-                func.count().label('customs_offices_count')
-            )
+        customs_offices_count_sq = (
+            select(func.count())
             .select_from(CustomsOffices)
             .where(CustomsOffices.road_id == road_id)
+            .scalar_subquery()
         )
 
-        vehicles = await self._session.execute(query_vehicles)
-        cameras = await self._session.execute(query_cameras)
-        customs_offices = await self._session.execute(query_customs_offices)
+        query = select(
+            vehicles_count_sq.label('vehicles_count'),
+            cameras_count_sq.label('cameras_count'),
+            customs_offices_count_sq.label('customs_offices_count'),
+        )
 
-        response = {'vehicles_count': vehicles.scalar(), 'cameras_count': cameras.scalar(), 'customs_offices_count': customs_offices.scalar()}
+        result = await self._session.execute(query)
+        response = dict(result.mappings().one())
 
         return response
 
@@ -1,6 +1,7 @@
 from sqlalchemy import select, case, func, distinct
 from geoalchemy2.functions import ST_Covers, ST_SetSRID
 
+from app.database.parallel import execute_concurrently
 from app.modules.common.repository import BaseRepository
 from ..common.models import Countries
 from ..infra.models import Roads, CameraEvents
@@ -131,10 +132,8 @@ class VehiclesRepo(BaseRepository):
             )
         )
 
-        result_location = await self._session.execute(query_location)
+        result_location, result_info = await execute_concurrently(query_location, query_info, session=self._session)
         response_location = result_location.mappings().one()
-
-        result_info = await self._session.execute(query_info)
         response_info = result_info.mappings().one()
 
         return {'raion': response_location['raion'], 'oblast':response_location['oblast'], **response_info}
@@ -163,10 +162,8 @@ class VehiclesRepo(BaseRepository):
             .limit(1)
         )
 
-        result_entry = await self._session.execute(query_entry)
+        result_entry, result_out = await execute_concurrently(query_entry, query_out, session=self._session)
         response_entry = result_entry.mappings().one()
-
-        result_out = await self._session.execute(query_out)
         response_out = result_out.mappings().one()
 
         return {'shape_entry': response_entry['shape'], 'shape_out': response_out['shape']}
@@ -1,8 +1,13 @@
-from typing import Optional, Any
-from sqlalchemy import TypeDecorator, String
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from sqlalchemy import ColumnElement, String, TypeDecorator, event, inspect, true
 from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import InstrumentedAttribute
 
-from .encryption import encrypt_personal_data, decrypt_personal_data
+from .encryption import blind_index, encrypt_personal_data, decrypt_personal_data
+
+# Колонка слепого индекса для зашифрованной колонки <name>
+BLIND_INDEX_SUFFIX = "_bidx"
 
 
 class EncryptedString(TypeDecorator):
@@ -67,6 +72,10 @@ class EncryptedString(TypeDecorator):
         """Создание копии типа"""
         return self.__class__(length=self.target_length, **kw)
 
+    def blind_index(self, value: Optional[str]) -> Any:
+        """Значение слепого индекса для записи (None - тип без индекса)"""
+        return None
+
 
 class EncryptedIIN(EncryptedString):
     """
@@ -97,6 +106,13 @@ class EncryptedIIN(EncryptedString):
 
         return super().process_bind_param(value, dialect)
 
+    def blind_index(self, value: Optional[str]) -> Optional[str]:
+        return blind_index.iin(value)
+
+    def blind_match(self, index: InstrumentedAttribute, value: str) -> ColumnElement:
+        """Только точное совпадение ИИН"""
+        return index == blind_index.iin(value)
+
 
 class EncryptedPersonName(EncryptedString):
     """
@@ -124,3 +140,96 @@ class EncryptedPersonName(EncryptedString):
                 value = value.title()
 
         return super().process_bind_param(value, dialect)
+
+    def blind_index(self, value: Optional[str]) -> Optional[List[str]]:
+        return blind_index.name_tokens(value)
+
+    def blind_match(self, index: InstrumentedAttribute, value: str) -> ColumnElement:
+        """Подстрока от 3 символов или начало имени (индекс GIN по массиву)"""
+        tokens = blind_index.name_search_tokens(value)
+        if not tokens:
+            return true()
+        return index.contains(tokens)
+
+
+@lru_cache(maxsize=None)
+def _indexed_columns(model: type) -> Dict[str, EncryptedString]:
+    """Зашифрованные колонки модели, у которых есть колонка <name>_bidx"""
+    mapper = inspect(model)
+    return {
+        attr.key: attr.columns[0].type
+        for attr in mapper.column_attrs
+        if isinstance(attr.columns[0].type, EncryptedString)
+        and attr.key + BLIND_INDEX_SUFFIX in mapper.column_attrs
+    }
+
+
+def track_blind_indexes(model: type) -> type:
+    """
+    Поддерживать колонки <name>_bidx модели при сохранении через ORM.
+    Для update()/insert() на уровне Core - with_blind_indexes
+    """
+
+    def set_indexes(mapper, connection, target, only_changed: bool) -> None:
+        state = inspect(target)
+        for key, column_type in _indexed_columns(model).items():
+            if only_changed and not state.attrs[key].history.has_changes():
+                continue
+            setattr(
+                target,
+                key + BLIND_INDEX_SUFFIX,
+                column_type.blind_index(getattr(target, key)),
+            )
+
+    event.listen(
+        model,
+        "before_insert",
+        lambda mapper, connection, target: set_indexes(mapper, connection, target, False),
+    )
+    event.listen(
+        model,
+        "before_update",
+        lambda mapper, connection, target: set_indexes(mapper, connection, target, True),
+    )
+    return model
+
+
+def with_blind_indexes(model: type, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Дополнить значения update()/insert() колонками слепых индексов"""
+    values = dict(values)
+    for key, column_type in _indexed_columns(model).items():
+        if key in values:
+            values[key + BLIND_INDEX_SUFFIX] = column_type.blind_index(values[key])
+    return values
+
+
+def blind_match(attribute: InstrumentedAttribute, value: str) -> ColumnElement:
+    """
+    Условие поиска по зашифрованной колонке через её слепой индекс:
+    blind_match(DicFl.iin, "900101300123")
+    """
+    column_type = attribute.property.columns[0].type
+    # blind_match(index, value) есть только у типов со слепым индексом
+    if not hasattr(column_type, "blind_match"):
+        raise TypeError(
+            f"{attribute.class_.__name__}.{attribute.key} ({type(column_type).__name__}): "
+            f"поиск по колонке не поддерживается"
+        )
+
+    index = getattr(attribute.class_, attribute.key + BLIND_INDEX_SUFFIX)
+    return column_type.blind_match(index, value)
+
+
+def name_contains(value: Optional[str], term: Optional[str]) -> bool:
+    """
+    Проверка расшифрованного имени на совпадение с запросом. Совпадение всех
+    триграмм по индексу изредка даёт ложные срабатывания - их отсекает проверка
+    """
+    if not term or not blind_index.normalize_name(term):
+        return True
+    if value is None:
+        return False
+
+    value = blind_index.normalize_name(value)
+    term = blind_index.normalize_name(term)
+    return value.startswith(term) if len(term) < 3 else term in value
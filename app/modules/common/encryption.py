@@ -1,6 +1,10 @@
 import base64
-from typing import Optional
-from cryptography.fernet import Fernet
+import hashlib
+import hmac
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from loguru import logger
@@ -9,11 +13,22 @@ from app.config import settings
 
 
 class DataEncryption:
-    """Класс для шифрования/расшифровки персональных данных"""
+    """
+    Класс для шифрования/расшифровки персональных данных
+
+    Формат шифротекста: "v2:" + токен Fernet. Старый формат (токен Fernet,
+    дополнительно закодированный в urlsafe base64) читается, пока строки не
+    перешифрованы: python -m app.modules.common.reencrypt
+    """
+
+    PREFIX = "v2:"
 
     def __init__(self):
         self._fernet = None
         self._init_encryption()
+        self._decrypt_cached = lru_cache(maxsize=settings.ENCRYPTION_CACHE_SIZE)(
+            self._decrypt
+        )
 
     def _init_encryption(self):
         """Инициализация шифрования"""
@@ -42,59 +57,82 @@ class DataEncryption:
             data: Строка для шифрования
 
         Returns:
-            Зашифрованная строка в base64 или None
+            Шифротекст "v2:<токен Fernet>" или None
         """
         if not data or data.strip() == "":
             return data
 
         try:
-            encrypted_data = self._fernet.encrypt(data.encode("utf-8"))
-            return base64.urlsafe_b64encode(encrypted_data).decode("utf-8")
+            token = self._fernet.encrypt(data.encode("utf-8"))
+            return self.PREFIX + token.decode("ascii")
         except Exception as e:
             logger.error(f"Ошибка шифрования данных: {e}")
             return data
 
+    def is_current(self, data: Optional[str]) -> bool:
+        """Значение пустое или уже в текущем формате"""
+        return not data or data.strip() == "" or data.startswith(self.PREFIX)
+
     def decrypt(self, encrypted_data: Optional[str]) -> Optional[str]:
         """
         Расшифровка данных
 
         Args:
-            encrypted_data: Зашифрованная строка в base64
+            encrypted_data: Шифротекст (текущего или старого формата)
 
         Returns:
-            Расшифрованная строка или None
+            Расшифрованная строка; незашифрованное значение возвращается как есть
         """
         if not encrypted_data or encrypted_data.strip() == "":
             return encrypted_data
-
-        try:
-            if not self._is_encrypted_format(encrypted_data):
+        return self._decrypt_cached(encrypted_data)
+
+    def decrypt_many(self, values: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """Расшифровка набора значений, повторяющиеся значения расшифровываются один раз"""
+        values = list(values)
+        decrypted = {value: self.decrypt(value) for value in set(values)}
+        return [decrypted[value] for value in values]
+
+    def _decrypt(self, encrypted_data: str) -> str:
+        if encrypted_data.startswith(self.PREFIX):
+            try:
+                token = encrypted_data[len(self.PREFIX) :].encode("ascii")
+                return self._fernet.decrypt(token).decode("utf-8")
+            except (InvalidToken, UnicodeError) as e:
+                logger.warning(f"Ошибка расшифровки данных: {e!r}")
                 return encrypted_data
 
-            decoded_data = base64.urlsafe_b64decode(encrypted_data.encode("utf-8"))
-            decrypted_data = self._fernet.decrypt(decoded_data)
-            return decrypted_data.decode("utf-8")
-        except Exception as e:
-            logger.warning(
-                f"Ошибка расшифровки данных (возможно, данные не зашифрованы): {e}"
-            )
-            return encrypted_data
+        return self._decrypt_legacy(encrypted_data)
 
-    def _is_encrypted_format(self, data: str) -> bool:
+    @staticmethod
+    def _legacy_token(encrypted_data: str) -> Optional[bytes]:
+        """
+        Старый формат: base64(токен Fernet). Токен Fernet начинается с версии
+        0x80, в base64 - "gA"; значения другого вида считаются незашифрованными
         """
-        Проверяет, похожи ли данные на зашифрованный формат
+        try:
+            token = base64.urlsafe_b64decode(encrypted_data.encode("ascii"))
+        except (ValueError, UnicodeError):
+            return None
 
-        Args:
-            data: Строка для проверки
+        if len(token) <= 40 or not token.startswith(b"gA"):
+            return None
+        return token
+
+    def is_legacy_ciphertext(self, data: Optional[str]) -> bool:
+        """Значение похоже на шифротекст старого формата (не открытый текст)"""
+        return bool(data) and not self.is_current(data) and self._legacy_token(data) is not None
+
+    def _decrypt_legacy(self, encrypted_data: str) -> str:
+        token = self._legacy_token(encrypted_data)
+        if token is None:
+            return encrypted_data
 
-        Returns:
-            True если похоже на зашифрованные данные
-        """
         try:
-            decoded = base64.urlsafe_b64decode(data.encode("utf-8"))
-            return len(decoded) > 40
-        except:
-            return False
+            return self._fernet.decrypt(token).decode("utf-8")
+        except (InvalidToken, UnicodeError):
+            logger.debug("Значение похоже на шифротекст, но не расшифровывается")
+            return encrypted_data
 
 
 data_encryption = DataEncryption()
@@ -108,3 +146,85 @@ def encrypt_personal_data(data: Optional[str]) -> Optional[str]:
 def decrypt_personal_data(data: Optional[str]) -> Optional[str]:
     """Функция-обертка для расшифровки"""
     return data_encryption.decrypt(data)
+
+
+def decrypt_personal_data_many(
+    values: Iterable[Optional[str]],
+) -> List[Optional[str]]:
+    """Функция-обертка для расшифровки набора значений"""
+    return data_encryption.decrypt_many(values)
+
+
+class BlindIndex:
+    """
+    Слепые индексы для поиска по зашифрованным ПДн: HMAC-SHA256 от
+    нормализованного значения на отдельном ключе. По индексу можно найти
+    совпадение, но нельзя восстановить значение без ключа.
+
+    - ИИН: один HMAC, только точное совпадение
+    - ФИО: массив HMAC от триграмм и префиксов длиной 1-2 (поиск подстроки)
+    """
+
+    IIN_DIGEST_SIZE = 16
+    TOKEN_DIGEST_SIZE = 8
+    PREFIX_LENGTHS = (1, 2)
+
+    def __init__(self):
+        password = (settings.BLIND_INDEX_KEY or settings.SECRET_KEY).encode()
+        self._key = hashlib.pbkdf2_hmac(
+            "sha256", password, b"coc_blind_index_salt", 100000
+        )
+
+    def _digest(self, purpose: str, value: str, size: int) -> str:
+        message = f"{purpose}:{value}".encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).hexdigest()[: size * 2]
+
+    @staticmethod
+    def normalize_iin(value: str) -> str:
+        return re.sub(r"\D", "", value)
+
+    @staticmethod
+    def normalize_name(value: str) -> str:
+        return " ".join(value.casefold().replace("ё", "е").split())
+
+    def iin(self, value: Optional[str]) -> Optional[str]:
+        """Индекс ИИН для записи и точного поиска"""
+        if not value:
+            return None
+        value = self.normalize_iin(value)
+        if not value:
+            return None
+        return self._digest("iin", value, self.IIN_DIGEST_SIZE)
+
+    def name_tokens(self, value: Optional[str]) -> Optional[List[str]]:
+        """Индекс имени для записи: все триграммы и короткие префиксы"""
+        if not value:
+            return None
+        value = self.normalize_name(value)
+        if not value:
+            return None
+
+        tokens = {f"p{value[:length]}" for length in self.PREFIX_LENGTHS if len(value) >= length}
+        tokens.update(f"t{value[i:i + 3]}" for i in range(len(value) - 2))
+        return sorted(
+            self._digest("name", token, self.TOKEN_DIGEST_SIZE) for token in tokens
+        )
+
+    def name_search_tokens(self, term: str) -> List[str]:
+        """
+        Токены поискового запроса по имени. Запрос от 3 символов ищется как
+        подстрока (все триграммы), короче - как начало имени
+        """
+        term = self.normalize_name(term)
+        if not term:
+            return []
+        if len(term) < 3:
+            tokens = {f"p{term}"}
+        else:
+            tokens = {f"t{term[i:i + 3]}" for i in range(len(term) - 2)}
+        return sorted(
+            self._digest("name", token, self.TOKEN_DIGEST_SIZE) for token in tokens
+        )
+
+
+blind_index = BlindIndex()
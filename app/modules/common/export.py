@@ -0,0 +1,134 @@
+"""
+Потоковая выгрузка больших списков в NDJSON/CSV.
+
+Записи читаются серверным курсором порциями (`BaseRepository.stream`) и сразу
+пишутся в ответ, поэтому расход памяти не зависит от размера выборки.
+Сессия открывается внутри генератора тела ответа: зависимости FastAPI с yield
+закрываются раньше, чем StreamingResponse начинает отдавать данные.
+
+Формат выбирается параметром `format=ndjson|csv`, либо заголовком
+`Accept: application/x-ndjson` / `Accept: text/csv`. По умолчанию - NDJSON.
+"""
+
+import csv
+import io
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Type
+
+import orjson
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import async_session_maker
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+_ACCEPT_FORMATS = {
+    "application/x-ndjson": ExportFormat.ndjson,
+    "application/ndjson": ExportFormat.ndjson,
+    "application/jsonl": ExportFormat.ndjson,
+    "text/csv": ExportFormat.csv,
+}
+
+# Источник записей: получает сессию выгрузки и отдаёт порции ORM-объектов
+RowsSource = Callable[[AsyncSession], AsyncIterator[Sequence[Any]]]
+
+
+def get_export_format(
+    request: Request,
+    format: Optional[ExportFormat] = Query(
+        None, description="Формат выгрузки: ndjson или csv (по умолчанию по Accept)"
+    ),
+) -> ExportFormat:
+    """Формат выгрузки: параметр format имеет приоритет над заголовком Accept"""
+    if format is not None:
+        return format
+
+    for media_range in request.headers.get("accept", "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in _ACCEPT_FORMATS:
+            return _ACCEPT_FORMATS[media_type]
+
+    return ExportFormat.ndjson
+
+
+def _csv_value(value: Any) -> Any:
+    # Вложенные объекты (справочники, геометрия) пишем в ячейку как JSON
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+def _to_ndjson(items: List[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps(item) + b"\n" for item in items)
+
+
+def _to_csv(items: List[Dict[str, Any]], fields: List[str], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    for item in items:
+        writer.writerow([_csv_value(item.get(field)) for field in fields])
+    return buffer.getvalue().encode("utf-8")
+
+
+def export_response(
+    rows: RowsSource,
+    dto: Type[BaseModel],
+    export_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """
+    StreamingResponse с выгрузкой записей из rows, сериализованных через dto.
+
+    Пример:
+        return export_response(
+            lambda session: OrganizationsRepo(session).stream_filter(filters),
+            OrganizationDto,
+            export_format,
+            "organizations",
+        )
+    """
+    fields = list(dto.model_fields)
+
+    async def body() -> AsyncIterator[bytes]:
+        total = 0
+        if export_format == ExportFormat.csv:
+            # BOM, чтобы Excel открыл кириллицу в UTF-8
+            yield "\ufeff".encode("utf-8") + _to_csv([], fields, header=True)
+
+        async with async_session_maker() as session:
+            async for chunk in rows(session):
+                items = [
+                    dto.model_validate(item).model_dump(mode="json") for item in chunk
+                ]
+                total += len(items)
+
+                if export_format == ExportFormat.csv:
+                    yield _to_csv(items, fields)
+                else:
+                    yield _to_ndjson(items)
+
+        logger.info(f"Выгрузка {filename} ({export_format.value}): {total} записей")
+
+    extension = "csv" if export_format == ExportFormat.csv else "ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{extension}"'
+        },
+    )
@@ -0,0 +1,119 @@
+"""
+Метрики Prometheus приложения.
+
+Метрики помечаются шаблоном пути маршрута (route), а не фактическим путём,
+чтобы число рядов не зависело от параметров запросов.
+
+Под gunicorn метрики воркеров собираются через каталог
+PROMETHEUS_MULTIPROC_DIR (см. app/gunicorn_conf.py): переменная должна быть
+задана до запуска, gauge-метрики суммируются по живым воркерам.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Границы корзин длительностей, с
+DURATION_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+)
+
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds",
+    "Длительность запроса к PostgreSQL",
+    ["route"],
+    buckets=DURATION_BUCKETS,
+)
+db_request_queries = Histogram(
+    "db_request_queries",
+    "Число запросов к PostgreSQL на HTTP-запрос",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+db_request_duration = Histogram(
+    "db_request_duration_seconds",
+    "Суммарное время запросов к PostgreSQL на HTTP-запрос",
+    ["route"],
+    buckets=DURATION_BUCKETS,
+)
+db_n_plus_one = Counter(
+    "db_n_plus_one_total",
+    "HTTP-запросы с многократным повтором одного и того же SQL (N+1)",
+    ["route"],
+)
+clickhouse_query_duration = Histogram(
+    "clickhouse_query_duration_seconds",
+    "Длительность запроса к ClickHouse",
+    ["route"],
+    buckets=DURATION_BUCKETS,
+)
+
+# HTTP
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=DURATION_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP-запросы в обработке",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Кэш ответов API (fastapi-cache): hit, miss, stale - клиент запросил
+# Cache-Control: no-cache при наличии значения в кэше
+cache_requests = Counter(
+    "api_cache_requests_total",
+    "Обращения к кэшу ответов API",
+    ["namespace", "result"],
+)
+
+# Redis
+redis_command_duration = Histogram(
+    "redis_command_duration_seconds",
+    "Длительность команды Redis",
+    ["operation"],
+    buckets=DURATION_BUCKETS,
+)
+redis_pool_connections = Gauge(
+    "redis_pool_connections",
+    "Соединения пула клиента Redis",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+# Пулы соединений PostgreSQL (primary, replica)
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Соединения пула PostgreSQL",
+    ["database", "state"],
+    multiprocess_mode="livesum",
+)
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds",
+    "Ожидание свободного соединения из пула PostgreSQL",
+    buckets=DURATION_BUCKETS,
+)
+db_pool_timeouts = Counter(
+    "db_pool_timeouts_total",
+    "Соединение из пула PostgreSQL не получено за DB_POOL_TIMEOUT",
+)
+db_sessions_in_progress = Gauge(
+    "db_sessions_in_progress",
+    "Открытые сессии зависимостей get_session_*",
+    ["kind"],
+    multiprocess_mode="livesum",
+)
+
+# Выборки, усечённые до лимита строк (app/modules/common/result_caps.py)
+truncated_results = Counter(
+    "result_truncated_total",
+    "Выборки без пагинации, усечённые до лимита строк",
+    ["name"],
+)
+
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds",
+    "Задержка event loop воркера",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
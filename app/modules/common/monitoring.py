@@ -0,0 +1,186 @@
+"""
+Метрики Prometheus: сбор и отдача (GET /metrics).
+
+- MetricsMiddleware - длительность запросов по маршрутам и запросы в обработке;
+- InstrumentedRedisBackend - hit/miss/stale кэша ответов API по пространствам
+  имён (namespace @cache или шаблон маршрута, см. request_key_builder) и
+  длительность команд Redis;
+- RuntimeSampler - задержка event loop и заполнение пулов PostgreSQL и Redis,
+  раз в METRICS_SAMPLE_INTERVAL секунд в каждом воркере.
+
+Время SQL и ClickHouse по маршрутам - app/modules/common/profiling.py.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import suppress
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from fastapi_cache.backends.redis import RedisBackend
+from loguru import logger
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database.database import engine
+from app.database.redis import redis_client
+from app.database.replica import replica_engine
+from .metrics import (
+    cache_requests,
+    db_pool_connections,
+    event_loop_lag,
+    http_request_duration,
+    http_requests_in_progress,
+    redis_command_duration,
+    redis_pool_connections,
+)
+from .profiling import route_label
+from .result_caps import result_truncated
+
+METRICS_PATH = "/metrics"
+
+# Пространство имён кэша текущего обращения и признак Cache-Control: no-cache
+_cache_lookup: ContextVar[Optional[Tuple[str, bool]]] = ContextVar(
+    "cache_lookup", default=None
+)
+
+
+def mark_cache_lookup(namespace: str, request: Request) -> None:
+    """Вызывается из key_builder перед чтением кэша"""
+    # namespace fastapi-cache - "<prefix>:<namespace @cache>"
+    namespace = namespace.partition(":")[2] or route_label(request.scope)
+    forced = request.headers.get("Cache-Control") == "no-cache"
+    _cache_lookup.set((namespace, forced))
+
+
+class InstrumentedRedisBackend(RedisBackend):
+    """Бэкенд fastapi-cache со счётчиками hit/miss/stale и временем Redis"""
+
+    async def get_with_ttl(self, key: str):
+        with redis_command_duration.labels("cache_get").time():
+            ttl, value = await super().get_with_ttl(key)
+
+        lookup = _cache_lookup.get()
+        if lookup is not None:
+            namespace, forced = lookup
+            if value is None:
+                result = "miss"
+            elif forced:
+                result = "stale"
+            else:
+                result = "hit"
+            cache_requests.labels(namespace, result).inc()
+            _cache_lookup.set(None)
+        return ttl, value
+
+    async def set(self, key: str, value, expire: Optional[int] = None) -> None:
+        # Усечённая выборка не кэшируется: признак усечения передаётся только
+        # заголовками, а кэш хранит тело ответа
+        if result_truncated():
+            return
+        with redis_command_duration.labels("cache_set").time():
+            await super().set(key, value, expire)
+
+
+class MetricsMiddleware:
+    """Длительность HTTP-запросов по маршрутам и число запросов в обработке"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            http_request_duration.labels(
+                method, route_label(scope), str(status_code)
+            ).observe(time.perf_counter() - started)
+
+
+def _sample_db_pool(database: str, pool) -> None:
+    db_pool_connections.labels(database, "size").set(pool.size())
+    db_pool_connections.labels(database, "checked_out").set(pool.checkedout())
+    db_pool_connections.labels(database, "overflow").set(max(pool.overflow(), 0))
+    db_pool_connections.labels(database, "max").set(pool.size() + pool._max_overflow)
+
+
+def _sample_redis_pool(pool) -> None:
+    redis_pool_connections.labels("in_use").set(len(pool._in_use_connections))
+    redis_pool_connections.labels("available").set(len(pool._available_connections))
+
+
+class RuntimeSampler:
+    """Фоновая задача воркера: задержка event loop и заполнение пулов"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def sample(self) -> None:
+        _sample_db_pool("primary", engine.sync_engine.pool)
+        if replica_engine is not None:
+            _sample_db_pool("replica", replica_engine.sync_engine.pool)
+        _sample_redis_pool(redis_client.connection_pool)
+
+    async def _run(self) -> None:
+        interval = settings.METRICS_SAMPLE_INTERVAL
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            # Сон дольше заданного - время, когда loop был занят другими задачами
+            event_loop_lag.observe(max(time.perf_counter() - started - interval, 0))
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Не удалось снять метрики пулов: {e}")
+
+
+runtime_sampler = RuntimeSampler()
+
+
+def metrics_response() -> Response:
+    """Метрики в формате Prometheus; под gunicorn - сумма по воркерам"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
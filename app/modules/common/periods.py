@@ -0,0 +1,74 @@
+"""
+Периоды для фильтрации по датам.
+
+Все фильтры строятся как полуинтервал `column >= start AND column < end`,
+без `extract(...)` по колонке, чтобы PostgreSQL мог использовать индексы по
+дате и отсекать партиции.
+"""
+
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, true
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def year_bounds(year: int) -> Tuple[date, date]:
+    """Границы года: [1 января; 1 января следующего года)"""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def quarter_bounds(year: int, quarter: int) -> Tuple[date, date]:
+    """Границы квартала (1-4)"""
+    if not 1 <= quarter <= 4:
+        raise ValueError(f"Некорректный квартал: {quarter}")
+
+    start_month = (quarter - 1) * 3 + 1
+    start = date(year, start_month, 1)
+    end = date(year + 1, 1, 1) if quarter == 4 else date(year, start_month + 3, 1)
+    return start, end
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """Границы месяца"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def in_period(
+    column, start: Optional[date] = None, end: Optional[date] = None
+) -> ColumnElement:
+    """Полуинтервал [start; end). Пропущенная граница не ограничивает период"""
+    conditions = []
+    if start is not None:
+        conditions.append(column >= start)
+    if end is not None:
+        conditions.append(column < end)
+
+    return and_(*conditions) if conditions else true()
+
+
+def in_year(column, year: int) -> ColumnElement:
+    return in_period(column, *year_bounds(year))
+
+
+def in_quarter(column, year: int, quarter: int) -> ColumnElement:
+    return in_period(column, *quarter_bounds(year, quarter))
+
+
+def in_month(column, year: int, month: int) -> ColumnElement:
+    return in_period(column, *month_bounds(year, month))
+
+
+def in_date_range(
+    column, date_from: Optional[date] = None, date_to: Optional[date] = None
+) -> ColumnElement:
+    """
+    Включительный диапазон дат из фильтров (date_from..date_to).
+    Верхняя граница переводится в `< date_to + 1 день`, поэтому фильтр
+    корректен и для колонок типа timestamp.
+    """
+    return in_period(
+        column, date_from, date_to + timedelta(days=1) if date_to is not None else None
+    )
@@ -0,0 +1,238 @@
+"""
+Профилирование запросов API: время SQL и ClickHouse в разрезе HTTP-запроса.
+
+Для каждого запроса считаются число запросов к PostgreSQL, суммарное время,
+самый медленный запрос и повторы одной и той же формы запроса (N+1: один и
+тот же SQL, выполненный PROFILING_N_PLUS_ONE_THRESHOLD раз и больше).
+Результат отдаётся:
+- в заголовке Server-Timing (db, ch, app);
+- в структурированной строке лога (logger.bind), уровня INFO для запросов
+  дольше PROFILING_SLOW_REQUEST_MS и при N+1, иначе DEBUG;
+- в метриках Prometheus с меткой шаблона маршрута (app/modules/common/metrics.py).
+
+Время SQL замеряется событиями before/after_cursor_execute всех Engine, в т.ч.
+реплики; время ClickHouse - ProfiledClickHouseClient.
+"""
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from .metrics import (
+    clickhouse_query_duration,
+    db_n_plus_one,
+    db_request_duration,
+    db_request_queries,
+    db_statement_duration,
+)
+
+# Маршрут не найден (404) - одна метка вместо фактических путей
+UNMATCHED_ROUTE = "unmatched"
+# Запрос к БД вне HTTP-запроса (фоновые задачи, CLI)
+BACKGROUND_ROUTE = "background"
+
+# Литералы, подставленные в текст запроса, не меняют его форму
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _SPACES.sub(" ", _LITERALS.sub("?", statement)).strip()
+
+
+def route_label(scope: Scope) -> str:
+    return getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+@dataclass
+class RequestProfile:
+    scope: Scope
+    started: float = field(default_factory=time.perf_counter)
+    query_count: int = 0
+    db_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+    shapes: Counter = field(default_factory=Counter)
+    clickhouse_count: int = 0
+    clickhouse_time: float = 0.0
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope)
+
+    def record_statement(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.db_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+        db_statement_duration.labels(self.route).observe(elapsed)
+
+    def repeated_statement(self) -> Optional[tuple]:
+        """Самая частая форма запроса, если она повторялась до порога N+1"""
+        if not self.shapes:
+            return None
+        shape, count = self.shapes.most_common(1)[0]
+        if count < settings.PROFILING_N_PLUS_ONE_THRESHOLD:
+            return None
+        return shape, count
+
+    def server_timing(self) -> str:
+        total = (time.perf_counter() - self.started) * 1000
+        parts = [f'db;dur={self.db_time * 1000:.1f};desc="{self.query_count} queries"']
+        if self.clickhouse_count:
+            parts.append(
+                f'ch;dur={self.clickhouse_time * 1000:.1f};'
+                f'desc="{self.clickhouse_count} queries"'
+            )
+        parts.append(f"app;dur={total:.1f}")
+        return ", ".join(parts)
+
+
+_request_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def current_route() -> str:
+    profile = _request_profile.get()
+    return profile.route if profile is not None else BACKGROUND_ROUTE
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_profile.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _request_profile.get()
+    started = conn.info.get("query_started")
+    if profile is None or not started:
+        return
+    profile.record_statement(statement, time.perf_counter() - started.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Запрос завершился ошибкой: отметка времени больше не нужна
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def record_clickhouse(elapsed: float) -> None:
+    profile = _request_profile.get()
+    if profile is None:
+        return
+    profile.clickhouse_count += 1
+    profile.clickhouse_time += elapsed
+    clickhouse_query_duration.labels(profile.route).observe(elapsed)
+
+
+class ProfiledClickHouseClient:
+    """Клиент ClickHouse, замеряющий время запросов (остальное - как у клиента)"""
+
+    TIMED_METHODS = frozenset(
+        ("query", "command", "query_df", "query_np", "query_arrow", "insert")
+    )
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in self.TIMED_METHODS:
+            return attr
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                record_clickhouse(time.perf_counter() - started)
+
+        return timed
+
+
+def _log_profile(profile: RequestProfile, method: str, status_code: Optional[int]):
+    total_ms = (time.perf_counter() - profile.started) * 1000
+    repeated = profile.repeated_statement()
+    route = profile.route
+
+    db_request_queries.labels(route).observe(profile.query_count)
+    db_request_duration.labels(route).observe(profile.db_time)
+    if repeated:
+        db_n_plus_one.labels(route).inc()
+
+    bound = logger.bind(
+        route=route,
+        method=method,
+        status=status_code,
+        duration_ms=round(total_ms, 1),
+        db_queries=profile.query_count,
+        db_ms=round(profile.db_time * 1000, 1),
+        db_slowest_ms=round(profile.slowest_time * 1000, 1),
+        ch_queries=profile.clickhouse_count,
+        ch_ms=round(profile.clickhouse_time * 1000, 1),
+    )
+    summary = (
+        f"{method} {route}: {total_ms:.0f} мс, SQL {profile.query_count} "
+        f"за {profile.db_time * 1000:.0f} мс"
+    )
+
+    if repeated:
+        shape, count = repeated
+        bound.bind(n_plus_one=count).warning(
+            f"{summary}; N+1: запрос повторён {count} раз: {shape[:500]}"
+        )
+    elif total_ms >= settings.PROFILING_SLOW_REQUEST_MS:
+        bound.info(
+            f"{summary}; самый медленный "
+            f"{profile.slowest_time * 1000:.0f} мс: {(profile.slowest_statement or '')[:500]}"
+        )
+    else:
+        bound.debug(summary)
+
+
+class ProfilingMiddleware:
+    """Профиль SQL/ClickHouse запроса: Server-Timing, лог и метрики по маршруту"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope=scope)
+        token = _request_profile.set(profile)
+        status_code: Optional[int] = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", profile.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_profile.reset(token)
+            _log_profile(profile, scope["method"], status_code)
@@ -0,0 +1,143 @@
+"""
+Перешифрование ПДн старого формата в формат "v2:" (DataEncryption).
+
+Проходит по всем колонкам с типом EncryptedString, читает строки, где значение
+не в текущем формате, и записывает его заново зашифрованным. Незашифрованные
+значения тоже шифруются. Значения, похожие на шифротекст старого формата, но не
+расшифровывающиеся (например, другим ключом), не меняются: они пишутся в лог и
+считаются в итоге. Каждая порция коммитится отдельно, повторный запуск
+продолжает с оставшихся строк. Слепые индексы не меняются: они считаются от
+открытого значения.
+
+    python -m app.modules.common.reencrypt
+    python -m app.modules.common.reencrypt --dry-run --batch-size 500
+"""
+
+import argparse
+import asyncio
+from typing import Dict, List, Tuple
+
+from loguru import logger
+from sqlalchemy import Column, String, Table, and_, bindparam, func, or_, select, update
+from sqlalchemy import column as sql_column, table as sql_table
+
+from app.database.database import engine
+from app.database.deps import Base
+from .encrypted_types import EncryptedString
+from .encryption import data_encryption
+
+# Модели с зашифрованными колонками
+import app.modules.admins.models  # noqa: F401
+
+
+def encrypted_columns() -> Dict[Table, List[Column]]:
+    tables: Dict[Table, List[Column]] = {}
+    for table in Base.metadata.sorted_tables:
+        columns = [c for c in table.columns if isinstance(c.type, EncryptedString)]
+        if columns:
+            tables[table] = columns
+    return tables
+
+
+async def reencrypt_table(
+    table: Table, columns: List[Column], batch_size: int, dry_run: bool
+) -> Tuple[int, int]:
+    """
+    Перешифровать колонки таблицы, вернуть число изменённых строк и число
+    нерасшифровавшихся значений
+    """
+    (pk,) = table.primary_key.columns
+    # Колонки без EncryptedString: значения читаются и пишутся как есть
+    raw = sql_table(
+        table.name,
+        sql_column(pk.name),
+        *(sql_column(c.name, String) for c in columns),
+        schema=table.schema,
+    )
+    names = [c.name for c in columns]
+
+    legacy = or_(
+        *(
+            and_(
+                func.trim(raw.c[name]) != "",
+                ~raw.c[name].startswith(data_encryption.PREFIX),
+            )
+            for name in names
+        )
+    )
+    statement = (
+        update(raw)
+        .where(raw.c[pk.name] == bindparam("_pk"))
+        .values({name: bindparam(f"_{name}") for name in names})
+    )
+
+    changed = 0
+    failed = 0
+    last_pk = None
+    while True:
+        query = select(raw).where(legacy).order_by(raw.c[pk.name]).limit(batch_size)
+        if last_pk is not None:
+            query = query.where(raw.c[pk.name] > last_pk)
+
+        async with engine.begin() as conn:
+            rows = (await conn.execute(query)).all()
+            if not rows:
+                break
+
+            values = {
+                name: data_encryption.decrypt_many(row._mapping[name] for row in rows)
+                for name in names
+            }
+            params = []
+            for i, row in enumerate(rows):
+                row_params = {"_pk": row._mapping[pk.name]}
+                rewritten = False
+                for name in names:
+                    original = row._mapping[name]
+                    row_params[f"_{name}"] = original
+                    if data_encryption.is_current(original):
+                        continue
+                    if values[name][i] == original and data_encryption.is_legacy_ciphertext(original):
+                        # decrypt вернул шифротекст как есть: ключ не подходит или данные повреждены
+                        failed += 1
+                        logger.warning(
+                            f"{table.fullname}.{name} ({pk.name}={row._mapping[pk.name]}): "
+                            f"значение не расшифровывается, пропущено"
+                        )
+                        continue
+                    row_params[f"_{name}"] = data_encryption.encrypt(values[name][i])
+                    rewritten = True
+                if rewritten:
+                    params.append(row_params)
+
+            if params and not dry_run:
+                await conn.execute(statement, params)
+
+        changed += len(params)
+        last_pk = rows[-1]._mapping[pk.name]
+        logger.info(f"{table.fullname}: обработано {changed} строк, не расшифровано {failed}")
+
+    return changed, failed
+
+
+async def main(batch_size: int, dry_run: bool) -> None:
+    for table, columns in encrypted_columns().items():
+        changed, failed = await reencrypt_table(table, columns, batch_size, dry_run)
+        logger.info(
+            f"{table.fullname} ({', '.join(c.name for c in columns)}): "
+            f"{'найдено' if dry_run else 'перешифровано'} {changed} строк, "
+            f"не расшифровано и пропущено {failed} значений"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Перешифрование ПДн старого формата в формат v2"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Только посчитать строки"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.batch_size, args.dry_run))
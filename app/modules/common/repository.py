@@ -1,14 +1,37 @@
-from typing import List, TypeVar, Generic, Type
+from typing import AsyncIterator, Dict, List, Optional, Sequence, TypeVar, Generic, Type
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
-from sqlalchemy import update as sqlalchemy_update, delete as sqlalchemy_delete, func
+from sqlalchemy import (
+    column,
+    inspect,
+    update as sqlalchemy_update,
+    delete as sqlalchemy_delete,
+    func,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.modules.common.models import BaseModel
+from app.modules.common.result_caps import Pagination, fetch_capped
 
 T = TypeVar("T", bound=BaseModel)
 
+# Лимит параметров одного запроса PostgreSQL
+PG_MAX_BIND_PARAMS = 32767
+
+
+def _batches(rows: List[dict], columns_count: int, batch_size: Optional[int] = None):
+    """Порции строк так, чтобы порция не превышала лимит параметров запроса"""
+    size = min(
+        batch_size or settings.DB_BULK_BATCH_SIZE,
+        PG_MAX_BIND_PARAMS // max(columns_count, 1),
+    )
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
 
 class BaseRepository(Generic[T]):
     model: Type[T] = None
@@ -70,6 +93,30 @@ class BaseRepository(Generic[T]):
             logger.error(f"Ошибка при поиске всех записей: {e}")
             raise
 
+    async def stream(self, query, chunk_size: int = 1000) -> AsyncIterator[Sequence[T]]:
+        """
+        Записи запроса порциями по chunk_size через серверный курсор.
+        После обработки порции объекты удаляются из сессии, чтобы identity map
+        не рос вместе с выборкой.
+        """
+        try:
+            result = await self._session.stream_scalars(
+                query.execution_options(yield_per=chunk_size)
+            )
+            async for partition in result.partitions():
+                yield partition
+                self._session.expunge_all()
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при потоковом чтении {self.model.__name__}: {e}")
+            raise
+
+    def stream_many(self, filters=None, chunk_size: int = 1000) -> AsyncIterator[Sequence[T]]:
+        query = select(self.model)
+        if filters is not None:
+            query = filters.filter(query)
+
+        return self.stream(query.order_by(self.model.id), chunk_size)
+
     async def add(self, values: BaseModel):
         values_dict = values.model_dump(exclude_unset=True)
         logger.info(f"Добавление записи {self.model.__name__} с параметрами: {values_dict}")
@@ -144,19 +191,46 @@ class BaseRepository(Generic[T]):
             logger.error(f"Ошибка при поиске всех записей: {e}")
             raise
 
-    async def bulk_update(self, records: List[BaseModel]):
+    async def bulk_update(self, records: List, batch_size: Optional[int] = None) -> int:
+        """
+        Массовое обновление записей по id одним запросом на порцию:
+        UPDATE ... FROM (VALUES ...). Записи (DTO или dict) группируются по набору
+        изменяемых полей, поэтому разные наборы полей обновляются разными запросами.
+        """
         logger.info(f"Массовое обновление записей {self.model.__name__}")
         try:
-            updated_count = 0
+            mapper_columns = inspect(self.model).columns
+            groups: Dict[tuple, List[dict]] = {}
             for record in records:
-                record_dict = record.model_dump(exclude_unset=True)
+                record_dict = (
+                    record
+                    if isinstance(record, dict)
+                    else record.model_dump(exclude_unset=True)
+                )
                 if "id" not in record_dict:
                     continue
 
-                update_data = {k: v for k, v in record_dict.items() if k != "id"}
-                stmt = sqlalchemy_update(self.model).filter_by(id=record_dict["id"]).values(**update_data)
-                result = await self._session.execute(stmt)
-                updated_count += result.rowcount
+                fields = tuple(sorted(k for k in record_dict if k != "id"))
+                if fields:
+                    groups.setdefault(fields, []).append(record_dict)
+
+            updated_count = 0
+            for fields, rows in groups.items():
+                keys = ("id",) + fields
+                for batch in _batches(rows, len(keys), batch_size):
+                    data = values(
+                        *[column(key, mapper_columns[key].type) for key in keys],
+                        name="data",
+                    ).data([tuple(row[key] for key in keys) for row in batch])
+
+                    stmt = (
+                        sqlalchemy_update(self.model)
+                        .where(self.model.id == data.c.id)
+                        .values({mapper_columns[key]: data.c[key] for key in fields})
+                        .execution_options(synchronize_session="fetch")
+                    )
+                    result = await self._session.execute(stmt)
+                    updated_count += result.rowcount
 
             logger.info(f"Обновлено {updated_count} записей")
             await self._session.flush()
@@ -165,6 +239,51 @@ class BaseRepository(Generic[T]):
             logger.error(f"Ошибка при массовом обновлении: {e}")
             raise
 
+    async def bulk_upsert(
+        self,
+        rows: List[dict],
+        index_elements: Optional[List[str]] = None,
+        update_fields: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Массовая вставка INSERT ... VALUES (...), (...) ON CONFLICT порциями.
+
+        - index_elements: колонки конфликта (по умолчанию первичный ключ)
+        - update_fields: что обновить при конфликте; без них - DO NOTHING
+
+        Возвращает число вставленных или обновлённых строк.
+        """
+        if not rows:
+            return 0
+
+        logger.info(f"Массовая вставка {len(rows)} записей {self.model.__name__}")
+        try:
+            if index_elements is None:
+                index_elements = [key.name for key in inspect(self.model).primary_key]
+
+            columns_count = len(rows[0])
+            affected = 0
+            for batch in _batches(rows, columns_count, batch_size):
+                stmt = pg_insert(self.model).values(batch)
+                if update_fields:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=index_elements,
+                        set_={field: stmt.excluded[field] for field in update_fields},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+                result = await self._session.execute(stmt)
+                affected += result.rowcount
+
+            logger.info(f"Вставлено/обновлено {affected} записей {self.model.__name__}")
+            await self._session.flush()
+            return affected
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при массовой вставке: {e}")
+            raise
+
 
 class BaseWithOrganizationRepository(BaseRepository):
     async def get_by_organization_id(self, id: int):
@@ -227,11 +346,12 @@ class BaseExtRepository(Generic[T]):
             logger.error(f"Ошибка при поиске записи по фильтрам {filter_dict}: {e}")
             raise
 
-    async def get_many(self):
+    async def get_many(self, pagination: Pagination | None = None):
         try:
-            query = select(self.model)
-            result = await self._session.execute(query)
-            records = result.unique().scalars().all()
+            query = select(self.model).order_by(self.model.id)
+            records = await fetch_capped(
+                self._session, query, f"{type(self).__name__}.get_many", pagination
+            )
             logger.info(f"Найдено {len(records)} записей.")
             return records
         except SQLAlchemyError as e:
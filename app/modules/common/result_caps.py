@@ -0,0 +1,132 @@
+"""
+Ограничение размера выборок для методов, которые раньше отдавали таблицу целиком.
+
+Каждый такой метод читает не больше MAX_RESULT_ROWS строк (для отдельных
+методов - RESULT_ROWS_LIMITS["<Repo>.<method>"]). Клиент может листать
+выборку параметрами limit/offset. Если строк больше, чем отдано, ответ получает
+заголовки X-Result-Truncated: true и X-Next-Offset; упор в жёсткий лимит
+логируется и считается в метрике truncated_results.
+
+Кэш ответов (@cache) хранит только тело, поэтому усечённые ответы не
+кэшируются (InstrumentedRedisBackend.set) и отдаются с Cache-Control: no-store:
+иначе повторные запросы получали бы ту же усечённую выборку без заголовков.
+"""
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from fastapi import Query
+from loguru import logger
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from .metrics import truncated_results
+
+
+@dataclass
+class Pagination:
+    limit: Optional[int] = None
+    offset: int = 0
+
+
+@dataclass
+class TruncatedResult:
+    name: str
+    limit: int
+    next_offset: int
+
+
+# Список усечённых выборок текущего запроса (заполняется fetch_capped)
+_truncated_results: ContextVar[Optional[List[TruncatedResult]]] = ContextVar(
+    "truncated_results", default=None
+)
+
+
+def get_pagination(
+    limit: Optional[int] = Query(
+        None, ge=1, description="Количество записей (не больше серверного лимита)"
+    ),
+    offset: int = Query(0, ge=0, description="Смещение от начала выборки"),
+) -> Pagination:
+    return Pagination(limit=limit, offset=offset)
+
+
+def result_truncated() -> bool:
+    """Текущий запрос отдаёт усечённую выборку"""
+    return bool(_truncated_results.get())
+
+
+def max_rows(name: str) -> int:
+    return settings.RESULT_ROWS_LIMITS.get(name, settings.MAX_RESULT_ROWS)
+
+
+async def fetch_capped(
+    session: AsyncSession,
+    query: Select,
+    name: str,
+    pagination: Optional[Pagination] = None,
+) -> Sequence:
+    """
+    Выполнить запрос сущностей с лимитом. Читается limit + 1 строка: лишняя
+    строка показывает, что выборка усечена, и сама не возвращается.
+    """
+    pagination = pagination or Pagination()
+    cap = max_rows(name)
+    limit = min(pagination.limit, cap) if pagination.limit else cap
+
+    if pagination.offset:
+        query = query.offset(pagination.offset)
+
+    result = await session.execute(query.limit(limit + 1))
+    records = result.unique().scalars().all()
+
+    if len(records) <= limit:
+        return records
+
+    if limit == cap:
+        truncated_results.labels(name).inc()
+        logger.warning(
+            f"Выборка {name} усечена до {cap} строк (offset={pagination.offset}). "
+            f"Используйте limit/offset или выгрузку"
+        )
+
+    truncated = _truncated_results.get()
+    if truncated is not None:
+        truncated.append(
+            TruncatedResult(name=name, limit=limit, next_offset=pagination.offset + limit)
+        )
+
+    return records[:limit]
+
+
+class ResultCapMiddleware:
+    """Добавляет к ответу заголовки об усечённой выборке и запрещает его кэширование"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        truncated: List[TruncatedResult] = []
+        token = _truncated_results.set(truncated)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and truncated:
+                headers = MutableHeaders(scope=message)
+                headers["X-Result-Truncated"] = "true"
+                headers["X-Result-Limit"] = str(truncated[0].limit)
+                headers["X-Next-Offset"] = str(truncated[0].next_offset)
+                headers["Cache-Control"] = "no-store"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _truncated_results.reset(token)
@@ -16,12 +16,15 @@ from fastapi_filter import FilterDepends
 from fastapi_filter.contrib.sqlalchemy import Filter
 from fastapi_cache.decorator import cache
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 from typing import Any
 import orjson
 from fastapi.encoders import jsonable_encoder
 from fastapi_cache import Coder
 from app.database.deps import get_session_with_commit
+from app.modules.common.monitoring import mark_cache_lookup
+from app.modules.common.export import ExportFormat, export_response, get_export_format
+from app.modules.common.result_caps import Pagination, get_pagination
 from sqlalchemy.orm import class_mapper
 
 T = TypeVar("T", bound=BaseModel)
@@ -47,6 +50,7 @@ def request_key_builder(
     response: Response = None,
     **kwargs,
 ):
+    mark_cache_lookup(namespace, request)
     return ":".join(
         [
             namespace,
@@ -125,6 +129,11 @@ class BaseCRUDRouter(APIRouter, Generic[T]):
 
         sub_router.get("/count", response_model=int)(self.count)
 
+        # До "/{id}", иначе "export" будет разобран как id
+        sub_router.get("/export", response_class=StreamingResponse)(
+            self._filtered_export() if filter_class else self.export
+        )
+
         sub_router.get("/{id}", response_model=dto)(self.get_one)
 
         if filter_class:
@@ -176,6 +185,41 @@ class BaseCRUDRouter(APIRouter, Generic[T]):
             page_count=total_pages,
         )
 
+    async def export(
+        self, export_format: ExportFormat = Depends(get_export_format)
+    ) -> StreamingResponse:
+        """
+        Выгрузить все записи потоком в NDJSON или CSV (без загрузки всей выборки в память)
+
+        - **format**: ndjson или csv, либо заголовок Accept: application/x-ndjson / text/csv
+        """
+        return self._export_response(export_format)
+
+    def _filtered_export(self):
+        """
+        export с теми же фильтрами, что и список записей: filter_class известен
+        только при создании роутера, поэтому эндпоинт собирается здесь
+        """
+
+        async def export(
+            filters: Filter = FilterDepends(self.filter_class),
+            export_format: ExportFormat = Depends(get_export_format),
+        ) -> StreamingResponse:
+            return self._export_response(export_format, filters)
+
+        export.__doc__ = self.export.__doc__
+        return export
+
+    def _export_response(
+        self, export_format: ExportFormat, filters: Filter | None = None
+    ) -> StreamingResponse:
+        return export_response(
+            lambda session: self.repo(session).stream_many(filters=filters),
+            self.dto,
+            export_format,
+            self.model.__tablename__,
+        )
+
     @cache(expire=cache_ttl, key_builder=request_key_builder)  # Кэширование на 24 часа
     async def get_many_with_common_filters(
         self,
@@ -271,9 +315,11 @@ class BaseExtRouter(APIRouter, Generic[T]):
         expire=cache_ttl, key_builder=request_key_builder, coder=ORJsonCoder
     )  # Кэширование на 24 часа
     async def get_many(
-        self, session: AsyncSession = Depends(get_session_with_commit)
+        self,
+        pagination: Pagination = Depends(get_pagination),
+        session: AsyncSession = Depends(get_session_with_commit),
     ) -> List[T]:
-        return await self.repo(session).get_many()
+        return await self.repo(session).get_many(pagination)
 
     @cache(
         expire=cache_ttl, key_builder=request_key_builder, coder=ORJsonCoder
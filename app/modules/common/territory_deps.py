@@ -6,10 +6,16 @@ from geoalchemy2.elements import WKTElement
 from geoalchemy2.functions import ST_AsText
 from loguru import logger
 
-from app.modules.admins.models import Employees, DicUl
+from app.modules.admins.models import DicUl
 from app.modules.admins.deps import get_current_employee
+from app.modules.admins.principal import (
+    EmployeePrincipal,
+    TerritoryScope,
+    territory_cache,
+)
 from app.modules.ext.kazgeodesy.models import KazgeodesyRkOblasti, KazgeodesyRkRaiony
 from app.database.deps import get_session_without_commit
+from app.database.replica import primary_only
 
 
 class UserTerritoryInfo:
@@ -34,12 +40,70 @@ class UserTerritoryInfo:
         return not self.is_republic_level()
 
 
+async def _load_territory_scope(
+    session: AsyncSession, ul_id: int
+) -> Optional[TerritoryScope]:
+    """Территория организации сотрудника из основной БД (заполняет territory_cache)"""
+    query = select(DicUl).where(DicUl.id == ul_id)
+    result = await session.execute(primary_only(query))
+    dic_ul = result.scalar_one_or_none()
+
+    if not dic_ul:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Территориальное подразделение не найдено",
+        )
+
+    if dic_ul.oblast_id and not dic_ul.raion_id:
+        query = select(
+            KazgeodesyRkOblasti.id,
+            KazgeodesyRkOblasti.name_ru,
+            ST_AsText(KazgeodesyRkOblasti.geom).label("geom_wkt"),
+        ).where(KazgeodesyRkOblasti.id == dic_ul.oblast_id)
+
+        result = await session.execute(primary_only(query))
+        oblast_row = result.first()
+
+        if oblast_row:
+            logger.info(
+                f"Найдена область: {oblast_row.name_ru} (ID: {oblast_row.id})"
+            )
+            return TerritoryScope(
+                territory_level="oblast",
+                territory_id=oblast_row.id,
+                territory_name=oblast_row.name_ru or "Область",
+                territory_geom_wkt=oblast_row.geom_wkt,
+            )
+
+    elif dic_ul.raion_id:
+        query = select(
+            KazgeodesyRkRaiony.id,
+            KazgeodesyRkRaiony.name_ru,
+            ST_AsText(KazgeodesyRkRaiony.geom).label("geom_wkt"),
+        ).where(KazgeodesyRkRaiony.id == dic_ul.raion_id)
+
+        result = await session.execute(primary_only(query))
+        raion_row = result.first()
+
+        if raion_row:
+            logger.info(f"Найден район: {raion_row.name_ru} (ID: {raion_row.id})")
+            return TerritoryScope(
+                territory_level="raion",
+                territory_id=raion_row.id,
+                territory_name=raion_row.name_ru or "Район",
+                territory_geom_wkt=raion_row.geom_wkt,
+            )
+
+    return None
+
+
 async def get_user_territory_info(
-    current_employee: Employees = Depends(get_current_employee),
+    current_employee: EmployeePrincipal = Depends(get_current_employee),
     session: AsyncSession = Depends(get_session_without_commit),
 ) -> UserTerritoryInfo:
     """
-    Получить территориальную информацию текущего пользователя
+    Получить территориальную информацию текущего пользователя. Территория
+    организации кэшируется вместе с данными сотрудника (territory_cache)
     """
     try:
         if current_employee.role == 3:
@@ -58,72 +122,29 @@ async def get_user_territory_info(
                 detail="Сотрудник не привязан к территориальному подразделению",
             )
 
-        query = select(DicUl).where(DicUl.id == current_employee.ul_id)
-        result = await session.execute(query)
-        dic_ul = result.scalar_one_or_none()
+        scope = await territory_cache.get(current_employee.ul_id)
+        if scope is None:
+            scope = await _load_territory_scope(session, current_employee.ul_id)
+            if scope is not None:
+                await territory_cache.set(current_employee.ul_id, scope)
 
-        if not dic_ul:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Территориальное подразделение не найдено",
-            )
-
-        territory_info = None
-
-        if dic_ul.oblast_id and not dic_ul.raion_id:
-            query = select(
-                KazgeodesyRkOblasti.id,
-                KazgeodesyRkOblasti.name_ru,
-                ST_AsText(KazgeodesyRkOblasti.geom).label("geom_wkt"),
-            ).where(KazgeodesyRkOblasti.id == dic_ul.oblast_id)
-
-            result = await session.execute(query)
-            oblast_row = result.first()
-
-            if oblast_row:
-                territory_info = UserTerritoryInfo(
-                    territory_level="oblast",
-                    territory_id=oblast_row.id,
-                    territory_name=oblast_row.name_ru or "Область",
-                    territory_geom=(
-                        WKTElement(oblast_row.geom_wkt, srid=4326)
-                        if oblast_row.geom_wkt
-                        else None
-                    ),
-                )
-                logger.info(
-                    f"Найдена область: {oblast_row.name_ru} (ID: {oblast_row.id})"
-                )
-
-        elif dic_ul.raion_id:
-            query = select(
-                KazgeodesyRkRaiony.id,
-                KazgeodesyRkRaiony.name_ru,
-                ST_AsText(KazgeodesyRkRaiony.geom).label("geom_wkt"),
-            ).where(KazgeodesyRkRaiony.id == dic_ul.raion_id)
-
-            result = await session.execute(query)
-            raion_row = result.first()
-
-            if raion_row:
-                territory_info = UserTerritoryInfo(
-                    territory_level="raion",
-                    territory_id=raion_row.id,
-                    territory_name=raion_row.name_ru or "Район",
-                    territory_geom=(
-                        WKTElement(raion_row.geom_wkt, srid=4326)
-                        if raion_row.geom_wkt
-                        else None
-                    ),
-                )
-                logger.info(f"Найден район: {raion_row.name_ru} (ID: {raion_row.id})")
-
-        if not territory_info:
+        if not scope:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Не удалось определить территориальную принадлежность сотрудника",
             )
 
+        territory_info = UserTerritoryInfo(
+            territory_level=scope.territory_level,
+            territory_id=scope.territory_id,
+            territory_name=scope.territory_name,
+            territory_geom=(
+                WKTElement(scope.territory_geom_wkt, srid=4326)
+                if scope.territory_geom_wkt
+                else None
+            ),
+        )
+
         logger.info(
             f"Пользователь {current_employee.login} имеет доступ к {territory_info.territory_level}: {territory_info.territory_name}"
         )
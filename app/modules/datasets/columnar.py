@@ -0,0 +1,221 @@
+"""
+Сборка файлов Parquet / Arrow IPC из наборов данных (см. repository.DATASETS).
+
+Строки читаются порциями, каждая порция превращается в RecordBatch и сразу
+пишется в файл, поэтому в памяти не держится больше одной порции. Готовые
+файлы кэшируются на диске по хэшу набора и фильтров на DATASETS_CACHE_TTL
+секунд (0 - без кэша, файл удаляется после отдачи).
+
+Устаревшие файлы удаляются при следующей сборке, кроме файлов, которые
+процесс сейчас собирает или отдаёт (acquire/release_dataset_file). Файлы,
+которые могут отдавать другие воркеры, защищены запасом _PURGE_GRACE после
+истечения TTL.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Sequence, Tuple
+
+import orjson
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+from loguru import logger
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from .dtos import DatasetFilterDto, DatasetFormat
+from .repository import DatasetSpec, DatasetsRepo
+
+
+DATASET_MEDIA_TYPES = {
+    DatasetFormat.parquet: "application/vnd.apache.parquet",
+    DatasetFormat.arrow: "application/vnd.apache.arrow.file",
+}
+
+_ARROW_TYPES = {
+    bool: pa.bool_(),
+    int: pa.int64(),
+    float: pa.float64(),
+    Decimal: pa.float64(),
+    str: pa.string(),
+}
+
+# Блокировки на ключ кэша: параллельные запросы одного файла ждут первый.
+# Блокировка удаляется, когда её не держит и не ждёт ни один запрос
+_build_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+# Файлы кэша, которые процесс сейчас собирает или отдаёт: не удаляются при очистке
+_in_use: Counter = Counter()
+
+# Запас после TTL перед удалением: файл может дочитывать другой воркер
+_PURGE_GRACE = 3600
+
+
+def _arrow_type(column) -> pa.DataType:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return pa.string()
+
+    # date/datetime проверяем по имени: datetime - подкласс date
+    if python_type.__name__ == "datetime":
+        return pa.timestamp("us")
+    if python_type.__name__ == "date":
+        return pa.date32()
+    return _ARROW_TYPES.get(python_type, pa.string())
+
+
+def dataset_schema(spec: DatasetSpec) -> pa.Schema:
+    return pa.schema(
+        [
+            pa.field(column.name, _arrow_type(column), nullable=column.nullable)
+            for column in spec.columns
+        ]
+    )
+
+
+def _to_batch(rows: Sequence[Row], schema: pa.Schema) -> pa.RecordBatch:
+    columns: List[pa.Array] = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if pa.types.is_floating(field.type):
+            values = [float(value) if value is not None else None for value in values]
+        elif pa.types.is_string(field.type):
+            values = [str(value) if value is not None else None for value in values]
+        columns.append(pa.array(values, type=field.type))
+
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _open_writer(path: Path, schema: pa.Schema, file_format: DatasetFormat):
+    if file_format == DatasetFormat.parquet:
+        return pq.ParquetWriter(str(path), schema, compression="zstd")
+    return pa_ipc.new_file(str(path), schema)
+
+
+def _write_rows(writer, rows: Sequence[Row], schema: pa.Schema) -> None:
+    writer.write_table(pa.Table.from_batches([_to_batch(rows, schema)]))
+
+
+def dataset_cache_key(spec: DatasetSpec, filters: DatasetFilterDto) -> str:
+    payload = {"dataset": spec.name, **filters.model_dump(mode="json")}
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+async def _write_dataset(
+    session: AsyncSession, spec: DatasetSpec, filters: DatasetFilterDto, path: Path
+) -> int:
+    schema = dataset_schema(spec)
+    writer = _open_writer(path, schema, filters.format)
+    total = 0
+    try:
+        async for rows in DatasetsRepo(session).stream(
+            spec, filters, chunk_size=settings.DATASETS_CHUNK_SIZE
+        ):
+            # Сборка батча и сжатие - CPU, не блокируем event loop
+            await asyncio.to_thread(_write_rows, writer, rows, schema)
+            total += len(rows)
+    finally:
+        await asyncio.to_thread(writer.close)
+
+    return total
+
+
+@asynccontextmanager
+async def _build_lock(key: str) -> AsyncIterator[None]:
+    lock, waiters = _build_locks.get(key, (asyncio.Lock(), 0))
+    _build_locks[key] = (lock, waiters + 1)
+    try:
+        async with lock:
+            yield
+    finally:
+        lock, waiters = _build_locks[key]
+        if waiters > 1:
+            _build_locks[key] = (lock, waiters - 1)
+        else:
+            del _build_locks[key]
+
+
+def acquire_dataset_file(path: Path) -> None:
+    _in_use[path] += 1
+
+
+def release_dataset_file(path: Path) -> None:
+    """Вызывается после отдачи файла кэша клиенту, в т.ч. при обрыве соединения"""
+    _in_use[path] -= 1
+    if _in_use[path] <= 0:
+        del _in_use[path]
+
+
+def _purge_expired(cache_dir: Path, ttl: int) -> None:
+    deadline = time.time() - ttl - _PURGE_GRACE
+    for path in cache_dir.iterdir():
+        if path in _in_use:
+            continue
+        try:
+            if path.stat().st_mtime < deadline:
+                path.unlink()
+        except OSError:
+            # Файл мог удалить параллельный запрос
+            pass
+
+
+async def build_dataset_file(
+    session: AsyncSession, spec: DatasetSpec, filters: DatasetFilterDto
+) -> Tuple[Path, bool]:
+    """
+    Путь к файлу набора и признак того, что файл временный (его нужно удалить
+    после отдачи клиенту). Файл кэша после отдачи освобождается
+    release_dataset_file.
+    """
+    extension = filters.format.value
+    ttl = settings.DATASETS_CACHE_TTL
+
+    if ttl <= 0:
+        fd, name = tempfile.mkstemp(prefix=f"{spec.name}-", suffix=f".{extension}")
+        os.close(fd)
+        path = Path(name)
+        total = await _write_dataset(session, spec, filters, path)
+        logger.info(f"Набор {spec.name} ({extension}) собран: {total} строк")
+        return path, True
+
+    cache_dir = Path(settings.DATASETS_CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    key = dataset_cache_key(spec, filters)
+    path = cache_dir / f"{spec.name}-{key[:24]}.{extension}"
+
+    async with _build_lock(key):
+        if path.exists() and path.stat().st_mtime >= time.time() - ttl:
+            acquire_dataset_file(path)
+            logger.info(f"Набор {spec.name} ({extension}) отдан из кэша: {path.name}")
+            return path, False
+
+        _purge_expired(cache_dir, ttl)
+
+        fd, name = tempfile.mkstemp(dir=cache_dir, prefix=".build-", suffix=".tmp")
+        os.close(fd)
+        tmp_path = Path(name)
+        acquire_dataset_file(tmp_path)
+        try:
+            total = await _write_dataset(session, spec, filters, tmp_path)
+            # Атомарная замена: читатели никогда не видят недописанный файл
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            release_dataset_file(tmp_path)
+        acquire_dataset_file(path)
+
+    logger.info(f"Набор {spec.name} ({extension}) собран: {total} строк, {path.name}")
+    return path, False
@@ -0,0 +1,22 @@
+from datetime import date
+from enum import Enum
+from typing import List, Optional
+
+from app.modules.common.dto import BasestDto, TerritoryFilterDto
+
+
+class DatasetFormat(str, Enum):
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+class DatasetFilterDto(TerritoryFilterDto):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    format: DatasetFormat = DatasetFormat.parquet
+
+
+class DatasetInfoDto(BasestDto):
+    name: str
+    description: str
+    columns: List[str]
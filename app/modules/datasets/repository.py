@@ -0,0 +1,149 @@
+"""
+Реестр аналитических наборов данных для колоночной выгрузки (Parquet/Arrow).
+
+Каждый набор - это таблица, колонка периода и способ привязки записи к
+геометрии для территориального фильтра. Запросы строятся без ORM-объектов и
+связей, чтобы чтение порциями не тянуло selectin-загрузки.
+"""
+
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Sequence
+
+from loguru import logger
+from sqlalchemy import Row, Select, and_, exists, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.ckf.models import (
+    EsfBuyerMonth,
+    EsfSellerMonth,
+    Fno,
+    Kkms,
+    Organizations,
+    ReceiptsMonthly,
+)
+from app.modules.common.periods import in_date_range
+from app.modules.common.utils import territory_to_geo_element
+from app.modules.ext.mobile_data.models import (
+    KaztelecomMobileData,
+    KaztelecomStationsGeo,
+)
+from .dtos import DatasetFilterDto
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    description: str
+    model: type
+    # Условие "запись в территории": получает геометрию, возвращает условие WHERE
+    territory_filter: Callable
+    # Условие периода по фильтру с date_from/date_to
+    period_filter: Callable
+
+    @property
+    def columns(self) -> List:
+        return list(self.model.__table__.columns)
+
+
+def _organization_in(model):
+    return lambda geom: exists().where(
+        Organizations.id == model.organization_id,
+        func.ST_Intersects(Organizations.shape, geom),
+    )
+
+
+def _by_date(column):
+    return lambda filters: in_date_range(column, filters.date_from, filters.date_to)
+
+
+def _fno_period(filters: DatasetFilterDto):
+    # Декларации хранятся по годам: период переводим в диапазон лет
+    conditions = []
+    if filters.date_from is not None:
+        conditions.append(Fno.year >= filters.date_from.year)
+    if filters.date_to is not None:
+        conditions.append(Fno.year <= filters.date_to.year)
+    return and_(*conditions) if conditions else None
+
+
+DATASETS: Dict[str, DatasetSpec] = {
+    spec.name: spec
+    for spec in (
+        DatasetSpec(
+            name="fno",
+            description="Формы налоговой отчётности по годам",
+            model=Fno,
+            territory_filter=_organization_in(Fno),
+            period_filter=_fno_period,
+        ),
+        DatasetSpec(
+            name="esf_seller_month",
+            description="ЭСФ реализация помесячно",
+            model=EsfSellerMonth,
+            territory_filter=_organization_in(EsfSellerMonth),
+            period_filter=_by_date(EsfSellerMonth.month_year),
+        ),
+        DatasetSpec(
+            name="esf_buyer_month",
+            description="ЭСФ приобретение помесячно",
+            model=EsfBuyerMonth,
+            territory_filter=_organization_in(EsfBuyerMonth),
+            period_filter=_by_date(EsfBuyerMonth.month_year),
+        ),
+        DatasetSpec(
+            name="receipts_month",
+            description="Чеки ККМ помесячно",
+            model=ReceiptsMonthly,
+            territory_filter=lambda geom: exists().where(
+                Kkms.id == ReceiptsMonthly.kkms_id,
+                func.ST_Intersects(Kkms.shape, geom),
+            ),
+            period_filter=_by_date(ReceiptsMonthly.month),
+        ),
+        DatasetSpec(
+            name="mobile_data",
+            description="Мобильные данные Казахтелеком",
+            model=KaztelecomMobileData,
+            territory_filter=lambda geom: exists().where(
+                KaztelecomStationsGeo.id == KaztelecomMobileData.zid_id,
+                func.ST_Intersects(KaztelecomStationsGeo.polygon_wkt, geom),
+            ),
+            period_filter=_by_date(KaztelecomMobileData.date),
+        ),
+    )
+}
+
+
+class DatasetsRepo:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    @staticmethod
+    def build_query(spec: DatasetSpec, filters: DatasetFilterDto) -> Select:
+        query = select(*spec.columns)
+
+        period = spec.period_filter(filters)
+        if period is not None:
+            query = query.where(period)
+
+        if filters.territory is not None:
+            query = query.where(
+                spec.territory_filter(territory_to_geo_element(filters.territory))
+            )
+
+        return query.order_by(spec.model.id)
+
+    async def stream(
+        self, spec: DatasetSpec, filters: DatasetFilterDto, chunk_size: int = 50000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Строки набора порциями по chunk_size через серверный курсор"""
+        try:
+            result = await self._session.stream(
+                self.build_query(spec, filters).execution_options(yield_per=chunk_size)
+            )
+            async for partition in result.partitions():
+                yield partition
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при чтении набора данных {spec.name}: {e}")
+            raise
@@ -0,0 +1,83 @@
+from functools import partial
+from typing import Annotated, Callable, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import Receive, Scope, Send
+
+from app.database.deps import get_session_without_commit
+from .columnar import DATASET_MEDIA_TYPES, build_dataset_file, release_dataset_file
+from .dtos import DatasetFilterDto, DatasetInfoDto
+from .repository import DATASETS
+
+router = APIRouter(prefix="/datasets", tags=["datasets"])
+
+
+class DatasetFileResponse(FileResponse):
+    """
+    Файл набора: после отдачи освобождается (файл кэша) или удаляется
+    (временный) - в т.ч. при обрыве соединения, когда фоновая задача
+    ответа не выполняется
+    """
+
+    def __init__(self, path, release: Callable[[], None], **kwargs):
+        super().__init__(path, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+@router.get("", response_model=List[DatasetInfoDto])
+async def get_datasets() -> List[DatasetInfoDto]:
+    """Наборы данных, доступные для выгрузки в Parquet / Arrow"""
+    return [
+        DatasetInfoDto(
+            name=spec.name,
+            description=spec.description,
+            columns=[column.name for column in spec.columns],
+        )
+        for spec in DATASETS.values()
+    ]
+
+
+@router.get("/{name}", response_class=FileResponse)
+async def export_dataset(
+    name: str,
+    filters: Annotated[DatasetFilterDto, Query()],
+    session: AsyncSession = Depends(get_session_without_commit),
+):
+    """
+    Выгрузить набор данных файлом Parquet или Arrow IPC (pandas.read_parquet /
+    pyarrow.ipc.open_file).
+
+    - **name**: fno, esf_seller_month, esf_buyer_month, receipts_month, mobile_data
+    - **territory**: WKT/WKB геометрия территории
+    - **date_from**, **date_to**: период (для fno - годы этих дат)
+    - **format**: parquet (по умолчанию) или arrow
+
+    Одинаковые запросы в течение DATASETS_CACHE_TTL отдаются из файлового кэша.
+    """
+    spec = DATASETS.get(name)
+    if spec is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Набор данных {name} не найден",
+        )
+
+    path, temporary = await build_dataset_file(session, spec, filters)
+
+    return DatasetFileResponse(
+        path,
+        release=(
+            partial(path.unlink, missing_ok=True)
+            if temporary
+            else partial(release_dataset_file, path)
+        ),
+        media_type=DATASET_MEDIA_TYPES[filters.format],
+        filename=f"{spec.name}.{filters.format.value}",
+    )
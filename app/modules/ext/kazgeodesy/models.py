@@ -16,7 +16,7 @@ class KazgeodesyRkOblasti(BasestModel):
 
     type: Mapped[str] = mapped_column(Integer, comment="Тип", nullable=True)
 
-    name_ru: Mapped[str] = mapped_column(Integer, comment="Наименование РУС", nullable=True)
+    name_ru: Mapped[str] = mapped_column(comment="Наименование РУС", nullable=True)
 
     kato: Mapped[str] = mapped_column(Integer, comment="КАТО", nullable=True)
     parentkato: Mapped[str] = mapped_column(Integer, comment="Родительский КАТО", nullable=True)
@@ -37,7 +37,7 @@ class KazgeodesyRkRaiony(BasestModel):
 
     type: Mapped[str] = mapped_column(Integer, comment="Тип", nullable=True)
 
-    name_ru: Mapped[str] = mapped_column(Integer, comment="Наименование РУС", nullable=True)
+    name_ru: Mapped[str] = mapped_column(comment="Наименование РУС", nullable=True)
 
     kato: Mapped[str] = mapped_column(Integer, comment="КАТО", nullable=True)
     parentkato: Mapped[str] = mapped_column(Integer, comment="Родительский КАТО", nullable=True)
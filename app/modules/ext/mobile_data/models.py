@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import BigInteger, Integer, ForeignKey, Date, Numeric
+from sqlalchemy import BigInteger, Integer, ForeignKey, Date, Index, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import date
 from decimal import Decimal
@@ -105,10 +105,14 @@ class KaztelecomStationsGeo(BasestModel):
 
 class KaztelecomMobileData(BasestModel):
     __tablename__ = "kaztelecom_mobile_data"
-    __table_args__ = dict(schema="ext", comment="Мобильные данные Казтелеком")
+    # Секционирована по date, см. app/database/partitions.py
+    __table_args__ = (
+        Index("ix_kaztelecom_mobile_data_date_hour_id", "date", "hour_id"),
+        dict(schema="ext", comment="Мобильные данные Казтелеком"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    date: Mapped[Optional[date]] = mapped_column(Date, comment="Дата")
+    date: Mapped[Optional[date]] = mapped_column(Date, comment="Дата", nullable=False)
 
     # Foreign keys
     hour_id: Mapped[Optional[int]] = mapped_column(
@@ -1,10 +1,12 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy import select, func, and_, or_
 from sqlalchemy.exc import SQLAlchemyError
 from loguru import logger
 
 from app.modules.common.repository import BaseRepository
 from app.modules.common.utils import territory_to_geo_element
+from app.modules.common.periods import in_date_range
+from app.modules.common.result_caps import Pagination, fetch_capped
 from .dtos import (
     KaztelecomMobileDataFilterDto,
     KaztelecomStationsGeoFilterDto,
@@ -97,59 +99,76 @@ class KaztelecomStationsGeoRepo(BaseRepository):
 class KaztelecomMobileDataRepo(BaseRepository):
     model = KaztelecomMobileData
 
-    async def filter_mobile_data(self, filters: KaztelecomMobileDataFilterDto):
-        """Фильтрация мобильных данных"""
-        try:
-            query = select(self.model)
+    def _filter_mobile_data_query(self, filters: KaztelecomMobileDataFilterDto):
+        query = select(self.model)
 
-            if filters.date_from is not None:
-                query = query.filter(self.model.date >= filters.date_from)
-
-            if filters.date_to is not None:
-                query = query.filter(self.model.date <= filters.date_to)
+        if filters.date_from is not None or filters.date_to is not None:
+            query = query.filter(
+                in_date_range(self.model.date, filters.date_from, filters.date_to)
+            )
 
-            if filters.hour_id is not None:
-                query = query.filter(self.model.hour_id == filters.hour_id)
+        if filters.hour_id is not None:
+            query = query.filter(self.model.hour_id == filters.hour_id)
 
-            if filters.age_id is not None:
-                query = query.filter(self.model.age_id == filters.age_id)
+        if filters.age_id is not None:
+            query = query.filter(self.model.age_id == filters.age_id)
 
-            if filters.income_id is not None:
-                query = query.filter(self.model.income_id == filters.income_id)
+        if filters.income_id is not None:
+            query = query.filter(self.model.income_id == filters.income_id)
 
-            if filters.gender_id is not None:
-                query = query.filter(self.model.gender_id == filters.gender_id)
+        if filters.gender_id is not None:
+            query = query.filter(self.model.gender_id == filters.gender_id)
 
-            # Для территориальной фильтрации нужно присоединить таблицу станций
-            if filters.territory is not None:
-                territory_geom = territory_to_geo_element(filters.territory)
-                query = query.join(
-                    KaztelecomStationsGeo, self.model.zid_id == KaztelecomStationsGeo.id
-                ).filter(
-                    func.ST_Intersects(
-                        KaztelecomStationsGeo.polygon_wkt, territory_geom
-                    )
+        # Для территориальной фильтрации нужно присоединить таблицу станций
+        if filters.territory is not None:
+            territory_geom = territory_to_geo_element(filters.territory)
+            query = query.join(
+                KaztelecomStationsGeo, self.model.zid_id == KaztelecomStationsGeo.id
+            ).filter(
+                func.ST_Intersects(
+                    KaztelecomStationsGeo.polygon_wkt, territory_geom
                 )
+            )
 
-            if filters.region is not None:
-                query = query.join(
-                    KaztelecomStationsGeo, self.model.zid_id == KaztelecomStationsGeo.id
-                ).filter(KaztelecomStationsGeo.region.ilike(f"%{filters.region}%"))
+        if filters.region is not None:
+            query = query.join(
+                KaztelecomStationsGeo, self.model.zid_id == KaztelecomStationsGeo.id
+            ).filter(KaztelecomStationsGeo.region.ilike(f"%{filters.region}%"))
 
-            if filters.city is not None:
-                query = query.join(
-                    KaztelecomStationsGeo, self.model.zid_id == KaztelecomStationsGeo.id
-                ).filter(KaztelecomStationsGeo.city.ilike(f"%{filters.city}%"))
+        if filters.city is not None:
+            query = query.join(
+                KaztelecomStationsGeo, self.model.zid_id == KaztelecomStationsGeo.id
+            ).filter(KaztelecomStationsGeo.city.ilike(f"%{filters.city}%"))
 
-            if filters.district is not None:
-                query = query.join(
-                    KaztelecomStationsGeo, self.model.zid_id == KaztelecomStationsGeo.id
-                ).filter(KaztelecomStationsGeo.district.ilike(f"%{filters.district}%"))
+        if filters.district is not None:
+            query = query.join(
+                KaztelecomStationsGeo, self.model.zid_id == KaztelecomStationsGeo.id
+            ).filter(KaztelecomStationsGeo.district.ilike(f"%{filters.district}%"))
 
-            query = query.order_by(self.model.date.desc(), self.model.hour_id)
+        # id в конце - стабильный порядок для постраничного чтения
+        return query.order_by(
+            self.model.date.desc(), self.model.hour_id, self.model.id
+        )
 
-            result = await self._session.execute(query)
-            records = result.unique().scalars().all()
+    def stream_filter_mobile_data(
+        self, filters: KaztelecomMobileDataFilterDto, chunk_size: int = 1000
+    ):
+        """Мобильные данные по фильтрам порциями, для потоковой выгрузки"""
+        return self.stream(self._filter_mobile_data_query(filters), chunk_size)
+
+    async def filter_mobile_data(
+        self,
+        filters: KaztelecomMobileDataFilterDto,
+        pagination: Optional[Pagination] = None,
+    ):
+        """Фильтрация мобильных данных"""
+        try:
+            records = await fetch_capped(
+                self._session,
+                self._filter_mobile_data_query(filters),
+                "KaztelecomMobileDataRepo.filter_mobile_data",
+                pagination,
+            )
 
             logger.info(f"Найдено {len(records)} записей мобильных данных.")
             return records
@@ -174,10 +193,10 @@ class KaztelecomMobileDataRepo(BaseRepository):
 
             # Применить фильтры если есть (упрощенная версия)
             if filters:
-                if filters.date_from:
-                    query = query.filter(self.model.date >= filters.date_from)
-                if filters.date_to:
-                    query = query.filter(self.model.date <= filters.date_to)
+                if filters.date_from or filters.date_to:
+                    query = query.filter(
+                        in_date_range(self.model.date, filters.date_from, filters.date_to)
+                    )
                 if filters.hour_id:
                     query = query.filter(self.model.hour_id == filters.hour_id)
 
@@ -1,11 +1,14 @@
 from typing import Annotated, List
 from fastapi import APIRouter, Query, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_cache.decorator import cache
 
 from app.database.deps import get_session_without_commit
 from app.modules.common.router import request_key_builder, cache_ttl, BaseCRUDRouter
 from app.modules.common.dto import Bbox
+from app.modules.common.export import ExportFormat, export_response, get_export_format
+from app.modules.common.result_caps import Pagination, get_pagination
 from .dtos import (
     KaztelecomHourDto,
     KaztelecomMobileDataDto,
@@ -126,6 +129,7 @@ class KaztelecomMobileDataRouter(APIRouter):
     @cache(expire=cache_ttl, key_builder=request_key_builder)
     async def filter_mobile_data(
         filters: Annotated[KaztelecomMobileDataFilterDto, Query()],
+        pagination: Pagination = Depends(get_pagination),
         session: AsyncSession = Depends(get_session_without_commit),
     ) -> List[KaztelecomMobileDataDto]:
         """
@@ -141,10 +145,38 @@ class KaztelecomMobileDataRouter(APIRouter):
         - **region**: регион
         - **city**: город
         - **district**: район
+        - **limit**, **offset**: постраничное чтение; без limit отдаётся не больше
+          серверного лимита строк, продолжение - по заголовку X-Next-Offset
         """
-        response = await KaztelecomMobileDataRepo(session).filter_mobile_data(filters)
+        response = await KaztelecomMobileDataRepo(session).filter_mobile_data(
+            filters, pagination
+        )
         return [KaztelecomMobileDataDto.model_validate(item) for item in response]
 
+    @sub_router.get(
+        "/filter/export",
+        summary="Выгрузка мобильных данных",
+        response_class=StreamingResponse,
+    )
+    async def export_mobile_data(
+        filters: Annotated[KaztelecomMobileDataFilterDto, Query()],
+        export_format: ExportFormat = Depends(get_export_format),
+    ):
+        """
+        Выгрузка мобильных данных по тем же фильтрам, что и /filter,
+        потоком в NDJSON или CSV.
+
+        - **format**: ndjson или csv, либо заголовок Accept: application/x-ndjson / text/csv
+        """
+        return export_response(
+            lambda session: KaztelecomMobileDataRepo(
+                session
+            ).stream_filter_mobile_data(filters),
+            KaztelecomMobileDataDto,
+            export_format,
+            "mobile_data",
+        )
+
     @sub_router.get("/stats", summary="Агрегированная статистика")
     @cache(expire=cache_ttl, key_builder=request_key_builder)
     async def get_aggregation_stats(
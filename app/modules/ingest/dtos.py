@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+from app.modules.common.dto import BasestDto
+
+
+class IngestTargetDto(BasestDto):
+    name: str
+    key: Optional[List[str]] = None
+    columns: List[str]
+    refresh: List[str]
+
+
+class IngestResultDto(BasestDto):
+    target: str
+    read: int
+    rejected: int
+    written: int
@@ -0,0 +1,253 @@
+"""
+Загрузка данных в справочные и аналитические таблицы через COPY.
+
+Порядок загрузки:
+1. Файл читается порциями и передаётся через COPY (asyncpg
+   copy_records_to_table) во временную текстовую таблицу.
+2. Строки без ключа отбрасываются, из дублей по ключу остаётся последний.
+3. Одним INSERT ... SELECT ... ON CONFLICT строки приводятся к типам целевой
+   таблицы и переносятся в неё. Ошибка приведения типов отменяет всю загрузку.
+4. После коммита пересчитываются зависимые агрегаты и сбрасывается кэш API.
+
+Запуск:
+
+    python -m app.modules.ingest.pipeline kazgeodesy_raiony data/raiony.shp
+    python -m app.modules.ingest.pipeline populations data/populations.csv --no-refresh
+"""
+
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from geoalchemy2 import Geometry
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.database import async_session_maker
+from app.database.redis import redis_client
+from app.modules.ckf import rollups
+from .readers import Chunk, IngestFormat, detect_format, read_csv, read_vector
+from .targets import INGEST_TARGETS, REFRESH_CACHE, REFRESH_ROLLUPS, IngestTarget
+
+STAGE_TABLE = "ingest_stage"
+
+_dialect = postgresql.dialect()
+_quote = _dialect.identifier_preparer.quote
+
+
+@dataclass
+class IngestResult:
+    target: str
+    read: int = 0
+    rejected: int = 0
+    written: int = 0
+
+
+def _read(target: IngestTarget, path: Path, file_format: IngestFormat):
+    chunk_size = settings.INGEST_CHUNK_SIZE
+    if file_format == IngestFormat.csv:
+        return read_csv(path, chunk_size)
+
+    geometry = target.geometry_column
+    if geometry is None:
+        raise ValueError(f"Таблица {target.name} не содержит геометрии")
+    return read_vector(path, chunk_size, geometry.name)
+
+
+def _resolve_columns(target: IngestTarget, header: List[str]) -> List[str]:
+    table_columns = {column.name.lower(): column.name for column in target.table.columns}
+
+    unknown = [name for name in header if name not in table_columns]
+    if unknown:
+        raise ValueError(
+            f"Колонки отсутствуют в таблице {target.name}: {', '.join(unknown)}"
+        )
+
+    if target.key is not None:
+        missing = [name for name in target.key if name.lower() not in header]
+        if missing:
+            raise ValueError(f"Во входных данных нет ключа: {', '.join(missing)}")
+
+    return [table_columns[name] for name in header]
+
+
+def _cast(target: IngestTarget, name: str) -> str:
+    """Выражение приведения текстовой колонки staging к типу целевой колонки"""
+    column = target.table.columns[name]
+    value = f"s.{_quote(name)}"
+
+    if isinstance(column.type, Geometry):
+        srid = column.type.srid if column.type.srid and column.type.srid > 0 else 4326
+        geometry = f"CAST({value} AS geometry)"
+        # WKT без SRID считаем заданным в 4326
+        geometry = (
+            f"ST_Transform(CASE WHEN ST_SRID({geometry}) = 0 "
+            f"THEN ST_SetSRID({geometry}, 4326) ELSE {geometry} END, {srid})"
+        )
+        if (column.type.geometry_type or "").upper().startswith("MULTI"):
+            geometry = f"ST_Multi({geometry})"
+        return geometry
+
+    return f"CAST({value} AS {column.type.compile(dialect=_dialect)})"
+
+
+def _upsert_sql(target: IngestTarget, columns: List[str]) -> str:
+    table = _dialect.identifier_preparer.format_table(target.table)
+    column_list = ", ".join(_quote(name) for name in columns)
+    select_list = ", ".join(_cast(target, name) for name in columns)
+
+    if target.key is None:
+        return (
+            f"INSERT INTO {table} ({column_list}) "
+            f"SELECT {select_list} FROM {STAGE_TABLE} s ORDER BY s._line"
+        )
+
+    key_list = ", ".join(f"s.{_quote(name)}" for name in target.key)
+    conflict = ", ".join(_quote(name) for name in target.key)
+    updates = [name for name in columns if name not in target.key]
+    on_conflict = (
+        "DO UPDATE SET "
+        + ", ".join(f"{_quote(name)} = EXCLUDED.{_quote(name)}" for name in updates)
+        if updates
+        else "DO NOTHING"
+    )
+
+    # DISTINCT ON: из дублей по ключу остаётся последняя строка файла
+    return (
+        f"INSERT INTO {table} ({column_list}) "
+        f"SELECT DISTINCT ON ({key_list}) {select_list} FROM {STAGE_TABLE} s "
+        f"ORDER BY {key_list}, s._line DESC "
+        f"ON CONFLICT ({conflict}) {on_conflict}"
+    )
+
+
+async def _copy_to_stage(
+    session: AsyncSession, columns: List[str], chunks: Iterator[Chunk]
+) -> int:
+    stage_columns = ", ".join(f"{_quote(name)} text" for name in columns)
+    await session.execute(
+        text(
+            f"CREATE TEMP TABLE {STAGE_TABLE} (_line bigserial, {stage_columns}) "
+            f"ON COMMIT DROP"
+        )
+    )
+
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    copied = 0
+    while True:
+        # Чтение и разбор файла - блокирующие операции
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+
+        await driver_connection.copy_records_to_table(
+            STAGE_TABLE, records=chunk, columns=columns
+        )
+        copied += len(chunk)
+
+    return copied
+
+
+async def ingest_file(
+    session: AsyncSession,
+    target: IngestTarget,
+    path: Path,
+    file_format: Optional[IngestFormat] = None,
+) -> IngestResult:
+    """
+    Загрузить файл в таблицу в транзакции переданной сессии. Коммит и
+    пересчёт зависимых данных (refresh_after_ingest) - на стороне вызывающего.
+    """
+    file_format = file_format or detect_format(path)
+    header, chunks = _read(target, path, file_format)
+    columns = _resolve_columns(target, header)
+
+    result = IngestResult(target=target.name)
+    result.read = await _copy_to_stage(session, columns, chunks)
+
+    if target.key is not None:
+        key_is_null = " OR ".join(f"{_quote(name)} IS NULL" for name in target.key)
+        rejected = await session.execute(
+            text(f"DELETE FROM {STAGE_TABLE} WHERE {key_is_null}")
+        )
+        result.rejected = rejected.rowcount
+
+    written = await session.execute(text(_upsert_sql(target, columns)))
+    result.written = written.rowcount
+
+    logger.info(
+        f"Загрузка {target.name} из {path.name}: прочитано {result.read}, "
+        f"отброшено {result.rejected}, записано {result.written}"
+    )
+    return result
+
+
+async def clear_api_cache() -> None:
+    try:
+        FastAPICache.get_backend()
+    except AssertionError:
+        # Вне приложения (CLI) кэш не инициализирован
+        FastAPICache.init(
+            RedisBackend(redis_client), prefix="fastapi-cache"
+        )
+    await FastAPICache.clear()
+
+
+async def refresh_after_ingest(target: IngestTarget) -> None:
+    """Пересчёт данных, зависящих от загруженной таблицы"""
+    if REFRESH_ROLLUPS in target.refresh:
+        await rollups.main()
+    if REFRESH_CACHE in target.refresh:
+        await clear_api_cache()
+    logger.info(f"Зависимые данные для {target.name} обновлены")
+
+
+async def main(
+    target_name: str,
+    path: Path,
+    file_format: Optional[IngestFormat] = None,
+    refresh: bool = True,
+) -> IngestResult:
+    target = INGEST_TARGETS[target_name]
+
+    async with async_session_maker() as session:
+        async with session.begin():
+            result = await ingest_file(session, target, path, file_format)
+
+    if refresh:
+        await refresh_after_ingest(target)
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Загрузка данных через COPY")
+    parser.add_argument("target", choices=sorted(INGEST_TARGETS))
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format",
+        type=IngestFormat,
+        default=None,
+        help="csv, geojson, shp, gpkg (по умолчанию по расширению файла)",
+    )
+    parser.add_argument(
+        "--no-refresh",
+        action="store_true",
+        help="Не пересчитывать агрегаты и не сбрасывать кэш",
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        main(args.target, args.path, args.format, refresh=not args.no_refresh)
+    )
+    logger.info(f"Загрузка {args.target} завершена: {asdict(result)}")
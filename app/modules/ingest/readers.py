@@ -0,0 +1,103 @@
+"""
+Чтение входных файлов порциями строк для COPY.
+
+Все значения отдаются строками (или None): staging-таблица текстовая, типы
+приводятся уже в PostgreSQL при переносе в целевую таблицу. Геометрия
+отдаётся как EWKT в SRID 4326.
+"""
+
+import csv
+from enum import Enum
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+Chunk = List[Tuple[Optional[str], ...]]
+
+
+class IngestFormat(str, Enum):
+    csv = "csv"
+    geojson = "geojson"
+    shp = "shp"
+    gpkg = "gpkg"
+
+
+def detect_format(path: Path) -> IngestFormat:
+    suffix = path.suffix.lower().lstrip(".")
+    if suffix == "json":
+        return IngestFormat.geojson
+    if suffix == "zip":
+        # Shape вместе с .dbf/.prj в архиве, GDAL читает его напрямую
+        return IngestFormat.shp
+    try:
+        return IngestFormat(suffix)
+    except ValueError:
+        raise ValueError(f"Неизвестный формат файла: {path.name}")
+
+
+def _normalize(name: str) -> str:
+    return name.strip().lower()
+
+
+def read_csv(path: Path, chunk_size: int) -> Tuple[List[str], Iterator[Chunk]]:
+    """Заголовок и порции строк CSV. Пустые ячейки - NULL"""
+    handle = open(path, newline="", encoding="utf-8-sig")
+    reader = csv.reader(handle)
+    try:
+        header = [_normalize(name) for name in next(reader)]
+    except StopIteration:
+        handle.close()
+        raise ValueError("Пустой CSV файл")
+
+    def chunks() -> Iterator[Chunk]:
+        with handle:
+            chunk: Chunk = []
+            for row in reader:
+                chunk.append(tuple(value if value != "" else None for value in row))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+    return header, chunks()
+
+
+def read_vector(
+    path: Path, chunk_size: int, geometry_column: str
+) -> Tuple[List[str], Iterator[Chunk]]:
+    """
+    Заголовок и порции строк GeoJSON / shape / GeoPackage. Геометрия
+    перепроецируется в 4326 и пишется в колонку geometry_column.
+    """
+    import pyogrio
+    import shapely
+
+    info = pyogrio.read_info(path, force_feature_count=True)
+    fields = [_normalize(name) for name in info["fields"]]
+    header = fields + [geometry_column]
+    total = info["features"]
+
+    def chunks() -> Iterator[Chunk]:
+        for offset in range(0, total, chunk_size):
+            frame = pyogrio.read_dataframe(
+                path, skip_features=offset, max_features=chunk_size
+            )
+            if frame.crs is not None and frame.crs.to_epsg() != 4326:
+                frame = frame.to_crs(4326)
+
+            geometries = [
+                f"SRID=4326;{wkt}" if wkt is not None else None
+                for wkt in shapely.to_wkt(frame.geometry.values)
+            ]
+            columns = [name for name in frame.columns if name != frame.geometry.name]
+            yield [
+                tuple(
+                    [None if value is None or value != value else str(value) for value in values]
+                    + [geometry]
+                )
+                for values, geometry in zip(
+                    frame[columns].itertuples(index=False, name=None), geometries
+                )
+            ]
+
+    return header, chunks()
@@ -0,0 +1,109 @@
+import asyncio
+import shutil
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    UploadFile,
+    status,
+)
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
+
+from app.database.database import async_session_maker
+from app.modules.admins.deps import get_current_admin_employee
+from .dtos import IngestResultDto, IngestTargetDto
+from .pipeline import ingest_file, refresh_after_ingest
+from .readers import IngestFormat, detect_format
+from .targets import INGEST_TARGETS
+
+router = APIRouter(
+    prefix="/ingest",
+    tags=["ingest"],
+    dependencies=[Depends(get_current_admin_employee)],
+)
+
+
+def _save_upload(file: UploadFile, path: Path) -> None:
+    with open(path, "wb") as handle:
+        shutil.copyfileobj(file.file, handle)
+
+
+@router.get("", response_model=List[IngestTargetDto])
+async def get_ingest_targets() -> List[IngestTargetDto]:
+    """Таблицы, доступные для загрузки"""
+    return [
+        IngestTargetDto(
+            name=target.name,
+            key=target.key,
+            columns=[column.name for column in target.table.columns],
+            refresh=sorted(target.refresh),
+        )
+        for target in INGEST_TARGETS.values()
+    ]
+
+
+@router.post("/{target}", response_model=IngestResultDto)
+async def ingest(
+    target: str,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    file_format: Optional[IngestFormat] = Query(None, alias="format"),
+    refresh: bool = Query(True, description="Пересчитать агрегаты и сбросить кэш"),
+) -> IngestResultDto:
+    """
+    Загрузить CSV / GeoJSON / GeoPackage в таблицу.
+
+    - **target**: таблица из GET /ingest
+    - **file**: CSV с заголовком из имён колонок таблицы или векторный файл
+      (shape - zip-архивом)
+    - **format**: csv, geojson, shp, gpkg (по умолчанию по расширению файла)
+
+    Строки с существующим ключом обновляются, строки без ключа отбрасываются.
+    Загрузка выполняется в одной транзакции.
+    """
+    ingest_target = INGEST_TARGETS.get(target)
+    if ingest_target is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Таблица {target} недоступна для загрузки",
+        )
+
+    suffix = Path(file.filename or "").suffix.lower()
+    try:
+        file_format = file_format or detect_format(Path(file.filename or ""))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    with tempfile.TemporaryDirectory(prefix="coc_ingest_") as directory:
+        path = Path(directory) / f"upload{suffix}"
+        # Копирование файла блокирующее - не держим им цикл событий
+        await asyncio.to_thread(_save_upload, file, path)
+
+        try:
+            async with async_session_maker() as session:
+                async with session.begin():
+                    result = await ingest_file(session, ingest_target, path, file_format)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+            )
+        except DBAPIError as e:
+            logger.error(f"Ошибка загрузки {target}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Данные не соответствуют таблице {target}: {e.orig}",
+            )
+
+    if refresh:
+        background_tasks.add_task(refresh_after_ingest, ingest_target)
+
+    return IngestResultDto(**asdict(result))
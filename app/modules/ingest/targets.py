@@ -0,0 +1,69 @@
+"""
+Таблицы, доступные для загрузки через app.modules.ingest.
+
+Для каждой таблицы задаются ключ, по которому строки сопоставляются с
+существующими (ON CONFLICT), и что нужно пересчитать после загрузки.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+
+from sqlalchemy import Column, Table
+from geoalchemy2 import Geometry
+
+from app.modules.ckf.models import (
+    EsfSeller,
+    EsfSellerDaily,
+    EsfSellerMonth,
+    Fno,
+    Kkms,
+    Organizations,
+)
+from app.modules.ext.kazgeodesy.models import KazgeodesyRkOblasti, KazgeodesyRkRaiony
+from app.modules.ext.mobile_data.models import KaztelecomMobileData
+from app.modules.regions.models import NalogPostuplenie, Populations
+
+# Что пересчитывать после загрузки
+REFRESH_ROLLUPS = "rollups"  # агрегаты по чекам, app/modules/ckf/rollups.py
+REFRESH_CACHE = "cache"  # кэш ответов API (fastapi-cache)
+
+
+@dataclass(frozen=True)
+class IngestTarget:
+    name: str
+    model: type
+    # Ключ сопоставления строк; None - только добавление (для секционированных
+    # таблиц без уникального ключа)
+    key: Optional[List[str]] = None
+    refresh: FrozenSet[str] = field(default_factory=lambda: frozenset({REFRESH_CACHE}))
+
+    @property
+    def table(self) -> Table:
+        return self.model.__table__
+
+    @property
+    def geometry_column(self) -> Optional[Column]:
+        for column in self.table.columns:
+            if isinstance(column.type, Geometry):
+                return column
+        return None
+
+
+_ROLLUPS_AND_CACHE = frozenset({REFRESH_ROLLUPS, REFRESH_CACHE})
+
+INGEST_TARGETS: Dict[str, IngestTarget] = {
+    target.name: target
+    for target in (
+        IngestTarget("organizations", Organizations, ["iin_bin"], _ROLLUPS_AND_CACHE),
+        IngestTarget("kkms", Kkms, ["id"], _ROLLUPS_AND_CACHE),
+        IngestTarget("fno", Fno, ["id"]),
+        IngestTarget("esf_seller", EsfSeller, ["id"]),
+        IngestTarget("esf_seller_daily", EsfSellerDaily, ["id"]),
+        IngestTarget("esf_seller_month", EsfSellerMonth, ["id"]),
+        IngestTarget("mobile_data", KaztelecomMobileData),
+        IngestTarget("populations", Populations, ["id"]),
+        IngestTarget("nalog_postuplenie", NalogPostuplenie, ["id"]),
+        IngestTarget("kazgeodesy_oblasti", KazgeodesyRkOblasti, ["id"], _ROLLUPS_AND_CACHE),
+        IngestTarget("kazgeodesy_raiony", KazgeodesyRkRaiony, ["id"], _ROLLUPS_AND_CACHE),
+    )
+}
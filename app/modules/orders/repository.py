@@ -53,109 +53,71 @@ class DicRiskTypeRepo(BaseRepository):
 class RisksRepo(BaseRepository):
     model = Risks
 
-    async def get_risks_with_details(
-        self,
-        filters: RisksFilterDto,
-        page_size: int | None = None,
-        page: int | None = None,
-    ):
-        try:
-            query = (
-                select(self.model)
-                .join(
-                    Organizations,
-                    self.model.organization_id == Organizations.id,
-                    isouter=True,
-                )
-                .join(DicRiskType, self.model.risk_type == DicRiskType.id, isouter=True)
-                .join(DicRiskName, self.model.risk_name == DicRiskName.id, isouter=True)
-                .join(
-                    DicRiskDegree,
-                    self.model.risk_degree == DicRiskDegree.id,
-                    isouter=True,
-                )
+    def _risks_with_details_query(self, query, filters: RisksFilterDto):
+        query = (
+            query.join(
+                Organizations,
+                self.model.organization_id == Organizations.id,
+                isouter=True,
             )
-
-            count_query = (
-                select(func.count(self.model.id))
-                .join(
-                    Organizations,
-                    self.model.organization_id == Organizations.id,
-                    isouter=True,
-                )
-                .join(DicRiskType, self.model.risk_type == DicRiskType.id, isouter=True)
-                .join(DicRiskName, self.model.risk_name == DicRiskName.id, isouter=True)
-                .join(
-                    DicRiskDegree,
-                    self.model.risk_degree == DicRiskDegree.id,
-                    isouter=True,
-                )
+            .join(DicRiskType, self.model.risk_type == DicRiskType.id, isouter=True)
+            .join(DicRiskName, self.model.risk_name == DicRiskName.id, isouter=True)
+            .join(
+                DicRiskDegree,
+                self.model.risk_degree == DicRiskDegree.id,
+                isouter=True,
             )
+        )
 
-            if filters.risk_degree_id is not None:
-                query = query.filter(self.model.risk_degree == filters.risk_degree_id)
-                count_query = count_query.filter(
-                    self.model.risk_degree == filters.risk_degree_id
-                )
+        if filters.risk_degree_id is not None:
+            query = query.filter(self.model.risk_degree == filters.risk_degree_id)
 
-            if filters.risk_type_id is not None:
-                query = query.filter(self.model.risk_type == filters.risk_type_id)
-                count_query = count_query.filter(
-                    self.model.risk_type == filters.risk_type_id
-                )
+        if filters.risk_type_id is not None:
+            query = query.filter(self.model.risk_type == filters.risk_type_id)
 
-            if filters.risk_name_id is not None:
-                query = query.filter(self.model.risk_name == filters.risk_name_id)
-                count_query = count_query.filter(
-                    self.model.risk_name == filters.risk_name_id
-                )
+        if filters.risk_name_id is not None:
+            query = query.filter(self.model.risk_name == filters.risk_name_id)
 
-            if filters.iin_bin is not None:
-                query = query.filter(Organizations.iin_bin == filters.iin_bin)
-                count_query = count_query.filter(
-                    Organizations.iin_bin == filters.iin_bin
-                )
+        if filters.iin_bin is not None:
+            query = query.filter(Organizations.iin_bin == filters.iin_bin)
 
-            if filters.is_ordered is not None:
-                query = query.filter(self.model.is_ordered == filters.is_ordered)
-                count_query = count_query.filter(
-                    self.model.is_ordered == filters.is_ordered
-                )
+        if filters.is_ordered is not None:
+            query = query.filter(self.model.is_ordered == filters.is_ordered)
 
-            if filters.region is not None:
-                query = query.filter(Organizations.region.ilike(f"%{filters.region}%"))
-                count_query = count_query.filter(
-                    Organizations.region.ilike(f"%{filters.region}%")
-                )
+        if filters.region is not None:
+            query = query.filter(Organizations.region.ilike(f"%{filters.region}%"))
 
-            if filters.city is not None:
-                query = query.filter(Organizations.city.ilike(f"%{filters.city}%"))
-                count_query = count_query.filter(
-                    Organizations.city.ilike(f"%{filters.city}%")
-                )
+        if filters.city is not None:
+            query = query.filter(Organizations.city.ilike(f"%{filters.city}%"))
 
-            if filters.district is not None:
-                query = query.filter(
-                    Organizations.district.ilike(f"%{filters.district}%")
-                )
-                count_query = count_query.filter(
-                    Organizations.district.ilike(f"%{filters.district}%")
-                )
+        if filters.district is not None:
+            query = query.filter(Organizations.district.ilike(f"%{filters.district}%"))
 
-            if filters.village is not None:
-                query = query.filter(
-                    Organizations.village.ilike(f"%{filters.village}%")
-                )
-                count_query = count_query.filter(
-                    Organizations.village.ilike(f"%{filters.village}%")
-                )
+        if filters.village is not None:
+            query = query.filter(Organizations.village.ilike(f"%{filters.village}%"))
 
-            if filters.territory is not None:
-                territory = territory_to_geo_element(filters.territory)
-                query = query.filter(func.ST_Within(Organizations.shape, territory))
-                count_query = count_query.filter(
-                    func.ST_Within(Organizations.shape, territory)
-                )
+        if filters.territory is not None:
+            territory = territory_to_geo_element(filters.territory)
+            query = query.filter(func.ST_Within(Organizations.shape, territory))
+
+        return query
+
+    def stream_risks_with_details(self, filters: RisksFilterDto, chunk_size: int = 1000):
+        """Риски по фильтрам порциями, для потоковой выгрузки"""
+        query = self._risks_with_details_query(select(self.model), filters)
+        return self.stream(query.order_by(self.model.id.desc()), chunk_size)
+
+    async def get_risks_with_details(
+        self,
+        filters: RisksFilterDto,
+        page_size: int | None = None,
+        page: int | None = None,
+    ):
+        try:
+            query = self._risks_with_details_query(select(self.model), filters)
+            count_query = self._risks_with_details_query(
+                select(func.count(self.model.id)), filters
+            )
 
             total = (await self._session.execute(count_query)).scalar()
 
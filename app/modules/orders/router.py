@@ -1,5 +1,6 @@
 from typing import Annotated, List, Optional
 from fastapi import APIRouter, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from fastapi_cache.decorator import cache
@@ -11,6 +12,7 @@ from app.modules.common.router import (
     cache_ttl,
     PaginatedResponse,
 )
+from app.modules.common.export import ExportFormat, export_response, get_export_format
 from .dtos import (
     CountRisksByDicRiskNameResponseDto,
     DicOrderStatusDto,
@@ -178,6 +180,24 @@ class RisksRouter(APIRouter):
             page_count=total_pages,
         )
 
+    @sub_router.get("/with-details/export", response_class=StreamingResponse)
+    async def export_risks_with_details(
+        filters: Annotated[RisksFilterDto, Query()],
+        export_format: ExportFormat = Depends(get_export_format),
+    ):
+        """
+        Выгрузка рисков с детальной информацией по тем же фильтрам, что и
+        /with-details, потоком в NDJSON или CSV (без пагинации).
+
+        - **format**: ndjson или csv, либо заголовок Accept: application/x-ndjson / text/csv
+        """
+        return export_response(
+            lambda session: RisksRepo(session).stream_risks_with_details(filters),
+            RisksDto,
+            export_format,
+            "risks",
+        )
+
     @sub_router.put("/bulk")
     async def bulk_update_risks_order(
         bulk_update: RiskBulkUpdateDto,
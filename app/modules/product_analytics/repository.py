@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from loguru import logger
 
 from app.modules.common.repository import BaseRepository
+from app.modules.common.result_caps import Pagination, fetch_capped
 from .models import GtinNp, GtinKkms, GtinTotal
 from .dtos import GtinNpFilterDto, GtinKkmsFilterDto, GtinTotalFilterDto
 
@@ -13,7 +14,9 @@ class GtinNpRepo(BaseRepository):
 
     model = GtinNp
 
-    async def filter(self, filters: GtinNpFilterDto) -> List[GtinNp]:
+    async def filter(
+        self, filters: GtinNpFilterDto, pagination: Optional[Pagination] = None
+    ) -> List[GtinNp]:
         """Фильтрация GTIN по налогоплательщикам"""
         try:
             query = select(self.model)
@@ -27,8 +30,9 @@ class GtinNpRepo(BaseRepository):
             if filters.gtin is not None:
                 query = query.filter(GtinNp.gtin == filters.gtin)
 
-            result = await self._session.execute(query)
-            records = result.unique().scalars().all()
+            records = await fetch_capped(
+                self._session, query.order_by(GtinNp.id), "GtinNpRepo.filter", pagination
+            )
 
             logger.info(f"Найдено {len(records)} записей GTIN по НП.")
             return records
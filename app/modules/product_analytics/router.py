@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_cache.decorator import cache
 
 from app.database.deps import get_session_with_commit, get_session_without_commit
+from app.modules.common.result_caps import Pagination, get_pagination
 from app.modules.common.router import BaseCRUDRouter, request_key_builder, cache_ttl
 
 from .dtos import (
@@ -42,6 +43,7 @@ class GtinNpRouter(APIRouter):
     @cache(expire=cache_ttl, key_builder=request_key_builder)
     async def filter_gtin_np(
         filters: Annotated[GtinNpFilterDto, Query()],
+        pagination: Pagination = Depends(get_pagination),
         session: AsyncSession = Depends(get_session_without_commit),
     ):
         """
@@ -51,7 +53,7 @@ class GtinNpRouter(APIRouter):
         - **org_id**: ID организации
         - **gtin**: GTIN код
         """
-        response = await GtinNpRepo(session).filter(filters)
+        response = await GtinNpRepo(session).filter(filters, pagination)
         return [GtinNpDto.model_validate(item) for item in response]
 
     @sub_router.get("/by-organization/{org_id}", response_model=List[GtinNpDto])
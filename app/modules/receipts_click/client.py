@@ -5,6 +5,7 @@ from typing import AsyncGenerator
 from loguru import logger
 
 from app.config import settings
+from app.modules.common.profiling import ProfiledClickHouseClient
 
 
 class ClickHouseClient:
@@ -24,7 +25,7 @@ class ClickHouseClient:
                 logger.info(f"  Database: {settings.CLICKHOUSE_DATABASE}")
                 logger.info(f"  Secure: {settings.CLICKHOUSE_SECURE}")
 
-                self._client = clickhouse_connect.get_client(
+                client = clickhouse_connect.get_client(
                     host=settings.CLICKHOUSE_HOST,
                     port=settings.CLICKHOUSE_PORT,
                     username=settings.CLICKHOUSE_USER,
@@ -34,6 +35,8 @@ class ClickHouseClient:
                     connect_timeout=10,
                     send_receive_timeout=60,
                 )
+                # Время запросов учитывается в профиле HTTP-запроса
+                self._client = ProfiledClickHouseClient(client)
                 logger.info(
                     f"Successfully connected to ClickHouse at {settings.CLICKHOUSE_HOST}:{settings.CLICKHOUSE_PORT}"
                 )
@@ -430,9 +430,31 @@ class StatsClickRepository(BaseClickRepository):
     async def get_combined_stats_by_kkm_id(self, kkm_id: int) -> KkmStatsDto:
         """Получить объединенную статистику (день + год) для ККМ"""
         try:
-            # Получаем статистику за день и за год
-            day_stats = await self.get_day_stats_by_kkm_id(kkm_id)
-            year_stats = await self.get_year_stats_by_kkm_id(kkm_id)
+            # День и год читаются одним запросом: клиент ClickHouse работает
+            # в одной сессии и не допускает параллельных запросов
+            query = """
+                SELECT 'day' AS period, kkms_id, check_sum, check_count
+                FROM (SELECT kkms_id, check_sum, check_count FROM stat_day WHERE kkms_id = %(kkm_id)s LIMIT 1)
+                UNION ALL
+                SELECT 'year' AS period, kkms_id, check_sum, check_count
+                FROM (SELECT kkms_id, check_sum, check_count FROM stat_year WHERE kkms_id = %(kkm_id)s LIMIT 1)
+            """
+            result = self.client.query(query, parameters={"kkm_id": kkm_id})
+
+            day_stats = None
+            year_stats = None
+            for row in result.result_rows:
+                row_dict = self._row_to_dict(row, result.column_names)
+                period = row_dict.pop("period")
+                if period == "day":
+                    day_stats = StatDayDto(**row_dict)
+                else:
+                    year_stats = StatYearDto(**row_dict)
+
+            if day_stats is None:
+                logger.info(f"Статистика за день для ККМ {kkm_id} не найдена")
+            if year_stats is None:
+                logger.info(f"Статистика за год для ККМ {kkm_id} не найдена")
 
             return KkmStatsDto(
                 kkms_id=kkm_id, day_stats=day_stats, year_stats=year_stats
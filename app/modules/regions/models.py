@@ -1,5 +1,5 @@
 from __future__ import annotations
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import date
 
@@ -8,7 +8,10 @@ from app.modules.common.models import BasestModel
 
 class Populations(BasestModel):
     __tablename__ = "populations"
-    __table_args__ = dict(comment="население")
+    __table_args__ = (
+        Index("ix_populations_date", "date"),
+        dict(comment="население"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -23,7 +26,10 @@ class Populations(BasestModel):
 
 class NalogPostuplenie(BasestModel):
     __tablename__ = "nalog_postuplenie"
-    __table_args__ = dict(comment="Налоговые поступления")
+    __table_args__ = (
+        Index("ix_nalog_postuplenie_month_ugd_id", "month", "ugd_id"),
+        dict(comment="Налоговые поступления"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
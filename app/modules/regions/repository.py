@@ -6,6 +6,7 @@ from app.modules.common.enums import RegionEnum
 from app.modules.common.repository import BaseRepository
 from app.modules.common.dto import ByYearAndRegionsFilterDto
 from app.modules.common.utils import territory_to_geo_element
+from app.modules.common.periods import in_year
 from app.modules.nsi.models import Ugds
 from app.modules.ext.kazgeodesy.models import KazgeodesyRkOblasti, KazgeodesyRkRaiony #осторожно
 from .models import (
@@ -91,8 +92,7 @@ class PopulationRepo(BaseRepository):
             max_date_subq = (
                 select(func.max(Populations.date_))
                 .where(
-                    Populations.date_ >= date(count_dto.year, 1, 1),
-                    Populations.date_ <= date(count_dto.year, 12, 31)
+                    in_year(Populations.date_, count_dto.year)
                 )
             )
             max_date_subq = self.apply_region_filter(query=max_date_subq, region=count_dto.region, region_id=count_dto.region_id)
@@ -162,8 +162,7 @@ class NalogPostuplenieRepo(BaseRepository):
                 )
                 .filter(
                     NalogPostuplenie.rb == True,
-                    NalogPostuplenie.month >= date(filters.year, 1, 1),
-                    NalogPostuplenie.month <= date(filters.year, 12, 31)
+                    in_year(NalogPostuplenie.month, filters.year),
                 )
             )
 
@@ -178,20 +177,20 @@ class NalogPostuplenieRepo(BaseRepository):
 
     async def get_montly_total_by_region(self, filters: PopulationPeriodFilterDto):
         try:
-            month_extract = func.extract("month", NalogPostuplenie.month)
+            # Группируем по самой колонке месяца, номер месяца вычисляется только для вывода
+            month_start = func.date_trunc("month", NalogPostuplenie.month)
 
             query = (
                 select(
-                    cast(month_extract, Integer).label("month"),
+                    cast(func.extract("month", month_start), Integer).label("month"),
                     func.coalesce(func.sum(NalogPostuplenie.total_amount), 0).label("total_sum")
                 )
                 .filter(
                     NalogPostuplenie.rb == True,
-                    NalogPostuplenie.month >= date(filters.year, 1, 1),
-                    NalogPostuplenie.month <= date(filters.year, 12, 31)
+                    in_year(NalogPostuplenie.month, filters.year),
                 )
-                .group_by(month_extract)
-                .order_by(month_extract)
+                .group_by(month_start)
+                .order_by(month_start)
             )
 
             query = self.apply_region_and_ugds_subquery(query=query, region=filters.region, region_id=filters.region_id)
@@ -0,0 +1,55 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+
+from app.database.database import engine
+from app.database.pool import pool_stats
+from app.database.replica import replica_engine, replica_monitor
+from app.database.slow_queries import slow_query_log
+from app.modules.admins.deps import get_current_admin_employee
+from app.modules.common.monitoring import METRICS_PATH, metrics_response
+
+router = APIRouter(
+    prefix="/system",
+    tags=["system"],
+    dependencies=[Depends(get_current_admin_employee)],
+)
+
+# Метрики для Prometheus: без префикса API и без авторизации, доступ
+# ограничивается на уровне сети
+metrics_router = APIRouter(tags=["system"])
+
+
+@metrics_router.get(METRICS_PATH, include_in_schema=False)
+async def get_metrics() -> Response:
+    return metrics_response()
+
+
+@router.get("/pool-stats")
+async def get_pool_stats() -> Dict[str, Any]:
+    """
+    Состояние пулов соединений с БД воркера, обработавшего запрос: занятые
+    соединения, overflow, гистограмма ожидания соединения (накопительная, мс),
+    отставание реплики
+    """
+    stats = {"primary": pool_stats(engine.sync_engine.pool)}
+    if replica_engine is not None:
+        stats["replica"] = {
+            **pool_stats(replica_engine.sync_engine.pool),
+            "healthy": replica_monitor.healthy,
+            "lag": replica_monitor.lag,
+        }
+    return stats
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+) -> List[Dict[str, Any]]:
+    """
+    Медленные запросы воркера, обработавшего запрос, по суммарному времени:
+    число, среднее и максимальное время (мс), маршруты, хэш параметров самого
+    медленного выполнения и последний план EXPLAIN (ANALYZE, BUFFERS)
+    """
+    return slow_query_log.top(limit)
@@ -0,0 +1,13 @@
+from uvicorn.workers import UvicornWorker
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """Воркер gunicorn: uvloop и httptools вместо asyncio и h11"""
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "proxy_headers": True,
+        "forwarded_allow_ips": "*",
+    }
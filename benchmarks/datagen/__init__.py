@@ -0,0 +1,5 @@
+"""
+Генератор синтетических данных для нагрузочных прогонов (benchmarks/loadtest.py).
+
+Данные детерминированы: один и тот же seed и масштаб дают те же строки.
+"""
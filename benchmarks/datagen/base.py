@@ -0,0 +1,223 @@
+"""
+Общие средства генератора: детерминированный ГСЧ, ячейки территории,
+подготовка схемы и загрузка строк через COPY.
+"""
+
+import csv
+import io
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from loguru import logger
+from geoalchemy2 import Geometry
+from sqlalchemy import Table, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.database.deps import Base
+from app.database.partitions import PARTITIONED_TABLES, _is_partitioned, partition_range
+
+# Модели импортируются, чтобы их таблицы попали в Base.metadata
+import app.modules.admins.models  # noqa: F401
+import app.modules.ckf.models  # noqa: F401
+import app.modules.ckl.cargo.models  # noqa: F401
+import app.modules.ckl.common.models  # noqa: F401
+import app.modules.ckl.customs.models  # noqa: F401
+import app.modules.ckl.infra.models  # noqa: F401
+import app.modules.ckl.transport.models  # noqa: F401
+import app.modules.ext.kazgeodesy.models  # noqa: F401
+import app.modules.ext.mobile_data.models  # noqa: F401
+import app.modules.ext.okeds.models  # noqa: F401
+import app.modules.nsi.models  # noqa: F401
+import app.modules.orders.models  # noqa: F401
+
+# Модели ЦКЛ ссылаются на справочники без моделей (camera_types, cargo_types,
+# ckl.organizations, ...), поэтому их таблицы создаются без внешних ключей
+FK_FREE_SCHEMAS = {"ckl"}
+
+# Строк в одном COPY
+COPY_CHUNK_SIZE = 50000
+
+# Границы Казахстана (lon/lat), внутри которых строится сетка территорий
+KZ_BOUNDS = (46.5, 40.6, 87.3, 55.4)
+
+
+def rng_for(seed: int, stream: str) -> random.Random:
+    """
+    Отдельный ГСЧ на таблицу: данные таблицы не зависят от того, какие ещё
+    таблицы генерируются и в каком порядке
+    """
+    return random.Random(f"{seed}:{stream}")
+
+
+@dataclass(frozen=True)
+class Cell:
+    """Прямоугольная ячейка территории (lon/lat)"""
+
+    minx: float
+    miny: float
+    maxx: float
+    maxy: float
+
+    def split(self, cols: int, rows: int) -> List["Cell"]:
+        width = (self.maxx - self.minx) / cols
+        height = (self.maxy - self.miny) / rows
+        return [
+            Cell(
+                self.minx + col * width,
+                self.miny + row * height,
+                self.minx + (col + 1) * width,
+                self.miny + (row + 1) * height,
+            )
+            for row in range(rows)
+            for col in range(cols)
+        ]
+
+    def random_point(self, rng: random.Random) -> Tuple[float, float]:
+        return rng.uniform(self.minx, self.maxx), rng.uniform(self.miny, self.maxy)
+
+    def random_bbox(self, rng: random.Random, size: float) -> Tuple[float, float, float, float]:
+        """Окно карты размером size градусов внутри ячейки"""
+        size = min(size, self.maxx - self.minx, self.maxy - self.miny)
+        minx = rng.uniform(self.minx, self.maxx - size)
+        miny = rng.uniform(self.miny, self.maxy - size)
+        return minx, miny, minx + size, miny + size
+
+    @property
+    def _ring(self) -> str:
+        return (
+            f"{self.minx} {self.miny}, {self.maxx} {self.miny}, "
+            f"{self.maxx} {self.maxy}, {self.minx} {self.maxy}, {self.minx} {self.miny}"
+        )
+
+    @property
+    def wkt(self) -> str:
+        return f"POLYGON(({self._ring}))"
+
+    @property
+    def ewkt_multipolygon(self) -> str:
+        return f"SRID=4326;MULTIPOLYGON((({self._ring})))"
+
+
+def ewkt_point(lon: float, lat: float) -> str:
+    return f"SRID=4326;POINT({lon:.6f} {lat:.6f})"
+
+
+def ewkt_multilinestring(points: Sequence[Tuple[float, float]]) -> str:
+    line = ", ".join(f"{lon:.6f} {lat:.6f}" for lon, lat in points)
+    return f"SRID=4326;MULTILINESTRING(({line}))"
+
+
+def last_months(last: date, count: int) -> List[date]:
+    """Первые числа count месяцев по месяц даты last включительно"""
+    months = []
+    current = last.replace(day=1)
+    for _ in range(count):
+        months.append(current)
+        current = (current - timedelta(days=1)).replace(day=1)
+    return months[::-1]
+
+
+def batched(rows: Iterable[Sequence], size: int) -> Iterator[List[Sequence]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _create_fk_free(sync_conn, tables: List[Table]) -> None:
+    """CREATE TABLE без внешних ключей, индексы моделей и GiST по геометрии"""
+    for table in tables:
+        sync_conn.execute(
+            CreateTable(table, if_not_exists=True, include_foreign_key_constraints=[])
+        )
+        for index in table.indexes:
+            sync_conn.execute(CreateIndex(index, if_not_exists=True))
+        for column in table.columns:
+            if isinstance(column.type, Geometry) and column.type.spatial_index:
+                sync_conn.execute(
+                    text(
+                        f'CREATE INDEX IF NOT EXISTS "idx_{table.name}_{column.name}" '
+                        f'ON "{table.schema}"."{table.name}" USING gist ("{column.name}")'
+                    )
+                )
+
+
+async def prepare_schema(engine: AsyncEngine) -> None:
+    """PostGIS, схемы и таблицы моделей (как при первом запросе приложения)"""
+    tables = list(Base.metadata.tables.values())
+    schemas = {table.schema for table in tables if table.schema}
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        for schema in sorted(schemas):
+            await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[table for table in tables if table.schema not in FK_FREE_SCHEMAS],
+        )
+        await conn.run_sync(
+            _create_fk_free,
+            [table for table in tables if table.schema in FK_FREE_SCHEMAS],
+        )
+
+
+async def ensure_seed_partitions(conn: AsyncConnection, first: date, last: date) -> None:
+    """Секции секционированных таблиц на весь период данных"""
+    for spec in PARTITIONED_TABLES:
+        if not await _is_partitioned(conn, spec):
+            continue
+        for _, statement in partition_range(spec, first, last):
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(text(statement))
+            except DBAPIError as e:
+                logger.error(f"Не удалось создать секцию {spec.qualified_name}: {e}")
+
+
+async def truncate(conn: AsyncConnection, tables: Iterable[Table]) -> None:
+    names = ", ".join(
+        f'"{table.schema or "public"}"."{table.name}"' for table in tables
+    )
+    await conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+
+
+async def copy_rows(
+    conn: AsyncConnection, table: Table, columns: List[str], rows: Iterable[Sequence]
+) -> int:
+    """
+    COPY ... FROM STDIN (csv): значения передаются текстом, геометрия - EWKT,
+    None - NULL
+    """
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+
+    written = 0
+    for chunk in batched(rows, COPY_CHUNK_SIZE):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(chunk)
+        await driver.copy_to_table(
+            table.name,
+            schema_name=table.schema or "public",
+            columns=columns,
+            source=io.BytesIO(buffer.getvalue().encode()),
+            format="csv",
+        )
+        written += len(chunk)
+
+    logger.info(f"{table.fullname}: загружено {written} строк")
+    return written
+
+
+async def reset_sequence(conn: AsyncConnection, table: Table, column: str = "id") -> None:
+    """Последовательность после загрузки явных id"""
+    name = f'"{table.schema or "public"}"."{table.name}"'
+    await conn.execute(
+        text(
+            f"SELECT setval(pg_get_serial_sequence(:table, :column), "
+            f"COALESCE((SELECT max({column}) FROM {name}), 0) + 1, false)"
+        ),
+        {"table": name, "column": column},
+    )
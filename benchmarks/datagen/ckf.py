@@ -0,0 +1,360 @@
+"""
+ЦКФ: организации и ККМ внутри районов, чеки и агрегаты чеков по дням, месяцам
+и годам, ФНО и ЭСФ.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.modules.ckf.models import (
+    EsfBuyer,
+    EsfBuyerDaily,
+    EsfBuyerMonth,
+    EsfSeller,
+    EsfSellerDaily,
+    EsfSellerMonth,
+    Fno,
+    FnoTypes,
+    Kkms,
+    Organizations,
+    Receipts,
+)
+from app.modules.nsi.models import RegTypes, TaxRegimes
+from .base import copy_rows, ewkt_point, last_months, reset_sequence, rng_for
+from .scale import Scale
+from .territory import Oblast, all_raions
+
+REG_TYPES = ["Первичная", "Перерегистрация", "Филиал"]
+TAX_REGIMES = ["ОУР", "Упрощённая декларация", "Патент", "Розничный налог"]
+# Форма ФНО по режиму налогообложения (id режима - позиция в TAX_REGIMES)
+FNO_FORM_BY_REGIME = {1: "fno_100_00", 2: "fno_910_00", 3: "fno_911_00", 4: "fno_913_00"}
+FNO_FORMS = [
+    "fno_100_00",
+    "fno_110_00",
+    "fno_150_00",
+    "fno_180_00",
+    "fno_220_00",
+    "fno_300_00",
+    "fno_910_00",
+    "fno_911_00",
+    "fno_912_00",
+    "fno_913_00",
+    "fno_920_00",
+]
+FNO_TYPES = ["Год", "Полугодие", "Квартал"]
+# Доля плательщиков НДС среди организаций на ОУР (ЭСФ и ФНО 300.00)
+VAT_PAYER_SHARE = 0.4
+KKM_MODELS = ["Меркурий-115Ф", "Штрих-М", "Атол 30Ф", "Webkassa", "ReKassa"]
+ITEMS = [
+    ("Хлеб", 250.0),
+    ("Молоко 1 л", 620.0),
+    ("Сахар 1 кг", 540.0),
+    ("Мука 2 кг", 980.0),
+    ("Масло подсолнечное 1 л", 1150.0),
+    ("Бензин АИ-92, л", 235.0),
+    ("Услуги связи", 3500.0),
+]
+
+
+@dataclass
+class PlacedOrganization:
+    id: int
+    ugd_id: int
+    lon: float
+    lat: float
+    tax_regime_id: int
+    vat_payer: bool
+    # Годовой оборот, тенге: от него считаются ФНО и ЭСФ
+    turnover: float
+
+
+def _iin_bin(index: int) -> str:
+    return f"{index:012d}"
+
+
+def _organizations(
+    seed: int, oblasts: List[Oblast], scale: Scale, first_day: date
+) -> Tuple[List[PlacedOrganization], List[tuple]]:
+    rng = rng_for(seed, "organizations")
+    raions = all_raions(oblasts)
+    placed = []
+    rows = []
+    for org_id in range(1, scale.organizations + 1):
+        raion = rng.choice(raions)
+        lon, lat = raion.cell.random_point(rng)
+        tax_regime_id = rng.randint(1, len(TAX_REGIMES))
+        placed.append(
+            PlacedOrganization(
+                org_id,
+                raion.oblast_id,
+                lon,
+                lat,
+                tax_regime_id,
+                vat_payer=tax_regime_id == 1 and rng.random() < VAT_PAYER_SHARE,
+                # Логнормальное распределение: медиана ~9 млн, длинный хвост крупных
+                turnover=rng.lognormvariate(16, 1.5),
+            )
+        )
+        rows.append(
+            (
+                org_id,
+                _iin_bin(100_000_000_000 + org_id),
+                f"ТОО «Бенчмарк {org_id}»",
+                raion.oblast_id,
+                rng.randint(1, len(REG_TYPES)),
+                tax_regime_id,
+                first_day - timedelta(days=rng.randint(0, 3650)),
+                1,
+                f"Область {raion.oblast_id}, район {raion.id}",
+                f"Область {raion.oblast_id}",
+                ewkt_point(lon, lat),
+            )
+        )
+    return placed, rows
+
+
+def _kkms(seed: int, organizations: List[PlacedOrganization], scale: Scale) -> Iterator[tuple]:
+    rng = rng_for(seed, "kkms")
+    kkm_id = 0
+    for org in organizations:
+        for _ in range(scale.kkms_per_organization):
+            kkm_id += 1
+            # ККМ в пределах ~1 км от организации
+            lon = org.lon + rng.uniform(-0.01, 0.01)
+            lat = org.lat + rng.uniform(-0.01, 0.01)
+            yield (
+                kkm_id,
+                org.id,
+                f"{kkm_id:012d}",
+                f"SN{kkm_id:010d}",
+                rng.choice(KKM_MODELS),
+                str(rng.randint(2015, 2025)),
+                "Торговая точка",
+                ewkt_point(lon, lat),
+            )
+
+
+def _receipts(seed: int, kkm_count: int, scale: Scale, last_day: date) -> Iterator[tuple]:
+    rng = rng_for(seed, "receipts")
+    receipt_id = 0
+    for kkm_id in range(1, kkm_count + 1):
+        for _ in range(scale.receipts_per_kkm):
+            receipt_id += 1
+            # Последний день периода - сегодня: в выборку «сегодняшних» чеков
+            # попадает примерно 1/days чеков
+            day = last_day - timedelta(days=rng.randrange(scale.days))
+            moment = datetime.combine(day, time(hour=rng.randint(8, 22), minute=rng.randint(0, 59)))
+            name, price = rng.choice(ITEMS)
+            price = round(price * rng.uniform(0.8, 1.3), 2)
+            count = rng.randint(1, 5)
+            total = round(price * count, 2)
+            yield (
+                receipt_id,
+                kkm_id,
+                moment,
+                rng.getrandbits(40),
+                rng.getrandbits(40),
+                name,
+                price,
+                count,
+                round(total * 12 / 112, 2),
+                total,
+                rng.choice((0, 1, 4)),
+            )
+
+
+def _fno(
+    seed: int, organizations: List[PlacedOrganization], scale: Scale, last_day: date
+) -> Iterator[tuple]:
+    """Годовые ФНО: основная форма по режиму, 300.00 у плательщиков НДС"""
+    rng = rng_for(seed, "fno")
+    years = range(last_day.year - scale.fno_years + 1, last_day.year + 1)
+    for org in organizations:
+        for year in years:
+            forms: Dict[str, float] = dict.fromkeys(FNO_FORMS, 0.0)
+            turnover = round(org.turnover * rng.uniform(0.7, 1.3), 2)
+            forms[FNO_FORM_BY_REGIME[org.tax_regime_id]] = turnover
+            if org.vat_payer:
+                forms["fno_300_00"] = round(turnover * 12 / 112, 2)
+            yield (org.id, year, 1, *forms.values())
+
+
+def _esf_amounts(rng, yearly: float, share: float) -> Tuple[float, float, int]:
+    """Оборот по ЭСФ, НДС и число ЭСФ за долю года share"""
+    total = round(yearly * share * rng.uniform(0.5, 1.5), 2)
+    # Средний ЭСФ - около 500 тыс. тенге
+    return total, round(total * 12 / 112, 2), max(int(total / 500_000), 1)
+
+
+def _esf(
+    seed: int,
+    organizations: List[PlacedOrganization],
+    scale: Scale,
+    last_day: date,
+    seller: bool,
+) -> Dict[str, Iterator[tuple]]:
+    """
+    ЭСФ плательщиков НДС: за год, за последний день и помесячно.
+    Реализация - от оборота организации, приобретение - 50-90% от него
+    """
+    stream = "esf_seller" if seller else "esf_buyer"
+    vat_payers = [org for org in organizations if org.vat_payer]
+    months = last_months(last_day, scale.esf_months)
+
+    def yearly(org: PlacedOrganization, rng) -> float:
+        return org.turnover if seller else org.turnover * rng.uniform(0.5, 0.9)
+
+    def columns(amounts: Tuple[float, float, int]) -> tuple:
+        return amounts if seller else amounts[:2]
+
+    def annual() -> Iterator[tuple]:
+        rng = rng_for(seed, f"{stream}:annual")
+        for org in vat_payers:
+            yield (org.id, *columns(_esf_amounts(rng, yearly(org, rng), 1)))
+
+    def daily() -> Iterator[tuple]:
+        rng = rng_for(seed, f"{stream}:daily")
+        for org in vat_payers:
+            yield (org.id, *columns(_esf_amounts(rng, yearly(org, rng), 1 / 365)))
+
+    def monthly() -> Iterator[tuple]:
+        rng = rng_for(seed, f"{stream}:month")
+        for org in vat_payers:
+            amount = yearly(org, rng)
+            for month in months:
+                yield (org.id, org.ugd_id, month, *columns(_esf_amounts(rng, amount, 1 / 12)))
+
+    return {"annual": annual(), "daily": daily(), "month": monthly()}
+
+
+AGGREGATE_DAILY_SQL = """
+INSERT INTO receipts_daily (kkms_id, check_sum, check_count, date_check)
+SELECT kkms_id, sum(full_item_price), count(*), operation_date::date
+FROM receipts
+GROUP BY kkms_id, operation_date::date
+"""
+
+AGGREGATE_ANNUAL_SQL = """
+INSERT INTO receipts_annual (kkms_id, check_sum, check_count, year)
+SELECT kkms_id, sum(full_item_price), count(*), extract(year FROM operation_date)::int
+FROM receipts
+GROUP BY kkms_id, extract(year FROM operation_date)
+"""
+
+AGGREGATE_MONTHLY_SQL = """
+INSERT INTO receipts_month (kkms_id, check_sum, check_count, month)
+SELECT kkms_id, round(sum(full_item_price))::int, count(*), date_trunc('month', operation_date)::date
+FROM receipts
+GROUP BY kkms_id, date_trunc('month', operation_date)
+"""
+
+
+async def load_ckf(
+    conn: AsyncConnection, seed: int, oblasts: List[Oblast], scale: Scale, last_day: date
+) -> None:
+    first_day = last_day - timedelta(days=scale.days - 1)
+
+    await copy_rows(
+        conn, RegTypes.__table__, ["id", "name"], enumerate(REG_TYPES, start=1)
+    )
+    await copy_rows(
+        conn, TaxRegimes.__table__, ["id", "name"], enumerate(TAX_REGIMES, start=1)
+    )
+
+    placed, rows = _organizations(seed, oblasts, scale, first_day)
+    await copy_rows(
+        conn,
+        Organizations.__table__,
+        [
+            "id",
+            "iin_bin",
+            "name_ru",
+            "ugd_id",
+            "reg_type_id",
+            "tax_regime_id",
+            "date_start",
+            "jur_fiz",
+            "address",
+            "region",
+            "shape",
+        ],
+        rows,
+    )
+
+    kkm_count = await copy_rows(
+        conn,
+        Kkms.__table__,
+        [
+            "id",
+            "organization_id",
+            "reg_number",
+            "serial_number",
+            "model_name",
+            "made_year",
+            "address",
+            "shape",
+        ],
+        _kkms(seed, placed, scale),
+    )
+
+    await copy_rows(
+        conn,
+        Receipts.__table__,
+        [
+            "id",
+            "kkms_id",
+            "operation_date",
+            "auto_fiskal_mark_check",
+            "fiskal_sign",
+            "item_name",
+            "item_price",
+            "item_count",
+            "item_nds",
+            "full_item_price",
+            "payment_type",
+        ],
+        _receipts(seed, kkm_count, scale, last_day),
+    )
+
+    await conn.execute(text(AGGREGATE_DAILY_SQL))
+    await conn.execute(text(AGGREGATE_MONTHLY_SQL))
+    await conn.execute(text(AGGREGATE_ANNUAL_SQL))
+
+    await copy_rows(
+        conn, FnoTypes.__table__, ["id", "name"], enumerate(FNO_TYPES, start=1)
+    )
+    await copy_rows(
+        conn,
+        Fno.__table__,
+        ["organization_id", "year", "type_id", *FNO_FORMS],
+        _fno(seed, placed, scale, last_day),
+    )
+
+    for seller, (annual, daily, month) in (
+        (True, (EsfSeller, EsfSellerDaily, EsfSellerMonth)),
+        (False, (EsfBuyer, EsfBuyerDaily, EsfBuyerMonth)),
+    ):
+        amounts = ["total_amount", "nds_amount"] + (["num_esf"] if seller else [])
+        rows = _esf(seed, placed, scale, last_day, seller)
+        await copy_rows(conn, annual.__table__, ["organization_id", *amounts], rows["annual"])
+        await copy_rows(conn, daily.__table__, ["organization_id", *amounts], rows["daily"])
+        await copy_rows(
+            conn,
+            month.__table__,
+            ["organization_id", "ugd_id", "month_year", *amounts],
+            rows["month"],
+        )
+
+    for table in (
+        RegTypes.__table__,
+        TaxRegimes.__table__,
+        Organizations.__table__,
+        Kkms.__table__,
+        Receipts.__table__,
+        FnoTypes.__table__,
+    ):
+        await reset_sequence(conn, table)
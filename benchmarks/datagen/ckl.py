@@ -0,0 +1,435 @@
+"""
+ЦКЛ: справочники, дороги между областями, транспортные компании и ТС,
+таможенные пункты на границе, камеры на дорогах, пересечения границы и
+события камер.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.modules.ckl.common.models import Countries
+from app.modules.ckl.customs.models import (
+    CustomsCrossings,
+    CustomsOfficeStatuses,
+    CustomsOfficeTypes,
+    CustomsOffices,
+)
+from app.modules.ckl.infra.models import CameraEvents, Cameras, Roads, RoadTypes
+from app.modules.ckl.transport.models import (
+    TransportCompanies,
+    VehicleMakes,
+    VehicleTypes,
+    Vehicles,
+)
+from .base import KZ_BOUNDS, copy_rows, ewkt_multilinestring, ewkt_point, reset_sequence, rng_for
+from .scale import Scale
+from .territory import Oblast
+
+COUNTRIES = [
+    ("KZ", "Казахстан", "Қазақстан"),
+    ("RU", "Россия", "Ресей"),
+    ("CN", "Китай", "Қытай"),
+    ("KG", "Кыргызстан", "Қырғызстан"),
+    ("UZ", "Узбекистан", "Өзбекстан"),
+]
+# Доли стран регистрации ТС и транспортных компаний
+COUNTRY_WEIGHTS = [60, 15, 10, 8, 7]
+ROAD_TYPES = [("Республиканская", "Республикалық"), ("Областная", "Облыстық")]
+VEHICLE_TYPES = [("Грузовой", "Жүк"), ("Легковой", "Жеңіл"), ("Автобус", "Автобус")]
+VEHICLE_TYPE_WEIGHTS = [60, 35, 5]
+VEHICLE_MAKES = ["KAMAZ", "VOLVO", "MAN", "SCANIA", "DAF", "HOWO", "TOYOTA", "HYUNDAI"]
+CUSTOMS_OFFICE_TYPES = [("Пункт пропуска", "Өткізу пункті"), ("Таможенный пост", "Кеден бекеті")]
+# Статус «Активный» ищет CustomsOfficesRepo.get_active_offices
+CUSTOMS_OFFICE_STATUSES = [("Активный", "Белсенді"), ("Закрыт", "Жабық")]
+PLATE_LETTERS = "ABCDEFHKMOPTXY"
+VIN_CHARS = "0123456789ABCDEFGHJKLMNPRSTUVWXYZ"
+VEHICLES_PER_COMPANY = 25
+
+Point = Tuple[float, float]
+
+
+@dataclass
+class PlacedRoad:
+    id: int
+    kato: int
+    points: List[Point]
+
+    def random_point(self, rng: random.Random) -> Point:
+        """Точка на случайном отрезке дороги"""
+        index = rng.randrange(len(self.points) - 1)
+        (x1, y1), (x2, y2) = self.points[index], self.points[index + 1]
+        t = rng.random()
+        return x1 + (x2 - x1) * t, y1 + (y2 - y1) * t
+
+
+@dataclass
+class PlacedCamera:
+    id: int
+    lon: float
+    lat: float
+    road_id: int
+
+
+def _dictionary(names: List[Tuple[str, str]]) -> Iterator[tuple]:
+    return ((index, name_ru, name_kk) for index, (name_ru, name_kk) in enumerate(names, start=1))
+
+
+def _roads(seed: int, oblasts: List[Oblast], scale: Scale) -> List[PlacedRoad]:
+    """Дорога - ломаная из 4-6 точек между двумя случайными областями"""
+    rng = rng_for(seed, "roads")
+    roads = []
+    for road_id in range(1, scale.roads + 1):
+        start, end = rng.sample(oblasts, 2)
+        (x1, y1), (x2, y2) = start.cell.random_point(rng), end.cell.random_point(rng)
+        vertices = rng.randint(4, 6)
+        points = [
+            (
+                x1 + (x2 - x1) * step / (vertices - 1) + rng.uniform(-0.3, 0.3),
+                y1 + (y2 - y1) * step / (vertices - 1) + rng.uniform(-0.3, 0.3),
+            )
+            for step in range(vertices)
+        ]
+        roads.append(PlacedRoad(road_id, start.kato, points))
+    return roads
+
+
+def _weighted_id(rng: random.Random, weights: List[int]) -> int:
+    return rng.choices(range(1, len(weights) + 1), weights)[0]
+
+
+def _skewed_id(rng: random.Random, count: int) -> int:
+    """id с перекосом к первым: малая часть ТС даёт большую часть проездов"""
+    return int(count * rng.random() ** 2) + 1
+
+
+def _transport_companies(seed: int, scale: Scale, companies: int) -> Iterator[tuple]:
+    rng = rng_for(seed, "transport_companies")
+    for company_id in range(1, companies + 1):
+        country_id = _weighted_id(rng, COUNTRY_WEIGHTS)
+        local = country_id == 1
+        yield (
+            company_id,
+            not local or rng.random() < 0.3,
+            f"{200_000_000_000 + company_id:012d}" if local else None,
+            rng.randint(1, scale.organizations) if local and scale.organizations else None,
+            f"Транспортная компания {company_id}",
+            country_id,
+            rng.random() < 0.95,
+        )
+
+
+def _plate(rng: random.Random, region: int) -> str:
+    letters = "".join(rng.choices(PLATE_LETTERS, k=3))
+    return f"{rng.randint(0, 999):03d}{letters}{region:02d}"
+
+
+def _vehicles(
+    seed: int, scale: Scale, roads: List[PlacedRoad], companies: int, first_day: date
+) -> Iterator[tuple]:
+    rng = rng_for(seed, "vehicles")
+    for vehicle_id in range(1, scale.vehicles + 1):
+        road = rng.choice(roads)
+        lon, lat = road.random_point(rng)
+        yield (
+            vehicle_id,
+            _plate(rng, road.kato // 10_000_000),
+            _weighted_id(rng, VEHICLE_TYPE_WEIGHTS),
+            rng.randint(1, len(VEHICLE_MAKES)),
+            ewkt_point(lon, lat),
+            str(road.kato),
+            road.id,
+            rng.randint(2000, first_day.year),
+            "".join(rng.choices(VIN_CHARS, k=17)),
+            rng.randint(1, companies),
+            _weighted_id(rng, COUNTRY_WEIGHTS),
+            first_day - timedelta(days=rng.randint(0, 3650)),
+            rng.random() < 0.97,
+            rng.random() < 0.2,
+        )
+
+
+def _border_point(rng: random.Random, oblasts: List[Oblast]) -> Tuple[Oblast, Point]:
+    """Точка на внешней границе одной из приграничных областей"""
+    minx, miny, maxx, maxy = KZ_BOUNDS
+    side = rng.choice(("west", "east", "south", "north"))
+    edge = {
+        "west": lambda cell: math.isclose(cell.minx, minx),
+        "east": lambda cell: math.isclose(cell.maxx, maxx),
+        "south": lambda cell: math.isclose(cell.miny, miny),
+        "north": lambda cell: math.isclose(cell.maxy, maxy),
+    }[side]
+    oblast = rng.choice([o for o in oblasts if edge(o.cell)])
+    cell = oblast.cell
+    if side in ("west", "east"):
+        return oblast, (minx if side == "west" else maxx, rng.uniform(cell.miny, cell.maxy))
+    return oblast, (rng.uniform(cell.minx, cell.maxx), miny if side == "south" else maxy)
+
+
+def _customs_offices(
+    seed: int, oblasts: List[Oblast], scale: Scale, roads: List[PlacedRoad]
+) -> Iterator[tuple]:
+    rng = rng_for(seed, "customs_offices")
+    for office_id in range(1, scale.customs_offices + 1):
+        oblast, (lon, lat) = _border_point(rng, oblasts)
+        yield (
+            office_id,
+            f"{office_id:05d}",
+            f"Пункт пропуска {office_id}",
+            f"Өткізу пункті {office_id}",
+            str(oblast.kato),
+            1 if rng.random() < 0.8 else 2,
+            rng.choice(roads).id,
+            f"Область {oblast.id}, граница",
+            f"RCA{office_id:06d}",
+            True,
+            1 if rng.random() < 0.9 else 2,
+            ewkt_point(lon, lat),
+        )
+
+
+def _cameras(
+    seed: int, scale: Scale, roads: List[PlacedRoad], first_day: date
+) -> Tuple[List[PlacedCamera], List[tuple]]:
+    rng = rng_for(seed, "cameras")
+    placed = []
+    rows = []
+    for camera_id in range(1, scale.cameras + 1):
+        road = rng.choice(roads)
+        lon, lat = road.random_point(rng)
+        placed.append(PlacedCamera(camera_id, lon, lat, road.id))
+        rows.append(
+            (
+                camera_id,
+                f"CAM{camera_id:06d}",
+                f"Камера {camera_id}",
+                f"Камера {camera_id}",
+                # В модели shape камеры - целое число, не геометрия
+                0,
+                f"Дорога {road.id}, {lon:.4f} {lat:.4f}",
+                rng.random() < 0.95,
+                first_day - timedelta(days=rng.randint(0, 1800)),
+                road.id,
+            )
+        )
+    return placed, rows
+
+
+def _random_moment(rng: random.Random, last_day: date, days: int) -> datetime:
+    day = last_day - timedelta(days=rng.randrange(days))
+    return datetime.combine(day, time()) + timedelta(seconds=rng.randrange(86400))
+
+
+def _crossings(seed: int, scale: Scale, last_day: date) -> Iterator[tuple]:
+    rng = rng_for(seed, "customs_crossings")
+    for _ in range(scale.crossings):
+        moment = _random_moment(rng, last_day, scale.days)
+        inspection_required = rng.random() < 0.1
+        # Очередь до пункта и время оформления
+        queued = moment - timedelta(minutes=rng.randint(5, 600))
+        processed = moment + timedelta(minutes=rng.randint(5, 240 if inspection_required else 60))
+        yield (
+            rng.randint(1, scale.customs_offices),
+            _skewed_id(rng, scale.vehicles),
+            rng.random() < 0.5,
+            moment,
+            inspection_required,
+            inspection_required and rng.random() < 0.8,
+            queued,
+            processed,
+            "Досмотр назначен" if inspection_required else "Без замечаний",
+        )
+
+
+def _camera_events(
+    seed: int, scale: Scale, cameras: List[PlacedCamera], last_day: date
+) -> Iterator[tuple]:
+    rng = rng_for(seed, "camera_events")
+    for _ in range(scale.camera_events):
+        camera = rng.choice(cameras)
+        recognized = rng.random() < 0.95
+        yield (
+            _skewed_id(rng, scale.vehicles) if recognized else None,
+            camera.id,
+            _random_moment(rng, last_day, scale.days),
+            # В модели shape события - целое число, не геометрия
+            0,
+            f"Дорога {camera.road_id}",
+            round(max(rng.gauss(80, 15), 5), 1),
+            recognized,
+        )
+
+
+async def load_ckl(
+    conn: AsyncConnection, seed: int, oblasts: List[Oblast], scale: Scale, last_day: date
+) -> None:
+    if not scale.roads:
+        return
+    first_day = last_day - timedelta(days=scale.days - 1)
+
+    await copy_rows(
+        conn,
+        Countries.__table__,
+        ["id", "code", "name_ru", "name_kk"],
+        ((index, *country) for index, country in enumerate(COUNTRIES, start=1)),
+    )
+    await copy_rows(
+        conn, RoadTypes.__table__, ["id", "name_ru", "name_kk"], _dictionary(ROAD_TYPES)
+    )
+    await copy_rows(
+        conn, VehicleTypes.__table__, ["id", "name_ru", "name_kk"], _dictionary(VEHICLE_TYPES)
+    )
+    await copy_rows(
+        conn,
+        VehicleMakes.__table__,
+        ["id", "code", "name_ru", "name_kk"],
+        ((index, make, make, make) for index, make in enumerate(VEHICLE_MAKES, start=1)),
+    )
+    await copy_rows(
+        conn,
+        CustomsOfficeTypes.__table__,
+        ["id", "name_ru", "name_kk"],
+        _dictionary(CUSTOMS_OFFICE_TYPES),
+    )
+    await copy_rows(
+        conn,
+        CustomsOfficeStatuses.__table__,
+        ["id", "name_ru", "name_kk"],
+        _dictionary(CUSTOMS_OFFICE_STATUSES),
+    )
+
+    roads = _roads(seed, oblasts, scale)
+    await copy_rows(
+        conn,
+        Roads.__table__,
+        ["id", "code", "name", "kato_code", "type_id", "shape"],
+        (
+            (
+                road.id,
+                f"R-{road.id}",
+                f"Дорога {road.id}",
+                str(road.kato),
+                1 if road.id % 3 == 0 else 2,
+                ewkt_multilinestring(road.points),
+            )
+            for road in roads
+        ),
+    )
+
+    companies = max(scale.vehicles // VEHICLES_PER_COMPANY, 1)
+    await copy_rows(
+        conn,
+        TransportCompanies.__table__,
+        ["id", "is_international", "bin", "organization_id", "name", "country_id", "is_active"],
+        _transport_companies(seed, scale, companies),
+    )
+    await copy_rows(
+        conn,
+        Vehicles.__table__,
+        [
+            "id",
+            "number",
+            "type_id",
+            "make_id",
+            "shape",
+            "kato_code",
+            "road_id",
+            "year",
+            "vin_number",
+            "transport_company_id",
+            "country_id",
+            "registration_date",
+            "is_active",
+            "has_customs_booking",
+        ],
+        _vehicles(seed, scale, roads, companies, first_day),
+    )
+    await copy_rows(
+        conn,
+        CustomsOffices.__table__,
+        [
+            "id",
+            "code",
+            "name_ru",
+            "name_kk",
+            "kato_code",
+            "type_id",
+            "road_id",
+            "address",
+            "rca_code",
+            "is_border_point",
+            "status_id",
+            "shape",
+        ],
+        _customs_offices(seed, oblasts, scale, roads),
+    )
+
+    cameras, rows = _cameras(seed, scale, roads, first_day)
+    await copy_rows(
+        conn,
+        Cameras.__table__,
+        [
+            "id",
+            "code",
+            "name_ru",
+            "name_kk",
+            "shape",
+            "address",
+            "is_active",
+            "installation_date",
+            "roads_id",
+        ],
+        rows,
+    )
+
+    if scale.vehicles and scale.customs_offices:
+        await copy_rows(
+            conn,
+            CustomsCrossings.__table__,
+            [
+                "customs_offices_id",
+                "vehicle_id",
+                "is_entry",
+                "timestamp",
+                "is_inspection_required",
+                "is_inspected",
+                "entry_timestamp",
+                "exit_timestamp",
+                "comments",
+            ],
+            _crossings(seed, scale, last_day),
+        )
+    if scale.vehicles and cameras:
+        await copy_rows(
+            conn,
+            CameraEvents.__table__,
+            [
+                "vehicle_id",
+                "camera_id",
+                "event_timestamp",
+                "shape",
+                "address",
+                "speed",
+                "is_recognized",
+            ],
+            _camera_events(seed, scale, cameras, last_day),
+        )
+
+    for table in (
+        Countries.__table__,
+        RoadTypes.__table__,
+        VehicleTypes.__table__,
+        VehicleMakes.__table__,
+        CustomsOfficeTypes.__table__,
+        CustomsOfficeStatuses.__table__,
+        Roads.__table__,
+        TransportCompanies.__table__,
+        Vehicles.__table__,
+        CustomsOffices.__table__,
+        Cameras.__table__,
+    ):
+        await reset_sequence(conn, table)
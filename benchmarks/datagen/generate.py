@@ -0,0 +1,165 @@
+"""
+Заполнение БД стенда синтетическими данными.
+
+Запуск (переменные POSTGRES_* - БД стенда, см. benchmarks/docker-compose.bench.yml):
+
+    python -m benchmarks.datagen.generate --reset
+    python -m benchmarks.datagen.generate --reset --profile large --seed 7
+    python -m benchmarks.datagen.generate --reset --profile small --stations 0
+
+Объём задаётся профилем (benchmarks/datagen/scale.py), отдельные значения
+переопределяются одноимёнными аргументами. Данные детерминированы: один и тот
+же seed и профиль дают те же строки (даты отсчитываются от сегодняшнего дня).
+
+--reset очищает таблицы генератора перед загрузкой; без него загрузка в
+непустые таблицы завершится ошибкой уникальности.
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import fields, replace
+from datetime import date, timedelta
+
+from loguru import logger
+
+from app.database.database import async_session_maker, engine
+from app.modules.admins.models import DicUl, Employees
+from app.modules.ckf.models import (
+    EsfBuyer,
+    EsfBuyerDaily,
+    EsfBuyerMonth,
+    EsfSeller,
+    EsfSellerDaily,
+    EsfSellerMonth,
+    Fno,
+    FnoTypes,
+    Kkms,
+    Organizations,
+    Receipts,
+    ReceiptsAnnual,
+    ReceiptsDaily,
+    ReceiptsMonthly,
+)
+from app.modules.ckf.rollups import refresh_rollups
+from app.modules.ckl.common.models import Countries
+from app.modules.ckl.customs.models import (
+    CustomsCrossings,
+    CustomsOfficeStatuses,
+    CustomsOfficeTypes,
+    CustomsOffices,
+)
+from app.modules.ckl.infra.models import CameraEvents, Cameras, Roads, RoadTypes
+from app.modules.ckl.transport.models import (
+    TransportCompanies,
+    VehicleMakes,
+    VehicleTypes,
+    Vehicles,
+)
+from app.modules.ext.kazgeodesy.models import KazgeodesyRkOblasti, KazgeodesyRkRaiony
+from app.modules.ext.mobile_data.models import (
+    KaztelecomHour,
+    KaztelecomMobileData,
+    KaztelecomStationsGeo,
+)
+from app.modules.nsi.models import RegTypes, TaxRegimes, Ugds
+from .base import ensure_seed_partitions, prepare_schema, truncate
+from .ckf import load_ckf
+from .ckl import load_ckl
+from .mobile import load_mobile
+from .scale import PROFILES, Scale
+from .territory import build_territory, load_territory
+
+GENERATED_TABLES = [
+    CameraEvents.__table__,
+    CustomsCrossings.__table__,
+    Cameras.__table__,
+    CustomsOffices.__table__,
+    CustomsOfficeStatuses.__table__,
+    CustomsOfficeTypes.__table__,
+    Vehicles.__table__,
+    TransportCompanies.__table__,
+    VehicleMakes.__table__,
+    VehicleTypes.__table__,
+    Roads.__table__,
+    RoadTypes.__table__,
+    Countries.__table__,
+    KaztelecomMobileData.__table__,
+    KaztelecomStationsGeo.__table__,
+    KaztelecomHour.__table__,
+    EsfBuyerMonth.__table__,
+    EsfBuyerDaily.__table__,
+    EsfBuyer.__table__,
+    EsfSellerMonth.__table__,
+    EsfSellerDaily.__table__,
+    EsfSeller.__table__,
+    Fno.__table__,
+    FnoTypes.__table__,
+    Receipts.__table__,
+    ReceiptsDaily.__table__,
+    ReceiptsMonthly.__table__,
+    ReceiptsAnnual.__table__,
+    Kkms.__table__,
+    Organizations.__table__,
+    RegTypes.__table__,
+    TaxRegimes.__table__,
+    Employees.__table__,
+    DicUl.__table__,
+    Ugds.__table__,
+    KazgeodesyRkRaiony.__table__,
+    KazgeodesyRkOblasti.__table__,
+]
+
+
+async def main(seed: int, scale: Scale, reset: bool) -> None:
+    started = time.perf_counter()
+    last_day = date.today()
+    oblasts = build_territory()
+    logger.info(f"Генерация данных: seed={seed}, {scale}")
+
+    await prepare_schema(engine)
+
+    async with engine.begin() as conn:
+        if reset:
+            await truncate(conn, GENERATED_TABLES)
+        await ensure_seed_partitions(
+            conn, last_day - timedelta(days=max(scale.days, scale.mobile_days) - 1), last_day
+        )
+        await load_territory(conn, oblasts)
+        await load_ckf(conn, seed, oblasts, scale, last_day)
+        await load_mobile(conn, seed, oblasts, scale, last_day)
+        await load_ckl(conn, seed, oblasts, scale, last_day)
+
+    # Агрегаты по чекам (rollup) и витрина последних чеков - как после ночной загрузки
+    async with async_session_maker() as session:
+        async with session.begin():
+            await refresh_rollups(session)
+
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in GENERATED_TABLES:
+            await conn.exec_driver_sql(f'ANALYZE "{table.schema or "public"}"."{table.name}"')
+
+    logger.info(f"Данные сгенерированы за {time.perf_counter() - started:.1f} с")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Синтетические данные для нагрузочных прогонов")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--profile", choices=PROFILES, default="medium", help="Профиль объёма данных")
+    for field in fields(Scale):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=int,
+            help=f"Переопределяет {field.name} профиля",
+        )
+    parser.add_argument("--reset", action="store_true", help="Очистить таблицы перед загрузкой")
+    args = parser.parse_args()
+
+    overrides = {
+        field.name: getattr(args, field.name)
+        for field in fields(Scale)
+        if getattr(args, field.name) is not None
+    }
+    asyncio.run(main(args.seed, replace(PROFILES[args.profile], **overrides), args.reset))
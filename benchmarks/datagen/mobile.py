@@ -0,0 +1,145 @@
+"""
+Казтелеком: справочник часов, станции (квадраты внутри районов) и почасовые
+мобильные данные по станциям.
+"""
+
+import math
+from datetime import date, timedelta
+from typing import Iterator, List
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.modules.ext.mobile_data.models import (
+    KaztelecomHour,
+    KaztelecomMobileData,
+    KaztelecomStationsGeo,
+)
+from .base import Cell, copy_rows, reset_sequence, rng_for
+from .scale import Scale
+from .territory import Oblast, all_raions
+
+AGE_GROUPS = 6
+INCOME_GROUPS = 4
+GENDERS = 2
+
+
+def _hour_share(hour: int) -> float:
+    """Суточный профиль присутствия: минимум около 4 утра, пик около 16 часов"""
+    return 0.15 + 0.85 * math.sin(math.pi * (hour - 4) / 24) ** 2
+
+
+def _stations(seed: int, oblasts: List[Oblast], scale: Scale) -> Iterator[tuple]:
+    rng = rng_for(seed, "stations")
+    raions = all_raions(oblasts)
+    for station_id in range(1, scale.stations + 1):
+        raion = rng.choice(raions)
+        size = rng.uniform(0.01, 0.05)
+        minx, miny, maxx, maxy = raion.cell.random_bbox(rng, size)
+        cell = Cell(minx, miny, maxx, maxy)
+        yield (
+            station_id,
+            round(math.hypot(maxx - minx, maxy - miny), 3),
+            round(miny, 3),
+            round(minx, 3),
+            round(miny, 3),
+            round(maxx, 3),
+            round(maxy, 3),
+            round(maxx, 3),
+            round(maxy, 3),
+            round(minx, 3),
+            round((miny + maxy) / 2, 3),
+            round((minx + maxx) / 2, 3),
+            f"SRID=4326;{cell.wkt}",
+            f"Область {raion.oblast_id}",
+            f"Город {raion.id}",
+            f"Район {raion.id}",
+            raion.oblast_id,
+            raion.id,
+            int(rng.random() < 0.05),
+        )
+
+
+def _mobile_data(seed: int, scale: Scale, last_day: date) -> Iterator[tuple]:
+    """
+    stations x mobile_days x 24 x mobile_rows_per_hour строк: по каждой станции
+    и часу - несколько демографических срезов
+    """
+    rng = rng_for(seed, "mobile_data")
+    days = [last_day - timedelta(days=offset) for offset in range(scale.mobile_days)][::-1]
+    for day in days:
+        for station_id in range(1, scale.stations + 1):
+            for hour_id in range(1, 25):
+                share = _hour_share(hour_id - 1)
+                for _ in range(scale.mobile_rows_per_hour):
+                    qnt_max = max(int(rng.expovariate(1 / 200) * share), 1)
+                    yield (
+                        day,
+                        hour_id,
+                        station_id,
+                        rng.randint(1, AGE_GROUPS),
+                        rng.randint(1, INCOME_GROUPS),
+                        rng.randint(1, GENDERS),
+                        rng.randint(1, scale.stations),
+                        rng.randint(1, scale.stations),
+                        qnt_max,
+                        int(qnt_max * rng.uniform(0.5, 1.0)),
+                        int(qnt_max * rng.uniform(0.1, 0.5)),
+                    )
+
+
+async def load_mobile(
+    conn: AsyncConnection, seed: int, oblasts: List[Oblast], scale: Scale, last_day: date
+) -> None:
+    await copy_rows(
+        conn,
+        KaztelecomHour.__table__,
+        ["id", "hourly_cut"],
+        ((hour + 1, f"{hour:02d}:00-{hour + 1:02d}:00") for hour in range(24)),
+    )
+    await copy_rows(
+        conn,
+        KaztelecomStationsGeo.__table__,
+        [
+            "id",
+            "diag_size",
+            "lat_bot_left",
+            "long_bot_left",
+            "lat_bot_right",
+            "long_bot_right",
+            "lat_top_right",
+            "long_top_right",
+            "lat_top_left",
+            "long_top_left",
+            "lat_center",
+            "long_center",
+            "polygon_wkt",
+            "region",
+            "city",
+            "district",
+            "oblast_id",
+            "raion_id",
+            "in_special_zone",
+        ],
+        _stations(seed, oblasts, scale),
+    )
+    await copy_rows(
+        conn,
+        KaztelecomMobileData.__table__,
+        [
+            "date",
+            "hour_id",
+            "zid_id",
+            "age_id",
+            "income_id",
+            "gender_id",
+            "zid_home",
+            "zid_work",
+            "qnt_max",
+            "qnt_traf",
+            "qnt_out",
+        ],
+        _mobile_data(seed, scale, last_day),
+    )
+
+    for table in (KaztelecomHour.__table__, KaztelecomStationsGeo.__table__):
+        await reset_sequence(conn, table)
@@ -0,0 +1,93 @@
+"""
+Объём генерируемых данных: профили и их переопределение из командной строки.
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class Scale:
+    # ЦКФ
+    organizations: int
+    kkms_per_organization: int
+    receipts_per_kkm: int
+    # Период чеков, камер и пересечений границы до сегодняшнего дня, дни
+    days: int
+    fno_years: int
+    esf_months: int
+    # Казтелеком: станции, дни почасовых данных и строк на станцию в час
+    # (демографические срезы)
+    stations: int
+    mobile_days: int
+    mobile_rows_per_hour: int
+    # ЦКЛ
+    roads: int
+    customs_offices: int
+    cameras: int
+    vehicles: int
+    crossings: int
+    camera_events: int
+
+    @property
+    def kkms(self) -> int:
+        return self.organizations * self.kkms_per_organization
+
+
+PROFILES: Dict[str, Scale] = {
+    # Быстрая проверка генератора и сценариев
+    "small": Scale(
+        organizations=1000,
+        kkms_per_organization=2,
+        receipts_per_kkm=20,
+        days=90,
+        fno_years=2,
+        esf_months=6,
+        stations=200,
+        mobile_days=7,
+        mobile_rows_per_hour=2,
+        roads=20,
+        customs_offices=10,
+        cameras=100,
+        vehicles=1000,
+        crossings=5000,
+        camera_events=20000,
+    ),
+    # Нагрузочные прогоны по умолчанию (benchmarks/loadtest.py)
+    "medium": Scale(
+        organizations=10000,
+        kkms_per_organization=2,
+        receipts_per_kkm=20,
+        days=365,
+        fno_years=3,
+        esf_months=12,
+        stations=2000,
+        mobile_days=30,
+        mobile_rows_per_hour=2,
+        roads=60,
+        customs_offices=30,
+        cameras=500,
+        vehicles=10000,
+        crossings=50000,
+        camera_events=200000,
+    ),
+    # Порядок объёмов продуктивной БД: десятки миллионов строк в чеках и
+    # мобильных данных, генерация занимает часы
+    "large": Scale(
+        organizations=100000,
+        kkms_per_organization=3,
+        receipts_per_kkm=100,
+        days=365,
+        fno_years=3,
+        esf_months=24,
+        stations=10000,
+        mobile_days=90,
+        mobile_rows_per_hour=4,
+        roads=200,
+        customs_offices=60,
+        cameras=3000,
+        vehicles=100000,
+        crossings=1000000,
+        camera_events=5000000,
+    ),
+}
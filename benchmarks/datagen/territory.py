@@ -0,0 +1,136 @@
+"""
+Территории: области и районы (ext.KAZGEODESY_*), УГД, территориальные
+подразделения (admin.dic_ul) и сотрудники для сценариев авторизации.
+
+Области - ячейки сетки внутри границ Казахстана, районы - ячейки сетки области.
+Сетка не зависит от seed: нагрузочный прогон строит те же ячейки и выбирает
+окна карты и территории фильтров внутри них.
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.modules.admins.models import DicUl, Employees
+from app.modules.auth.utils import get_password_hash
+from app.modules.ext.kazgeodesy.models import KazgeodesyRkOblasti, KazgeodesyRkRaiony
+from app.modules.nsi.models import Ugds
+from .base import KZ_BOUNDS, Cell, copy_rows, reset_sequence
+
+OBLAST_GRID = (5, 4)
+RAION_GRID = (3, 3)
+
+# Сотрудники нагрузочных сценариев: республиканский (роль 3) и по одному на
+# область. Пароль общий
+BENCH_PASSWORD = "bench"
+REPUBLIC_LOGIN = "bench_rk"
+ADMIN_ROLE = 3
+EMPLOYEE_ROLE = 1
+
+
+def oblast_login(oblast_id: int) -> str:
+    return f"bench_oblast_{oblast_id}"
+
+
+@dataclass(frozen=True)
+class Raion:
+    id: int
+    oblast_id: int
+    cell: Cell
+
+
+@dataclass(frozen=True)
+class Oblast:
+    id: int
+    cell: Cell
+    raions: List[Raion]
+
+    @property
+    def kato(self) -> int:
+        return self.id * 10_000_000
+
+
+def build_territory() -> List[Oblast]:
+    oblasts = []
+    raion_id = 1
+    for oblast_id, cell in enumerate(Cell(*KZ_BOUNDS).split(*OBLAST_GRID), start=1):
+        raions = []
+        for raion_cell in cell.split(*RAION_GRID):
+            raions.append(Raion(id=raion_id, oblast_id=oblast_id, cell=raion_cell))
+            raion_id += 1
+        oblasts.append(Oblast(id=oblast_id, cell=cell, raions=raions))
+    return oblasts
+
+
+def all_raions(oblasts: List[Oblast]) -> List[Raion]:
+    return [raion for oblast in oblasts for raion in oblast.raions]
+
+
+async def load_territory(conn: AsyncConnection, oblasts: List[Oblast]) -> None:
+    await copy_rows(
+        conn,
+        KazgeodesyRkOblasti.__table__,
+        ["id", "type", "name_ru", "kato", "parentkato", "geom"],
+        (
+            (o.id, 1, f"Область {o.id}", o.kato, None, o.cell.ewkt_multipolygon)
+            for o in oblasts
+        ),
+    )
+    await copy_rows(
+        conn,
+        KazgeodesyRkRaiony.__table__,
+        ["id", "parent_id", "type", "name_ru", "kato", "parentkato", "geom"],
+        (
+            (
+                r.id,
+                o.id,
+                2,
+                f"Район {r.id}",
+                o.kato + index * 100_000,
+                o.kato,
+                r.cell.ewkt_multipolygon,
+            )
+            for o in oblasts
+            for index, r in enumerate(o.raions, start=1)
+        ),
+    )
+    await copy_rows(
+        conn,
+        Ugds.__table__,
+        ["id", "code", "name", "kato", "oblast_id"],
+        ((o.id, f"{o.id:02d}00", f"УГД по области {o.id}", str(o.kato), o.id) for o in oblasts),
+    )
+
+    # dic_ul: 1 - республиканское подразделение, далее по одному на область
+    await copy_rows(
+        conn,
+        DicUl.__table__,
+        ["id", "shortname", "name", "oblast_id", "deleted", "blocked"],
+        [(1, "КГД", "Комитет государственных доходов", None, False, False)]
+        + [
+            (o.id + 1, f"ДГД {o.id}", f"ДГД по области {o.id}", o.id, False, False)
+            for o in oblasts
+        ],
+    )
+
+    password = get_password_hash(BENCH_PASSWORD)
+    await copy_rows(
+        conn,
+        Employees.__table__,
+        ["id", "ul_id", "role", "login", "password", "deleted", "blocked"],
+        [(1, 1, ADMIN_ROLE, REPUBLIC_LOGIN, password, False, False)]
+        + [
+            (o.id + 1, o.id + 1, EMPLOYEE_ROLE, oblast_login(o.id), password, False, False)
+            for o in oblasts
+        ],
+    )
+
+    for table in (
+        KazgeodesyRkOblasti.__table__,
+        KazgeodesyRkRaiony.__table__,
+        Ugds.__table__,
+        DicUl.__table__,
+        Employees.__table__,
+    ):
+        await reset_sequence(conn, table)
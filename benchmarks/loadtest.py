@@ -0,0 +1,202 @@
+"""
+Нагрузочный прогон API: виртуальные пользователи в замкнутом цикле выполняют
+сценарии (benchmarks/scenarios.py) с заданными весами. После прогрева
+считаются p50/p95/p99, максимум, пропускная способность и ошибки по каждому
+запросу.
+
+Запуск против стенда (benchmarks/docker-compose.bench.yml):
+
+    python -m benchmarks.loadtest --users 20 --duration 60
+    python -m benchmarks.loadtest --scenarios map,receipts --output results.json
+    python -m benchmarks.loadtest --baseline baseline.json --max-regression 0.2
+
+С --baseline прогон завершается с кодом 1, если p95 или p99 какого-либо
+запроса хуже базового больше чем на --max-regression (доля).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+from .datagen.scale import PROFILES
+from .scenarios import SCENARIOS, Recorder, UserSession, build_context
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Процентиль по ближайшему рангу, values отсортированы"""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, Dict[str, Any]]:
+    report = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        latencies = sorted(latencies)
+        stats = {
+            "count": len(latencies),
+            "errors": recorder.errors.get(name, 0),
+            "rps": round(len(latencies) / duration, 2),
+            "max_ms": round(latencies[-1] * 1000, 1),
+        }
+        for q in PERCENTILES:
+            stats[f"p{q}_ms"] = round(percentile(latencies, q) * 1000, 1)
+        report[name] = stats
+    return report
+
+
+def compare(
+    report: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    max_regression: float,
+) -> List[str]:
+    regressions = []
+    for name, stats in report.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if base.get(key) and stats[key] > base[key] * (1 + max_regression):
+                regressions.append(
+                    f"{name}: {key} {stats[key]} мс, базовое {base[key]} мс"
+                )
+    return regressions
+
+
+def print_report(report: Dict[str, Dict[str, Any]], duration: float) -> None:
+    header = f"{'запрос':<42} {'n':>7} {'ош.':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print("-" * len(header))
+    total = 0
+    for name, stats in report.items():
+        total += stats["count"]
+        print(
+            f"{name:<42} {stats['count']:>7} {stats['errors']:>5} {stats['rps']:>8} "
+            f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}"
+        )
+    print("-" * len(header))
+    print(f"Всего {total} запросов за {duration:.0f} с, {total / duration:.1f} rps (время в мс)")
+
+
+async def _user_loop(
+    user: UserSession, scenarios, weights, deadline: float, think_time: float
+) -> None:
+    while time.monotonic() < deadline:
+        scenario = user.rng.choices(scenarios, weights)[0]
+        await scenario.run(user)
+        if think_time:
+            await asyncio.sleep(user.rng.expovariate(1 / think_time))
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    context = build_context(args.organizations, args.kkms_per_organization, args.no_cache)
+    scenarios = [SCENARIOS[name] for name in args.scenarios]
+    weights = [scenario.weight for scenario in scenarios]
+    recorder = Recorder()
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=args.timeout,
+        limits=httpx.Limits(max_connections=args.users),
+    ) as client:
+        deadline = time.monotonic() + args.warmup + args.duration
+        users = [
+            asyncio.create_task(
+                _user_loop(
+                    UserSession(client, recorder, context, random.Random(f"{args.seed}:{index}")),
+                    scenarios,
+                    weights,
+                    deadline,
+                    args.think_time,
+                )
+            )
+            for index in range(args.users)
+        ]
+
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        started = time.monotonic()
+        await asyncio.gather(*users)
+        duration = time.monotonic() - started
+
+    return {
+        "params": {
+            "users": args.users,
+            "duration": args.duration,
+            "scenarios": args.scenarios,
+            "no_cache": args.no_cache,
+        },
+        "duration": round(duration, 1),
+        "requests": summarize(recorder, duration),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон API")
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--users", type=int, default=20, help="Виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=60, help="Длительность замера, с")
+    parser.add_argument("--warmup", type=float, default=10, help="Прогрев без замера, с")
+    parser.add_argument("--think-time", type=float, default=0, help="Средняя пауза между итерациями, с")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+        help=f"Через запятую: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Cache-Control: no-cache - замер без кэша ответов API",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    # Объём данных генератора (benchmarks/datagen/generate.py)
+    parser.add_argument("--profile", choices=PROFILES, default="medium", help="Профиль генератора")
+    parser.add_argument("--organizations", type=int, help="Переопределяет значение профиля")
+    parser.add_argument("--kkms-per-organization", type=int, help="Переопределяет значение профиля")
+    parser.add_argument("--output", type=Path, help="Результат в JSON")
+    parser.add_argument("--baseline", type=Path, help="Базовый результат в JSON для сравнения")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Неизвестные сценарии: {', '.join(unknown)}")
+
+    profile = PROFILES[args.profile]
+    if args.organizations is None:
+        args.organizations = profile.organizations
+    if args.kkms_per_organization is None:
+        args.kkms_per_organization = profile.kkms_per_organization
+
+    result = asyncio.run(run(args))
+    print_report(result["requests"], result["duration"])
+
+    if args.output:
+        args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["requests"]
+        regressions = compare(result["requests"], baseline, args.max_regression)
+        for line in regressions:
+            print(f"Регрессия: {line}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Валидация DTO из ORM-объектов (from_attributes) и сериализация в JSON -
+то, что FastAPI делает с каждой страницей ответа
+"""
+
+from app.modules.ckf.dtos import (
+    KkmsDto,
+    OrganizationBboxDto,
+    OrganizationDto,
+    ReceiptDetailDto,
+)
+
+
+def bench_organization_validate(benchmark, organizations):
+    result = benchmark(lambda: [OrganizationDto.model_validate(org) for org in organizations])
+    assert len(result) == len(organizations)
+
+
+def bench_organization_validate_dump(benchmark, organizations):
+    benchmark(
+        lambda: [OrganizationDto.model_validate(org).model_dump(mode="json") for org in organizations]
+    )
+
+
+def bench_kkms_validate(benchmark, kkms):
+    result = benchmark(lambda: [KkmsDto.model_validate(kkm) for kkm in kkms])
+    assert len(result) == len(kkms)
+
+
+def bench_kkms_validate_dump(benchmark, kkms):
+    benchmark(lambda: [KkmsDto.model_validate(kkm).model_dump(mode="json") for kkm in kkms])
+
+
+def bench_receipt_detail_validate(benchmark, receipt_details):
+    result = benchmark(
+        lambda: [ReceiptDetailDto.model_validate(receipt) for receipt in receipt_details]
+    )
+    assert len(result) == len(receipt_details)
+
+
+def bench_receipt_detail_validate_rows(benchmark, receipt_rows):
+    """Строки живой ленты чеков - словари, а не ORM-объекты"""
+    benchmark(lambda: [ReceiptDetailDto.model_validate(row) for row in receipt_rows])
+
+
+def bench_receipt_detail_validate_dump(benchmark, receipt_details):
+    benchmark(
+        lambda: [
+            ReceiptDetailDto.model_validate(receipt).model_dump(mode="json")
+            for receipt in receipt_details
+        ]
+    )
+
+
+def _bbox(organizations):
+    # Как в /organizations/bbox: DTO собирается из атрибутов организации
+    return [
+        OrganizationBboxDto(
+            id=org.id,
+            iin_bin=org.iin_bin,
+            name_ru=org.name_ru,
+            address=org.address,
+            shape=org.shape,
+            risks=[],
+        )
+        for org in organizations
+    ]
+
+
+def bench_organization_bbox_build(benchmark, organizations):
+    result = benchmark(_bbox, organizations)
+    assert len(result) == len(organizations)
+
+
+def bench_organization_bbox_build_dump(benchmark, organizations):
+    benchmark(lambda: [dto.model_dump(mode="json") for dto in _bbox(organizations)])
@@ -0,0 +1,62 @@
+"""
+DataEncryption: расшифровка персональных данных при выдаче ответов
+"""
+
+import base64
+
+from app.modules.common.encryption import data_encryption
+
+from conftest import PAGE_SIZE
+
+NAMES = [f"Иванов Иван Иванович {index}" for index in range(PAGE_SIZE)]
+
+
+def _encrypted():
+    return [data_encryption.encrypt(name) for name in NAMES]
+
+
+def bench_decrypt_cached(benchmark):
+    """Повторные значения - из lru_cache"""
+    values = _encrypted()
+    result = benchmark(lambda: [data_encryption.decrypt(value) for value in values])
+    assert result == NAMES
+
+
+def bench_decrypt_uncached(benchmark):
+    """Первое обращение к значению: проверка HMAC и AES"""
+    values = _encrypted()
+    result = benchmark.pedantic(
+        lambda: [data_encryption.decrypt(value) for value in values],
+        setup=data_encryption._decrypt_cached.cache_clear,
+        rounds=50,
+    )
+    assert result == NAMES
+
+
+def bench_decrypt_legacy_uncached(benchmark):
+    """Старый формат: base64 поверх токена Fernet"""
+    values = [
+        base64.urlsafe_b64encode(value[len(data_encryption.PREFIX) :].encode()).decode()
+        for value in _encrypted()
+    ]
+    result = benchmark.pedantic(
+        lambda: [data_encryption.decrypt(value) for value in values],
+        setup=data_encryption._decrypt_cached.cache_clear,
+        rounds=50,
+    )
+    assert result == NAMES
+
+
+def bench_decrypt_many_duplicates(benchmark):
+    """Страница, где одно лицо встречается многократно"""
+    values = _encrypted()[:10] * 10
+    benchmark.pedantic(
+        data_encryption.decrypt_many,
+        args=(values,),
+        setup=data_encryption._decrypt_cached.cache_clear,
+        rounds=50,
+    )
+
+
+def bench_encrypt(benchmark):
+    benchmark(_encrypted)
@@ -0,0 +1,23 @@
+"""
+wkb_to_geojson: сериализатор всех полей shape (SerializedGeojson)
+"""
+
+from app.modules.common.utils import wkb_to_geojson
+
+
+def bench_point(benchmark, organizations):
+    shapes = [org.shape for org in organizations]
+    result = benchmark(lambda: [wkb_to_geojson(shape) for shape in shapes])
+    assert result[0]["type"] == "Point"
+
+
+def bench_point_hex(benchmark, organizations):
+    """Геометрия, пришедшая из raw SQL строкой hex WKB"""
+    shapes = [str(org.shape) for org in organizations]
+    result = benchmark(lambda: [wkb_to_geojson(shape) for shape in shapes])
+    assert result[0]["type"] == "Point"
+
+
+def bench_multipolygon(benchmark, territory):
+    result = benchmark(wkb_to_geojson, territory)
+    assert result["type"] == "MultiPolygon"
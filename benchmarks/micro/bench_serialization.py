@@ -0,0 +1,32 @@
+"""
+to_dict моделей и ORJsonCoder - запись и чтение ответов в кэше (fastapi-cache)
+"""
+
+from app.modules.ckf.dtos import OrganizationDto
+from app.modules.common.router import ORJsonCoder
+
+
+def bench_basest_model_to_dict(benchmark, receipt_details):
+    result = benchmark(lambda: [receipt.to_dict() for receipt in receipt_details])
+    assert len(result) == len(receipt_details)
+
+
+def bench_base_model_to_dict(benchmark, organizations):
+    """BaseModel.to_dict: колонки с геометрией и датами"""
+    result = benchmark(lambda: [org.to_dict() for org in organizations])
+    assert len(result) == len(organizations)
+
+
+def bench_coder_encode_dtos(benchmark, organizations):
+    dtos = [OrganizationDto.model_validate(org) for org in organizations]
+    benchmark(ORJsonCoder.encode, dtos)
+
+
+def bench_coder_encode_models(benchmark, receipt_details):
+    benchmark(ORJsonCoder.encode, receipt_details)
+
+
+def bench_coder_decode(benchmark, organizations):
+    cached = ORJsonCoder.encode([OrganizationDto.model_validate(org) for org in organizations])
+    result = benchmark(ORJsonCoder.decode, cached)
+    assert len(result) == len(organizations)
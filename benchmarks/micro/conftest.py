@@ -0,0 +1,143 @@
+"""
+Данные микробенчмарков: несохранённые (transient) объекты моделей - такие же,
+какие отдаёт репозиторий, но без БД. Размер выборки - страница ответа API.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Настройки приложения обязательны при импорте app.config; БД и Redis
+# микробенчмаркам не нужны
+for name, value in {
+    "SECRET_KEY": "bench-secret-key",
+    "ALGORITHM": "HS256",
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest  # noqa: E402
+from geoalchemy2.shape import from_shape  # noqa: E402
+from shapely.geometry import MultiPolygon, Point  # noqa: E402
+
+# Все модели, чтобы связи между ними разрешались при настройке мапперов
+import app.modules.admins.models  # noqa: E402, F401
+import app.modules.ckl.cargo.models  # noqa: E402, F401
+import app.modules.ckl.common.models  # noqa: E402, F401
+import app.modules.ckl.customs.models  # noqa: E402, F401
+import app.modules.ckl.infra.models  # noqa: E402, F401
+import app.modules.ckl.transport.models  # noqa: E402, F401
+import app.modules.ext.kazgeodesy.models  # noqa: E402, F401
+import app.modules.ext.mobile_data.models  # noqa: E402, F401
+import app.modules.ext.okeds.models  # noqa: E402, F401
+import app.modules.orders.models  # noqa: E402, F401
+from app.modules.ckf.models import Kkms, Last10ReceiptDetails, Organizations  # noqa: E402
+from app.modules.nsi.models import RegTypes, TaxRegimes, Ugds  # noqa: E402
+
+# Строк в одном ответе: лимит страницы по умолчанию
+PAGE_SIZE = 100
+KKMS_PER_ORGANIZATION = 2
+
+# Хранилище результатов (--benchmark-save / --benchmark-compare) - рядом с
+# бенчмарками, независимо от текущего каталога
+STORAGE = Path(__file__).parent / ".benchmarks"
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+
+def pytest_configure(config):
+    if config.getoption("benchmark_storage") == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{STORAGE}"
+
+
+def _point(index: int):
+    return from_shape(Point(71.4 + index * 0.001, 51.1 + index * 0.001), srid=4326)
+
+
+@pytest.fixture(scope="session")
+def organizations():
+    ugd = Ugds(id=1, code="6205", name="УГД по району Алматы")
+    tax_regime = TaxRegimes(id=1, name="ОУР")
+    reg_type = RegTypes(id=1, name="Первичная")
+    started = date(2015, 1, 1)
+
+    result = []
+    for index in range(1, PAGE_SIZE + 1):
+        organization = Organizations(
+            id=index,
+            iin_bin=f"{100_000_000_000 + index:012d}",
+            name_ru=f"ТОО «Бенчмарк {index}»",
+            date_start=started + timedelta(days=index),
+            ugd_id=ugd.id,
+            ugd=ugd,
+            tax_regime_id=tax_regime.id,
+            tax_regime=tax_regime,
+            reg_type_id=reg_type.id,
+            reg_type=reg_type,
+            jur_fiz=1,
+            address=f"г. Астана, ул. Бенчмарк, {index}",
+            region="Астана",
+            shape=_point(index),
+        )
+        organization.kkms = [
+            Kkms(
+                id=index * KKMS_PER_ORGANIZATION + offset,
+                organization_id=index,
+                reg_number=f"{index * KKMS_PER_ORGANIZATION + offset:012d}",
+                serial_number=f"SN{index:08d}{offset}",
+                model_name="Webkassa",
+                made_year="2022",
+                address=organization.address,
+                shape=_point(index + offset),
+            )
+            for offset in range(KKMS_PER_ORGANIZATION)
+        ]
+        result.append(organization)
+    return result
+
+
+@pytest.fixture(scope="session")
+def kkms(organizations):
+    return [kkm for organization in organizations for kkm in organization.kkms][:PAGE_SIZE]
+
+
+@pytest.fixture(scope="session")
+def receipt_details():
+    """Позиции последних чеков (витрина last_10_details)"""
+    moment = datetime(2025, 6, 1, 12, 0)
+    return [
+        Last10ReceiptDetails(
+            receipt_id=index,
+            kkms_id=index // 5 + 1,
+            organization_id=index // 10 + 1,
+            fiskal_sign=1_000_000_000 + index,
+            operation_date=moment + timedelta(minutes=index),
+            reg_number=f"{index // 5 + 1:012d}",
+            serial_number=f"SN{index // 5 + 1:010d}",
+            address="г. Астана, ул. Бенчмарк, 1",
+            name_ru="ТОО «Бенчмарк»",
+            item_name="Молоко 1 л",
+            item_price=620.0,
+            item_count=2.0,
+            item_nds=132.86,
+            full_item_price=1240.0,
+            payment_type=1,
+        )
+        for index in range(PAGE_SIZE)
+    ]
+
+
+@pytest.fixture(scope="session")
+def receipt_rows(receipt_details):
+    """Те же позиции словарями - как строки живой ленты чеков (ckf/live.py)"""
+    return [receipt.to_dict() for receipt in receipt_details]
+
+
+@pytest.fixture(scope="session")
+def territory():
+    """Граница района: мультиполигон на ~1000 вершин"""
+    boundary = Point(71.4, 51.1).buffer(0.3, quad_segs=250)
+    return from_shape(MultiPolygon([boundary]), srid=4326)
@@ -0,0 +1,227 @@
+"""
+Сценарии нагрузочного прогона. Один вызов сценария - одна итерация
+виртуального пользователя, каждый HTTP-запрос учитывается под своим именем.
+
+Параметры запросов (окна карты, территории, ККМ) выбираются внутри данных
+генератора (benchmarks/datagen), поэтому прогон нужно запускать с тем же
+профилем (--profile) и переопределениями объёма, что и генератор.
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Awaitable, Callable, Collection, Dict, List, Optional
+
+import httpx
+
+from benchmarks.datagen.territory import (
+    BENCH_PASSWORD,
+    Oblast,
+    build_territory,
+    oblast_login,
+)
+
+API = "/api/v1"
+
+
+class Recorder:
+    """Длительности и ошибки запросов по имени; до записи - прогрев"""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def observe(self, name: str, elapsed: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies.setdefault(name, []).append(elapsed)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+@dataclass
+class BenchContext:
+    oblasts: List[Oblast]
+    organizations: int
+    kkms: int
+    no_cache: bool = False
+
+
+class UserSession:
+    """Виртуальный пользователь: свой ГСЧ, токен и счётчики"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        context: BenchContext,
+        rng: random.Random,
+    ):
+        self.client = client
+        self.recorder = recorder
+        self.context = context
+        self.rng = rng
+        self.token: Optional[str] = None
+        self.token_oblast: Optional[Oblast] = None
+
+    async def request(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        expected: Collection[int] = (200,),
+        **kwargs,
+    ) -> Optional[httpx.Response]:
+        headers = kwargs.pop("headers", {})
+        if self.context.no_cache:
+            headers["Cache-Control"] = "no-cache"
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.observe(name, time.perf_counter() - started, ok=False)
+            return None
+        self.recorder.observe(
+            name, time.perf_counter() - started, ok=response.status_code in expected
+        )
+        return response
+
+    def oblast(self) -> Oblast:
+        return self.rng.choice(self.context.oblasts)
+
+
+def _bbox_params(bbox) -> List[tuple]:
+    return [("bbox", round(value, 6)) for value in bbox] + [("srid", 4326)]
+
+
+async def map_bbox(user: UserSession) -> None:
+    """Карта: окно 0.05-0.5° внутри случайного района, организации и ККМ"""
+    raion = user.rng.choice(user.oblast().raions)
+    bbox = raion.cell.random_bbox(user.rng, user.rng.uniform(0.05, 0.5))
+    params = _bbox_params(bbox)
+    # Пустое окно - 404
+    await user.request(
+        "map: organizations/bbox",
+        "GET",
+        f"{API}/ckf/organizations/bbox",
+        params=params,
+        expected=(200, 404),
+    )
+    await user.request(
+        "map: kkms/bbox",
+        "GET",
+        f"{API}/ckf/kkms/bbox",
+        params=params,
+        expected=(200, 404),
+    )
+
+
+async def dashboard(user: UserSession) -> None:
+    """Дашборд области: статистика ККМ, число организаций, ФНО"""
+    oblast = user.oblast()
+    params = {
+        "territory": oblast.cell.wkt,
+        "year": date.today().year,
+        "region": "OBLAST",
+    }
+    await user.request(
+        "dashboard: kkms/statistics", "GET", f"{API}/ckf/kkms/statistics", params=params
+    )
+    await user.request(
+        "dashboard: organizations/count",
+        "GET",
+        f"{API}/ckf/organizations/count/by-year-regions",
+        params=params,
+    )
+    await user.request(
+        "dashboard: fno-statistics",
+        "GET",
+        f"{API}/ckf/fno-statistics/count/aggregation/by-regions",
+        params=params,
+    )
+
+
+async def receipts(user: UserSession) -> None:
+    """Карточка ККМ: сводка чеков и последние чеки"""
+    kkm_id = user.rng.randint(1, user.context.kkms)
+    await user.request(
+        "receipts: kkms/receipts-summary",
+        "GET",
+        f"{API}/ckf/kkms/{kkm_id}/receipts-summary",
+    )
+    await user.request(
+        "receipts: latest-with-details",
+        "GET",
+        f"{API}/ckf/receipts/latest-with-details",
+        params={"kkm_id": kkm_id, "include_today_filter": "false", "limit": 100},
+    )
+
+
+async def auth(user: UserSession) -> None:
+    """Вход сотрудника области (проверка пароля) и защищённый фильтр организаций"""
+    oblast = user.oblast()
+    user.token = None
+    response = await user.request(
+        "auth: login",
+        "POST",
+        f"{API}/admins/login/",
+        json={"login": oblast_login(oblast.id), "password": BENCH_PASSWORD},
+    )
+    if response is None or response.status_code != 200:
+        return
+    user.token = response.json()["access_token"]
+    user.token_oblast = oblast
+    await secure_filter(user)
+
+
+async def secure_filter(user: UserSession) -> None:
+    """Запрос с токеном: аутентификация и территория сотрудника из кэша"""
+    if user.token is None:
+        await auth(user)
+        return
+    if user.rng.random() < 0.5:
+        org_id = user.rng.randint(1, user.context.organizations)
+        params = {"iin_bin": f"{100_000_000_000 + org_id:012d}"}
+    else:
+        params = {"territory": user.rng.choice(user.token_oblast.raions).cell.wkt}
+    await user.request(
+        "auth: organizations/secure-filter",
+        "GET",
+        f"{API}/ckf/organizations/secure-filter",
+        params=params,
+    )
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    weight: int
+    run: Callable[[UserSession], Awaitable[None]]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("map", 4, map_bbox),
+        Scenario("dashboard", 2, dashboard),
+        Scenario("receipts", 3, receipts),
+        Scenario("auth", 1, auth),
+        Scenario("secure", 3, secure_filter),
+    )
+}
+
+
+def build_context(
+    organizations: int, kkms_per_organization: int, no_cache: bool
+) -> BenchContext:
+    return BenchContext(
+        oblasts=build_territory(),
+        organizations=organizations,
+        kkms=organizations * kkms_per_organization,
+        no_cache=no_cache,
+    )
@@ -0,0 +1,17 @@
+"""
+Настройки приложения обязательны при импорте app.config. Тесты не обращаются
+к PostgreSQL и Redis
+"""
+
+import os
+
+for name, value in {
+    "SECRET_KEY": "test-secret-key",
+    "ALGORITHM": "HS256",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,141 @@
+"""
+Блокировка сотрудника и конкурентная аутентификация: устаревшая запись,
+попавшая в кэш до коммита блокировки, сбрасывается после коммита, а кэш
+заполняется с основной БД, а не с отстающей реплики
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+
+from app.database import replica
+from app.database.deps import run_after_commit
+from app.database.replica import RoutingSession
+from app.modules.admins import deps, principal
+from app.modules.admins.models import Employees
+from app.modules.admins.principal import EmployeePrincipal, principal_cache, verified_tokens
+
+EMPLOYEE_ID = 1
+TOKEN = "token"
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def committed_row(monkeypatch):
+    """Строка сотрудника, видимая другим транзакциям (закоммиченная)"""
+    row = {"employee": EmployeePrincipal(id=EMPLOYEE_ID, role=1, blocked=False)}
+
+    class EmployeesRepo:
+        def __init__(self, session):
+            pass
+
+        async def get_principal_by_id(self, id):
+            return row["employee"]
+
+    monkeypatch.setattr(principal, "redis_client", FakeRedis())
+    monkeypatch.setattr(deps, "EmployeesRepo", EmployeesRepo)
+    principal_cache._local.clear()
+    verified_tokens.set(TOKEN, EMPLOYEE_ID, int(time.time()) + 3600)
+    yield row
+    principal_cache._local.clear()
+
+
+async def _authenticate():
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=TOKEN)
+    return await deps.get_current_employee(credentials=credentials, session=None)
+
+
+def test_block_then_authenticate(committed_row):
+    async def scenario():
+        assert (await _authenticate()).blocked is False
+
+        # Администратор блокирует сотрудника: UPDATE выполнен, коммита ещё нет
+        admin_session = SimpleNamespace(info={})
+        await principal_cache.invalidate_on_commit(admin_session, EMPLOYEE_ID)
+
+        # Конкурентный запрос читает ещё не изменённую строку и кэширует её
+        assert (await _authenticate()).blocked is False
+
+        committed_row["employee"] = EmployeePrincipal(id=EMPLOYEE_ID, role=1, blocked=True)
+        await run_after_commit(admin_session)
+
+        with pytest.raises(HTTPException) as error:
+            await _authenticate()
+        assert error.value.status_code == 403
+
+    asyncio.run(scenario())
+
+
+
+PRIMARY = object()
+REPLICA = object()
+
+
+class LaggedSession(RoutingSession):
+    """
+    Сессия get_session_without_commit: основная БД и отстающая реплика, на
+    которой строка сотрудника ещё старая
+    """
+
+    def __init__(self, rows):
+        super().__init__(bind=PRIMARY)
+        self.info["read_only"] = True
+        self.rows = rows
+
+    async def execute(self, statement):
+        row = self.rows[self.get_bind(clause=statement)]
+        return SimpleNamespace(scalar_one_or_none=lambda: row)
+
+
+@pytest.fixture
+def lagged_replica(monkeypatch):
+    monkeypatch.setattr(principal, "redis_client", FakeRedis())
+    monkeypatch.setattr(replica, "replica_engine", SimpleNamespace(sync_engine=REPLICA))
+    monkeypatch.setattr(replica.replica_monitor, "healthy", True)
+    principal_cache._local.clear()
+    verified_tokens.set(TOKEN, EMPLOYEE_ID, int(time.time()) + 3600)
+    yield
+    principal_cache._local.clear()
+
+
+def test_block_then_read_from_lagged_replica(lagged_replica):
+    async def scenario():
+        unblocked = SimpleNamespace(id=EMPLOYEE_ID, role=1, blocked=False)
+        session = LaggedSession({PRIMARY: unblocked, REPLICA: unblocked})
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=TOKEN)
+        assert (await deps.get_current_employee(credentials, session)).blocked is False
+
+        # Блокировка закоммичена на основной БД, реплика её ещё не получила
+        admin_session = SimpleNamespace(info={})
+        await principal_cache.invalidate_on_commit(admin_session, EMPLOYEE_ID)
+        await run_after_commit(admin_session)
+        session = LaggedSession(
+            {PRIMARY: SimpleNamespace(id=EMPLOYEE_ID, role=1, blocked=True), REPLICA: unblocked}
+        )
+        # Остальное чтение сессии по-прежнему идёт с реплики
+        assert session.get_bind(clause=select(Employees)) is REPLICA
+
+        with pytest.raises(HTTPException) as error:
+            await deps.get_current_employee(credentials, session)
+        assert error.value.status_code == 403
+        assert (await principal_cache.get(EMPLOYEE_ID)).blocked is True
+
+    asyncio.run(scenario())